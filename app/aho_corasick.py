@@ -0,0 +1,78 @@
+"""Aho-Corasick automaton for matching many substrings in one pass."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class AhoCorasick:
+    """Find which of a fixed set of patterns occur in a text.
+
+    Building the automaton is linear in the total pattern length; each
+    :meth:`matches` call reads its text once, however many patterns there
+    are.  Matching is exact and case-sensitive, so callers that want
+    case-insensitive matching lowercase both patterns and text.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = list(patterns)
+        # State 0 is the root; each state maps a character to its child
+        self._goto: List[Dict[str, int]] = [{}]
+        # Indices of every pattern ending at a state, including via its
+        # failure chain, so scanning never walks that chain for output
+        self._output: List[List[int]] = [[]]
+        self._empty: List[int] = []
+        for number, pattern in enumerate(self.patterns):
+            if not pattern:
+                self._empty.append(number)
+                continue
+            state = 0
+            for char in pattern:
+                child = self._goto[state].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[state][char] = child
+                    self._goto.append({})
+                    self._output.append([])
+                state = child
+            self._output[state].append(number)
+        self._fail = [0] * len(self._goto)
+        self._link()
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                if self._output[self._fail[child]]:
+                    self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def matches(self, text: str) -> Set[int]:
+        """Return the indices of the patterns that occur in ``text``.
+
+        Empty patterns occur in every text.  Scanning stops early once every
+        pattern has been found.
+        """
+        found: Set[int] = set(self._empty)
+        remaining = len(self.patterns) - len(found)
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                before = len(found)
+                found.update(output[state])
+                remaining -= len(found) - before
+                if not remaining:
+                    break
+        return found
@@ -0,0 +1,201 @@
+"""Approximate nearest-neighbour FAISS indexes for large policy stores.
+
+LangChain's FAISS store always builds an exact ``IndexFlatL2``, whose search
+time grows linearly with the number of chunks.  :func:`build_index` rebuilds
+a store's vectors into one of:
+
+``flat``
+    Exact search (the default for small corpora).
+``ivf``
+    ``IndexIVFFlat``: vectors are bucketed around ``nlist`` k-means centroids
+    and only ``nprobe`` buckets are scanned per query.
+``hnsw``
+    ``IndexHNSWFlat``: a navigable small-world graph; the fastest queries,
+    but the slowest to build and to delete documents from.
+``ivfpq``
+    ``IndexIVFPQ``: IVF with product-quantized vectors, trading recall for a
+    much smaller index.
+
+All indexes use squared L2 distance, like the flat index, so relevance
+scores stay comparable.  Training happens inside :func:`build_index`.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from typing import Any, List
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    import faiss  # type: ignore
+except Exception:  # pragma: no cover - executed only when package missing
+    faiss = None  # type: ignore[assignment]
+
+# "auto", "flat", "ivf", "hnsw" or "ivfpq"
+VECTOR_INDEX_TYPE = os.getenv("DOCUSEC_VECTOR_INDEX", "auto")
+# "auto" switches from exact search to IVF-Flat at this many vectors
+AUTO_ANN_MIN_VECTORS = 100_000
+# k-means wants about this many training points per centroid
+_POINTS_PER_CENTROID = 39
+IVF_PROBE_FRACTION = 16  # Scan 1/16 of the buckets per query...
+IVF_MIN_PROBES = 8  # ...but never fewer than this many
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 128
+PQ_BITS = 8
+# Candidate sub-quantizer counts, most accurate first
+_PQ_SUBQUANTIZERS = (64, 48, 32, 24, 16, 12, 8, 4, 2, 1)
+# Narrower sub-vectors barely compress and make training slow
+PQ_MIN_SUBVECTOR_DIM = 4
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+logger = logging.getLogger(__name__)
+
+
+def choose_index_type(count: int, index_type: str | None = None) -> str:
+    """Resolve ``index_type`` (default :data:`VECTOR_INDEX_TYPE`) for ``count`` vectors.
+
+    Raises:
+        ValueError: If ``index_type`` is not ``auto`` or one of
+            :data:`INDEX_TYPES`.
+    """
+    index_type = index_type or VECTOR_INDEX_TYPE
+    if index_type == "auto":
+        return "ivf" if count >= AUTO_ANN_MIN_VECTORS else "flat"
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type: {index_type}")
+    return index_type
+
+
+def _nlist(count: int) -> int:
+    """Number of IVF buckets: about ``4 * sqrt(count)``, limited by training data."""
+    return max(1, min(int(4 * math.sqrt(count)), count // _POINTS_PER_CENTROID))
+
+
+def _pq_subquantizers(dim: int) -> int:
+    return next(
+        (m for m in _PQ_SUBQUANTIZERS if dim % m == 0 and dim // m >= PQ_MIN_SUBVECTOR_DIM),
+        1,
+    )
+
+
+def build_index(vectors: np.ndarray, index_type: str) -> Any:
+    """Return a trained FAISS index of ``index_type`` holding ``vectors``.
+
+    Row ``i`` of ``vectors`` gets id ``i``, matching the flat index, so a
+    LangChain store's ``index_to_docstore_id`` mapping stays valid.  IVF-PQ
+    falls back to IVF-Flat when there are too few vectors to train its
+    codebooks.
+    """
+    if faiss is None:
+        raise ImportError("faiss is unavailable")
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = vectors.shape
+    if index_type == "ivfpq" and count < _POINTS_PER_CENTROID * 2**PQ_BITS:
+        logger.info("Too few vectors (%d) to train IVF-PQ; using IVF-Flat", count)
+        index_type = "ivf"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_NEIGHBORS)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif index_type in ("ivf", "ivfpq"):
+        nlist = _nlist(count)
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, _pq_subquantizers(dim), PQ_BITS)
+        index.train(vectors)
+        index.nprobe = min(nlist, max(IVF_MIN_PROBES, nlist // IVF_PROBE_FRACTION))
+        # Lets reconstruct() serve store_contents and format conversion
+        index.make_direct_map()
+    else:
+        raise ValueError(f"Unknown vector index type: {index_type}")
+    index.add(vectors)
+    return index
+
+
+def index_type_of(index: Any) -> str:
+    """Return the :data:`INDEX_TYPES` name of a FAISS index."""
+    if faiss is not None:
+        if isinstance(index, faiss.IndexHNSWFlat):
+            return "hnsw"
+        if isinstance(index, faiss.IndexIVFPQ):
+            return "ivfpq"
+        if isinstance(index, faiss.IndexIVFFlat):
+            return "ivf"
+    return "flat"
+
+
+def reindex(vectorstore: Any, index_type: str | None = None) -> Any:
+    """Rebuild a LangChain FAISS store's index as ``index_type``, in place.
+
+    ``index_type`` defaults to :data:`VECTOR_INDEX_TYPE`; ``auto`` picks by
+    corpus size (see :func:`choose_index_type`).  Stores that already have
+    the requested index, or no FAISS index at all, are returned untouched.
+    """
+    if getattr(vectorstore, "index", None) is None:
+        return vectorstore
+    count = vectorstore.index.ntotal
+    target = choose_index_type(count, index_type)
+    if not count or target == index_type_of(vectorstore.index):
+        return vectorstore
+    vectors = vectorstore.index.reconstruct_n(0, count)
+    vectorstore.index = build_index(vectors, target)
+    return vectorstore
+
+
+def merge_into(vectorstore: Any, other: Any) -> None:
+    """Add every chunk of the FAISS store ``other`` to ``vectorstore``.
+
+    ``FAISS.merge_from`` only merges indexes of the same kind, so chunks are
+    re-added by vector when ``vectorstore`` has an approximate index.
+    """
+    if index_type_of(vectorstore.index) == index_type_of(other.index):
+        vectorstore.merge_from(other)
+        return
+    count = other.index.ntotal
+    if not count:
+        return
+    vectors = other.index.reconstruct_n(0, count)
+    ids = [other.index_to_docstore_id[i] for i in range(count)]
+    docs = [other.docstore.search(chunk_id) for chunk_id in ids]
+    vectorstore.add_embeddings(
+        [(doc.page_content, vector) for doc, vector in zip(docs, vectors.tolist())],
+        metadatas=[dict(doc.metadata) for doc in docs],
+        ids=ids,
+    )
+
+
+def delete_ids(vectorstore: Any, ids: List[str]) -> None:
+    """Remove the chunks ``ids`` from a FAISS store, whatever its index.
+
+    LangChain's ``FAISS.delete`` assumes the remaining vectors are renumbered
+    after a removal, which only the flat index does (and HNSW cannot remove
+    at all).  Approximate indexes are instead emptied and refilled with the
+    kept vectors, reusing their trained centroids and codebooks.  Vectors in
+    an IVF-PQ index are re-encoded from their stored approximations.
+    """
+    if index_type_of(vectorstore.index) == "flat":
+        vectorstore.delete(ids)
+        return
+    drop = set(ids)
+    index = vectorstore.index
+    mapping = vectorstore.index_to_docstore_id
+    keep = [i for i in range(index.ntotal) if mapping[i] not in drop]
+    vectors = index.reconstruct_n(0, index.ntotal)[keep]
+    index.reset()
+    if keep:
+        index.add(vectors)
+    stored = set(mapping.values())
+    vectorstore.docstore.delete([i for i in drop if i in stored])
+    vectorstore.index_to_docstore_id = {
+        position: mapping[old] for position, old in enumerate(keep)
+    }
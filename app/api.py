@@ -1,7 +1,11 @@
+import hashlib
 import os
+import shutil
+import tempfile
 import time
+from pathlib import Path
 from fastapi.responses import HTMLResponse
-from typing import List
+from typing import Any, Callable, List
 
 from fastapi import (
     FastAPI,
@@ -16,16 +20,45 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import HTMLResponse, JSONResponse
 
-from .ingestion import read_file, chunk_document
-from .embeddings import embed_and_store
+from .jobs import Job, JobQueue, QueueFullError
+from .pipeline import ingest, ingest_bulk, is_zip, stage_uploads
+from .embeddings import (
+    append_chunks,
+    delete_document,
+    get_vectorstore,
+    list_vectorstores,
+    save_vectorstore,
+    store_cache_stats,
+    store_contents,
+)
+from .federated import FederatedVectorStore
 from .rag_pipeline import build_rag, answer_query
 from .framework_loader import load_frameworks
-from .control_mapper import map_controls as perform_control_mapping
+from .control_mapper import (
+    COVERAGE_WORKERS,
+    check_policy_coverage,
+    map_controls as perform_control_mapping,
+)
+from .coverage_cache import coverage_cache_stats
+from .db import fetch_controls
 from .ui import upload_form
 from . import utils
-from .validation import validate_input
+from .embedding_cache import cache_stats
+from .embedding_executor import embedding_metrics
+from .validation import (
+    validate_document_id,
+    validate_input,
+    validate_policy_name,
+)
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_BLOCK_SIZE = 1024 * 1024  # 1MB read from the request body at a time
+PDF_EXTRACT_WORKERS = os.cpu_count() or 1
+# Background ingestion: concurrent jobs and how many more may wait for a worker
+INGEST_WORKERS = int(os.getenv("DOCUSEC_INGEST_WORKERS", "2"))
+INGEST_QUEUE_DEPTH = int(os.getenv("DOCUSEC_INGEST_QUEUE_DEPTH", "16"))
+MAX_BULK_SIZE = 200 * 1024 * 1024  # 200MB across all files of a bulk upload
+BULK_PARSE_WORKERS = os.cpu_count() or 1
 ALLOWED_MIME_TYPES = {
     "application/pdf",
     "text/plain",
@@ -83,6 +116,44 @@ app.add_middleware(RateLimiterMiddleware)
 vectorstore = None
 rag_chain = None
 frameworks = load_frameworks()
+ingest_jobs = JobQueue(workers=INGEST_WORKERS, max_pending=INGEST_QUEUE_DEPTH)
+
+
+async def _spool_upload(
+    file: UploadFile, limit: int = MAX_FILE_SIZE, dir: str | None = None
+) -> tuple[str, str]:
+    """Stream an upload to a temporary file in fixed-size blocks.
+
+    The request body is never held in memory as a whole; reading stops and a
+    413 error is raised as soon as more than ``limit`` bytes have arrived.
+
+    Returns:
+        A tuple ``(path, digest)`` with the path of the temporary file and the
+        hex SHA-256 digest of its contents.  The caller is responsible for
+        removing the file.
+    """
+    suffix = Path(getattr(file, "filename", None) or "").suffix
+    fd, path = tempfile.mkstemp(prefix="docusec-upload-", suffix=suffix, dir=dir)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                block = await file.read(UPLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Limit {limit // (1024 * 1024)}MB.",
+                    )
+                digest.update(block)
+                out.write(block)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
 
 
 # Root endpoint: return API health status
@@ -92,45 +163,300 @@ def root() -> dict:
     return {"status": "ok"}
 
 
-# Document ingestion endpoint: upload file, chunk, embed, build RAG
-@app.post("/ingest")
+def _check_upload_type(file: UploadFile) -> None:
+    """Reject uploads whose declared content type is not supported."""
+    if file.content_type not in ALLOWED_MIME_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported file type.")
+
+
+def _ingest_file(
+    path: str,
+    digest: str,
+    filename: str | None,
+    mime_type: str | None,
+    on_stage: Callable[[str], None] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> tuple[Any, int, bool]:
+    """Ingest a spooled upload and remove its temporary file.
+
+    Runs on job worker threads, so failures propagate as ``ValueError`` and
+    are recorded on the job rather than mapped to HTTP errors.
+
+    Returns:
+        A tuple ``(vectorstore, chunk_count, cache_hit)``.
+    """
+    try:
+        return ingest(
+            path,
+            digest,
+            filename=filename,
+            mime_type=mime_type,
+            workers=PDF_EXTRACT_WORKERS,
+            on_stage=on_stage,
+            on_progress=on_progress,
+        )
+    finally:
+        os.unlink(path)
+
+
+def _run_ingest_job(
+    job: Job, path: str, digest: str, filename: str | None, mime_type: str | None
+) -> dict:
+    """Background job body for ``/ingest``."""
+    global vectorstore, rag_chain
+
+    store, count, cache_hit = _ingest_file(
+        path, digest, filename, mime_type, job.set_stage, job.set_progress
+    )
+    job.set_stage("building_rag")
+    vectorstore = store
+    rag_chain = build_rag(store)
+    return {"chunks": count, "cache_hit": cache_hit}
+
+
+# Document ingestion endpoint: upload file and queue chunking, embedding and
+# RAG construction as a background job
+@app.post("/ingest", status_code=202)
 async def ingest_document(
     file: UploadFile = File(...), api_key: str = Depends(get_api_key)
 ) -> dict:
-    """Upload a document, chunk it, embed it and build the RAG pipeline."""
-    global vectorstore, rag_chain
+    """Upload a document and queue it for ingestion.
 
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(status_code=400, detail="Unsupported file type.")
+    Returns the id of the queued job; poll ``/jobs/{job_id}`` for its stage,
+    progress and result.
+    """
+    _check_upload_type(file)
+    path, digest = await _spool_upload(file)
+    try:
+        job = ingest_jobs.submit(
+            _run_ingest_job,
+            path,
+            digest,
+            getattr(file, "filename", None),
+            getattr(file, "content_type", None),
+        )
+    except QueueFullError:
+        os.unlink(path)
+        raise HTTPException(
+            status_code=503, detail="Ingestion queue is full. Retry later."
+        )
+    return {"job_id": job.id, "status": job.status}
+
+
+def _run_bulk_job(job: Job, name: str, tmp_dir: str, uploads: list) -> dict:
+    """Background job body for ``/ingest/bulk``."""
+    global vectorstore, rag_chain
 
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large. Limit 10MB.")
+    try:
+        files = stage_uploads(uploads, tmp_dir, MAX_FILE_SIZE, MAX_BULK_SIZE)
+        store, report = ingest_bulk(
+            files,
+            workers=BULK_PARSE_WORKERS,
+            on_stage=job.set_stage,
+            on_progress=job.set_progress,
+        )
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    if store is not None:
+        job.set_stage("saving")
+        save_vectorstore(store, name)
+        job.set_stage("building_rag")
+        vectorstore = store
+        rag_chain = build_rag(store)
+    return {"store": name, **report}
+
+
+# Bulk ingestion endpoint: upload many documents (or ZIP archives of them) and
+# queue them for ingestion into one combined store
+@app.post("/ingest/bulk", status_code=202)
+async def ingest_bulk_documents(
+    name: str,
+    files: List[UploadFile] = File(...),
+    api_key: str = Depends(get_api_key),
+) -> dict:
+    """Upload several documents and queue them for ingestion into store ``name``.
 
-    text = read_file(
-        contents,
-        filename=getattr(file, "filename", None),
-        mime_type=getattr(file, "content_type", None),
+    ZIP archives are expanded into their PDF, DOCX and TXT entries.  The job
+    result reports per-file status, chunk counts and parse times; documents
+    that fail do not abort the rest of the batch.
+    """
+    try:
+        validate_policy_name(name)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    for file in files:
+        zipped = is_zip(getattr(file, "filename", None), file.content_type)
+        if not zipped and file.content_type not in ALLOWED_MIME_TYPES:
+            raise HTTPException(status_code=400, detail="Unsupported file type.")
+    tmp_dir = tempfile.mkdtemp(prefix="docusec-bulk-")
+    uploads = []
+    remaining = MAX_BULK_SIZE
+    try:
+        for file in files:
+            filename = getattr(file, "filename", None)
+            zipped = is_zip(filename, file.content_type)
+            limit = MAX_BULK_SIZE if zipped else MAX_FILE_SIZE
+            path, _ = await _spool_upload(file, min(limit, remaining), dir=tmp_dir)
+            remaining -= os.path.getsize(path)
+            uploads.append(
+                (Path(filename or path).name, Path(path), file.content_type)
+            )
+        job = ingest_jobs.submit(_run_bulk_job, name, tmp_dir, uploads)
+    except QueueFullError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise HTTPException(
+            status_code=503, detail="Ingestion queue is full. Retry later."
+        )
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return {"job_id": job.id, "status": job.status, "files": len(uploads)}
+
+
+# Job status endpoint: report stage, progress and timings of a background job
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, api_key: str = Depends(get_api_key)) -> dict:
+    """Return the status of a queued or finished ingestion job."""
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+
+def _run_store_job(
+    job: Job,
+    name: str,
+    doc_id: str | None,
+    path: str,
+    digest: str,
+    filename: str | None,
+    mime_type: str | None,
+) -> dict:
+    """Background job body for ``/stores/{name}/documents``."""
+    doc_store, count, cache_hit = _ingest_file(
+        path, digest, filename, mime_type, job.set_stage, job.set_progress
     )
+    doc_id = doc_id or digest
+    job.set_stage("appending")
+    # Reuse the document's vectors rather than embedding its chunks again
+    texts, metadatas, vectors = store_contents(doc_store)
+    append_chunks(name, doc_id, texts, metadatas, vectors)
+    return {"store": name, "doc_id": doc_id, "chunks": count, "cache_hit": cache_hit}
+
+
+# Incremental store endpoint: add a document to a named policy store as a
+# background job
+@app.post("/stores/{name}/documents", status_code=202)
+async def add_store_document(
+    name: str,
+    file: UploadFile = File(...),
+    doc_id: str | None = None,
+    api_key: str = Depends(get_api_key),
+) -> dict:
+    """Queue an uploaded document to be appended to a named policy store.
+
+    ``doc_id`` defaults to the SHA-256 digest of the upload.  Re-adding an
+    existing ``doc_id`` replaces its chunks.  Returns the id of the queued
+    job; poll ``/jobs/{job_id}`` for its result.
+    """
+    try:
+        validate_policy_name(name)
+        if doc_id is not None:
+            validate_document_id(doc_id)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    _check_upload_type(file)
+    path, digest = await _spool_upload(file)
+    try:
+        job = ingest_jobs.submit(
+            _run_store_job,
+            name,
+            doc_id,
+            path,
+            digest,
+            getattr(file, "filename", None),
+            getattr(file, "content_type", None),
+        )
+    except QueueFullError:
+        os.unlink(path)
+        raise HTTPException(
+            status_code=503, detail="Ingestion queue is full. Retry later."
+        )
+    return {"job_id": job.id, "status": job.status}
+
+
+# Incremental store endpoint: remove a document from a named policy store
+@app.delete("/stores/{name}/documents/{doc_id}")
+def delete_store_document(
+    name: str, doc_id: str, api_key: str = Depends(get_api_key)
+) -> dict:
+    """Remove every chunk of ``doc_id`` from a named policy store."""
     try:
-        validate_input(text)
+        validate_policy_name(name)
+        validate_document_id(doc_id)
     except ValueError as err:
         raise HTTPException(status_code=400, detail=str(err))
-    chunks, metadatas = chunk_document(text)
-    vectorstore = embed_and_store(chunks, metadatas)
-    rag_chain = build_rag(vectorstore)
-    return {"chunks": len(chunks)}
+    if name not in list_vectorstores():
+        raise HTTPException(status_code=404, detail="Policy store not found.")
+    try:
+        deleted = delete_document(name, doc_id)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    return {"store": name, "doc_id": doc_id, "deleted": deleted}
+
+
+def _load_policy_stores(store: str | None, stores: str | None) -> Any:
+    """Return the policy store named by ``store`` or federated over ``stores``.
+
+    ``stores`` is a comma-separated list of policy store names, or ``*`` for
+    all of them, and takes precedence over ``store``.  Returns ``None`` when a
+    named store does not exist.
+    """
+    if stores is not None:
+        names = None
+        if stores.strip() != "*":
+            names = [name.strip() for name in stores.split(",") if name.strip()]
+            for name in names:
+                validate_policy_name(name)
+        try:
+            return FederatedVectorStore.load(names)
+        except ValueError:
+            return None
+    validate_policy_name(store)
+    if store not in list_vectorstores():
+        return None
+    return get_vectorstore(store)
 
 
 # RAG query endpoint: ask questions over ingested content
 @app.post("/query")
-async def query_rag(question: str, api_key: str = Depends(get_api_key)) -> dict:
-    """Query the RAG pipeline for an answer."""
-    if rag_chain is None:
+async def query_rag(
+    question: str,
+    store: str | None = None,
+    stores: str | None = None,
+    api_key: str = Depends(get_api_key),
+) -> dict:
+    """Query the RAG pipeline for an answer.
+
+    Without ``store`` or ``stores`` the most recently ingested document is
+    queried.  ``store`` names one policy store to load (or reuse from
+    memory).  ``stores`` is a comma-separated list of policy stores, or
+    ``*`` for all of them, searched together as one federated store.
+    """
+    if store is None and stores is None and rag_chain is None:
         return {"error": "RAG pipeline not initialized"}
     try:
         validate_input(question)
-        answer = answer_query(rag_chain, question)
+        if store is None and stores is None:
+            chain = rag_chain
+        else:
+            policy_store = _load_policy_stores(store, stores)
+            if policy_store is None:
+                return {"error": "Policy store not found."}
+            chain = build_rag(policy_store)
+        answer = answer_query(chain, question)
     except Exception as err:
         return {"error": str(err)}
     return {"answer": answer}
@@ -153,6 +479,83 @@ async def map_controls(
     return mapping
 
 
+# Coverage endpoint: find policy excerpts addressing each control of a framework
+@app.get("/coverage")
+def framework_coverage(
+    framework: str,
+    store: str | None = None,
+    stores: str | None = None,
+    k: int = 8,
+    api_key: str = Depends(get_api_key),
+) -> dict:
+    """Check which controls of a stored framework the policy addresses.
+
+    ``store`` and ``stores`` select the policy as for ``/query``.  Controls
+    come from the framework database and are searched concurrently (see
+    ``DOCUSEC_COVERAGE_WORKERS``); results keep the framework's control order
+    and repeated checks of unchanged policies and frameworks are served from
+    the coverage cache.
+    """
+    if store is None and stores is None:
+        raise HTTPException(status_code=400, detail="Specify store or stores.")
+    controls = [c for c in fetch_controls() if c["framework_title"] == framework]
+    if not controls:
+        raise HTTPException(status_code=404, detail="Framework not found.")
+    available = list_vectorstores()
+    if stores is None:
+        names = [store]
+    elif stores.strip() == "*":
+        names = available
+    else:
+        names = [name.strip() for name in stores.split(",") if name.strip()]
+    try:
+        for name in names:
+            validate_policy_name(name)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    if not names or any(name not in available for name in names):
+        raise HTTPException(status_code=404, detail="Policy store not found.")
+    coverage = check_policy_coverage(
+        names, framework, controls, k=max(1, k), max_workers=COVERAGE_WORKERS
+    )
+    return {"framework": framework, "controls": coverage}
+
+
+# Coverage cache endpoint: report reuse of cached coverage results
+@app.get("/coverage/cache")
+def coverage_cache_statistics(api_key: str = Depends(get_api_key)) -> dict:
+    """Return process-wide coverage cache hits and misses."""
+    return coverage_cache_stats()
+
+
+# Embedding cache endpoint: report chunk embedding cache effectiveness
+@app.get("/embeddings/cache")
+def embedding_cache_stats(api_key: str = Depends(get_api_key)) -> dict:
+    """Return process-wide embedding cache hits and misses."""
+    return cache_stats()
+
+
+# Store cache endpoint: report reuse of loaded policy stores
+@app.get("/stores/cache")
+def vectorstore_cache_stats(api_key: str = Depends(get_api_key)) -> dict:
+    """Return hits, misses and evictions of the loaded-store cache."""
+    return store_cache_stats()
+
+
+# Embedding metrics endpoint: report provider batch latency and throughput
+@app.get("/embeddings/metrics")
+def embedding_batch_metrics(api_key: str = Depends(get_api_key)) -> dict:
+    """Return embedding batch counts, retries, latency and throughput."""
+    return embedding_metrics()
+
+
+# Tracing endpoint: report wall time spent in each traced stage
+@app.get("/traces/stats")
+def trace_stage_stats(api_key: str = Depends(get_api_key)) -> dict:
+    """Return calls, errors and wall time of every traced stage."""
+    return utils.trace_stats()
+
+
 # UI endpoint: serve HTML upload form
 @app.get("/ui/upload_form", response_class=HTMLResponse)
 def get_upload_form() -> HTMLResponse:
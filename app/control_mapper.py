@@ -1,102 +1,386 @@
 """Utilities for mapping compliance controls to policy text."""
 
-from difflib import SequenceMatcher
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import json
+import os
 import re
-from typing import Any, Dict, List
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Set, Tuple
+
+from . import coverage_cache
+from .aho_corasick import AhoCorasick
+from .embeddings import VECTORSTORE_DIR, get_vectorstore, list_vectorstores, store_version
+from .federated import STORE_KEY, FederatedVectorStore
+
+from .coverage_matrix import chunk_documents, chunk_vectors, top_k_cosine
+
+# Policy excerpts reported per control
+MAX_EXCERPTS = 3
+# Bump whenever retrieval or quote extraction changes what coverage returns,
+# so results cached by earlier versions are no longer served
+COVERAGE_ALGORITHM_VERSION = 2
+# Controls searched at once by concurrent coverage checks
+COVERAGE_WORKERS = int(os.getenv("DOCUSEC_COVERAGE_WORKERS", "8"))
+# Quote extraction is pure Python, so more than one thread mostly contends
+# for the GIL; it runs apart from the searches to overlap with their I/O
+COVERAGE_QUOTE_WORKERS = int(os.getenv("DOCUSEC_COVERAGE_QUOTE_WORKERS", "1"))
+
+# Compiled control matchers kept for recently seen framework versions
+_MATCHER_CACHE_SIZE = 4
+_matchers: "OrderedDict[str, Tuple[AhoCorasick, Dict[str, List[Tuple[str, int]]]]]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def _control_matcher(
+    frameworks: Dict[str, Dict[str, str]],
+) -> Tuple[AhoCorasick, Dict[str, List[Tuple[str, int]]]]:
+    """Return an automaton over all lowercased control texts, cached by content.
+
+    The second item lists, per framework and in order, each control id with
+    the index of its pattern in the automaton.
+    """
+    version = hashlib.sha256(
+        json.dumps(frameworks, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    with _matchers_lock:
+        cached = _matchers.get(version)
+        if cached is not None:
+            _matchers.move_to_end(version)
+            return cached
+    patterns: Dict[str, int] = {}
+    layout = {
+        name: [
+            (control_id, patterns.setdefault(text.lower(), len(patterns)))
+            for control_id, text in controls.items()
+        ]
+        for name, controls in frameworks.items()
+    }
+    cached = (AhoCorasick(patterns), layout)
+    with _matchers_lock:
+        _matchers[version] = cached
+        while len(_matchers) > _MATCHER_CACHE_SIZE:
+            _matchers.popitem(last=False)
+    return cached
 
 
 def map_controls(frameworks: Dict[str, Dict[str, str]], documents: List[str]) -> Dict[str, List[str]]:
-    """Naive control mapping by substring matching of control text in documents."""
-    mapping: Dict[str, List[str]] = {name: [] for name in frameworks}
-    for name, controls in frameworks.items():
-        for control_id, control_text in controls.items():
-            for doc in documents:
-                if control_text.lower() in doc.lower():
-                    mapping[name].append(control_id)
-                    break
-    return mapping
+    """Map controls to documents by case-insensitive substring matching.
+
+    A control matches when its text occurs in any document.  All control
+    texts are compiled into one Aho-Corasick automaton (cached per
+    frameworks content), so each lowercased document is scanned once
+    however many controls there are.
+    """
+    matcher, layout = _control_matcher(frameworks)
+    found: Set[int] = set()
+    for doc in documents:
+        found |= matcher.matches(doc.lower())
+        if len(found) == len(matcher.patterns):
+            break
+    return {
+        name: [control_id for control_id, pattern in controls if pattern in found]
+        for name, controls in layout.items()
+    }
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+NGRAM_SIZE = 3
+
+
+def _ngrams(text: str) -> FrozenSet[str]:
+    """Return the character n-grams of ``text``, lowercased and space-normalised."""
+    padded = f" {' '.join(text.lower().split())} "
+    if len(padded) <= NGRAM_SIZE:
+        return frozenset([padded])
+    return frozenset(padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+
+class QuoteExtractor:
+    """Pick the policy sentence most similar to a control, verbatim.
+
+    Similarity is the Dice coefficient of character trigram sets,
+    ``2|A & B| / (|A| + |B|)``, a linear-time stand-in for
+    ``difflib.SequenceMatcher.ratio``.  Each chunk is split into sentences,
+    and each sentence and control reduced to trigrams, only once per
+    extractor, so one instance should serve a whole coverage run.  It may be
+    shared between threads; concurrent misses at worst compute an entry twice.
+    """
+
+    def __init__(self) -> None:
+        self._sentences: Dict[str, List[Tuple[str, FrozenSet[str]]]] = {}
+        self._controls: Dict[str, FrozenSet[str]] = {}
+
+    def _segments(self, policy_text: str) -> List[Tuple[str, FrozenSet[str]]]:
+        segments = self._sentences.get(policy_text)
+        if segments is None:
+            segments = [
+                (sentence.strip(), _ngrams(sentence))
+                for sentence in _SENTENCE_RE.split(policy_text)
+            ]
+            self._sentences[policy_text] = segments
+        return segments
+
+    def extract(self, control_text: str, policy_text: str) -> str:
+        """Return the sentence of ``policy_text`` most similar to ``control_text``.
+
+        The result is always an exact excerpt of the policy, never a
+        paraphrase.  The first of equally similar sentences wins, and the
+        whole chunk is returned when no sentence shares any trigram.
+        """
+        control = self._controls.get(control_text)
+        if control is None:
+            control = self._controls[control_text] = _ngrams(control_text)
+        best_sentence = policy_text.strip()
+        best_score = 0.0
+        for sentence, grams in self._segments(policy_text):
+            score = 2 * len(control & grams) / (len(control) + len(grams))
+            if score > best_score:
+                best_score = score
+                best_sentence = sentence
+        return best_sentence
+
+
+def _embed_controls(vectorstore: Any, texts: List[str]) -> Dict[str, List[float]] | None:
+    """Embed the distinct control ``texts`` with the store's embeddings.
+
+    Controls are embedded as documents in one batched call, so they go
+    through the persistent embedding cache (see :mod:`app.embedding_cache`)
+    and are reused by later coverage checks.  Returns ``None`` when the
+    store cannot be searched by vector or embedding fails, in which case
+    controls are searched by text one at a time.
+    """
+    embeddings = getattr(vectorstore, "embeddings", None)
+    if embeddings is None or not hasattr(vectorstore, "similarity_search_with_score_by_vector"):
+        return None
+    unique = list(dict.fromkeys(texts))
+    try:
+        vectors = embeddings.embed_documents(unique)
+    except Exception:
+        return None
+    return dict(zip(unique, vectors))
+
+
+def _relevance_fn(vectorstore: Any) -> Callable[[float], float] | None:
+    """Return the store's distance-to-relevance function, if it has one."""
+    try:
+        return vectorstore._select_relevance_score_fn()
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _get_text(doc: Any) -> str:
+    """Return the most human readable text from a retrieved document."""
+
+    text = getattr(doc, "page_content", "") or ""
+    if not text and hasattr(doc, "metadata"):
+        meta = getattr(doc, "metadata") or {}
+        if isinstance(meta, dict):
+            text = meta.get("text", "") or meta.get("page_content", "")
+    if not isinstance(text, str):  # Fallback to string representation
+        text = str(text)
+    return text
+
+
+class _CoverageSearch:
+    """Retrieve the best policy chunks for each control of one coverage run.
+
+    Control embedding and, for exact-search stores, the control × chunk
+    matrix are computed up front; :meth:`documents` then only looks up or
+    searches one control and is safe to call from several threads.
+    """
+
+    def __init__(self, vectorstore: Any, controls: List[Dict[str, str]], k: int) -> None:
+        self.vectorstore = vectorstore
+        self.k = k
+        self.control_vectors = None
+        self.relevance = None
+        self.matched: Dict[str, Any] = {}
+        if vectorstore is None or not controls:
+            return
+        self.control_vectors = _embed_controls(
+            vectorstore, [c["control_language"] for c in controls]
+        )
+        self.relevance = _relevance_fn(vectorstore)
+        stored = chunk_vectors(vectorstore) if self.control_vectors else None
+        if stored is not None:
+            texts = list(self.control_vectors)
+            positions, _ = top_k_cosine(
+                [self.control_vectors[text] for text in texts],
+                stored[0],
+                min(k, MAX_EXCERPTS),
+                scales=stored[1],
+            )
+            self.matched = dict(zip(texts, positions))
+
+    def documents(self, control: Dict[str, str]) -> List[Any]:
+        """Return up to :data:`MAX_EXCERPTS` documents for ``control``, best first."""
+        vectorstore, k = self.vectorstore, self.k
+        text = control["control_language"]
+        if text in self.matched:
+            return chunk_documents(vectorstore, self.matched[text])
+        if self.control_vectors is not None:
+            doc_scores = vectorstore.similarity_search_with_score_by_vector(
+                self.control_vectors[text], k=k
+            )
+            if self.relevance is not None:
+                doc_scores = [(doc, self.relevance(score)) for doc, score in doc_scores]
+                doc_scores.sort(key=lambda x: x[1], reverse=True)
+            else:  # Raw distances: smaller is closer
+                doc_scores.sort(key=lambda x: x[1])
+            return [doc for doc, _ in doc_scores[:MAX_EXCERPTS]]
+        if hasattr(vectorstore, "similarity_search_with_relevance_scores"):
+            doc_scores = vectorstore.similarity_search_with_relevance_scores(text, k=k)
+            doc_scores.sort(key=lambda x: x[1], reverse=True)
+            return [doc for doc, _ in doc_scores[:MAX_EXCERPTS]]
+        return vectorstore.similarity_search(text, k=k)[:MAX_EXCERPTS]
+
+
+def _quote(
+    quotes: QuoteExtractor, control: Dict[str, str], docs: List[Any]
+) -> Tuple[List[str], List[Any]]:
+    """Return the excerpts quoted from ``docs`` and the store each came from."""
+    excerpts = [quotes.extract(control["control_language"], _get_text(doc)) for doc in docs]
+    # Federated search tags each hit with its source store
+    policies = [(getattr(doc, "metadata", None) or {}).get(STORE_KEY) for doc in docs]
+    return excerpts, policies
 
 
 def check_framework_coverage(
     vectorstore: Any,
     controls: List[Dict[str, str]],
     k: int = 8,
+    max_workers: int = 1,
+    quote_workers: int = COVERAGE_QUOTE_WORKERS,
 ) -> List[Dict[str, Any]]:
     """Return up to three policy excerpts that may satisfy each control.
 
+    All control texts are embedded up front in one batched call and each
+    control is then searched by vector, instead of paying one embedding
+    round trip per control.  When the store is searched exactly and exposes
+    its chunk vectors, every control is instead scored against every chunk
+    at once by cosine similarity (see :mod:`app.coverage_matrix`).
+
+    With ``max_workers`` above one, up to that many controls are searched
+    at once and quotes are extracted on a separate pool of ``quote_workers``
+    threads while other searches wait on the store.  Results keep control
+    order either way, and a control whose search or extraction fails gets
+    no excerpts without affecting the others.
+
     Args:
         vectorstore: Vector store containing policy document embeddings.
         controls: List of control dictionaries belonging to a framework.
         k: Number of candidate chunks to retrieve for each control.
+        max_workers: Controls searched concurrently; ``1`` searches them
+            one after another on the calling thread.
+        quote_workers: Threads extracting quotes in concurrent mode.
 
     Returns:
         A list where each item represents a control with possible policy
         excerpts that address it. Each item contains the ``framework_title``,
         ``control_number``, ``control_language`` and a list of up to three
-        ``policy_excerpts`` strings ranked by relevance.
+        ``policy_excerpts`` strings ranked by relevance.  When ``vectorstore``
+        is a :class:`app.federated.FederatedVectorStore`, items also list the
+        store each excerpt came from in ``excerpt_policies``.
     """
 
-    def _get_text(doc: Any) -> str:
-        """Return the most human readable text from a retrieved document."""
-
-        text = getattr(doc, "page_content", "") or ""
-        if not text and hasattr(doc, "metadata"):
-            meta = getattr(doc, "metadata") or {}
-            if isinstance(meta, dict):
-                text = meta.get("text", "") or meta.get("page_content", "")
-        if not isinstance(text, str):  # Fallback to string representation
-            text = str(text)
-        return text
-
-    def _extract_quote(control_lang: str, policy_text: str) -> str:
-        """Return the most similar sentence from ``policy_text``.
+    quotes = QuoteExtractor()
+    search = _CoverageSearch(vectorstore, controls, k)
+    found: List[Tuple[List[str], List[Any]]] = []
+    if vectorstore is None:
+        found = [([], [])] * len(controls)
+    elif max_workers <= 1 or len(controls) <= 1:
+        for control in controls:
+            try:
+                found.append(_quote(quotes, control, search.documents(control)))
+            except Exception:
+                found.append(([], []))
+    else:
+        with ThreadPoolExecutor(
+            max_workers=max(1, quote_workers), thread_name_prefix="docusec-quotes"
+        ) as quote_pool:
 
-        The search is purely string based to ensure the output is an exact
-        excerpt from the policy document rather than an LLM interpretation.
-        """
+            def _search_then_quote(control: Dict[str, str]) -> Future:
+                docs = search.documents(control)
+                return quote_pool.submit(_quote, quotes, control, docs)
 
-        sentences = re.split(r"(?<=[.!?])\s+", policy_text)
-        best_sentence = policy_text.strip()
-        best_ratio = 0.0
-        control_lower = control_lang.lower()
-        for sentence in sentences:
-            ratio = SequenceMatcher(None, control_lower, sentence.lower()).ratio()
-            if ratio > best_ratio:
-                best_ratio = ratio
-                best_sentence = sentence.strip()
-        return best_sentence
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(controls)),
+                thread_name_prefix="docusec-coverage",
+            ) as search_pool:
+                pending = [search_pool.submit(_search_then_quote, c) for c in controls]
+                for future in pending:
+                    try:
+                        found.append(future.result().result())
+                    except Exception:
+                        found.append(([], []))
 
     results: List[Dict[str, Any]] = []
-    MAX_EXCERPTS = 3
-    for control in controls:
-        excerpts: List[str] = []
-        if vectorstore is not None:
-            try:
-                docs = []
-                if hasattr(vectorstore, "similarity_search_with_relevance_scores"):
-                    doc_scores = vectorstore.similarity_search_with_relevance_scores(
-                        control["control_language"], k=k
-                    )
-                    doc_scores.sort(key=lambda x: x[1], reverse=True)
-                    docs = [doc for doc, _ in doc_scores[:MAX_EXCERPTS]]
-                else:
-                    docs = vectorstore.similarity_search(
-                        control["control_language"], k=k
-                    )[:MAX_EXCERPTS]
-                excerpts = [
-                    _extract_quote(control["control_language"], _get_text(doc))
-                    for doc in docs
-                ]
-            except Exception:
-                excerpts = []
-        results.append(
-            {
-                "framework_title": control["framework_title"],
-                "control_number": control["control_number"],
-                "control_language": control["control_language"],
-                "policy_excerpts": excerpts,
-            }
-        )
+    for control, (excerpts, policies) in zip(controls, found):
+        result = {
+            "framework_title": control["framework_title"],
+            "control_number": control["control_number"],
+            "control_language": control["control_language"],
+            "policy_excerpts": excerpts,
+        }
+        if any(policies):
+            result["excerpt_policies"] = policies
+        results.append(result)
     return results
 
 
+def check_policy_coverage(
+    policies: List[str],
+    framework: str,
+    controls: List[Dict[str, str]],
+    k: int = 8,
+    max_workers: int = COVERAGE_WORKERS,
+    base_dir: Path | str = VECTORSTORE_DIR,
+) -> List[Dict[str, Any]]:
+    """Return :func:`check_framework_coverage` of named policy stores, cached.
+
+    Results are kept in :mod:`app.coverage_cache`, keyed by the content
+    version of every selected store, a hash of ``controls``, ``k`` and
+    :data:`COVERAGE_ALGORITHM_VERSION`.  A repeated check is answered from
+    the cache without loading any store; a changed store or framework is
+    checked afresh.  Several policies are searched together as one
+    :class:`app.federated.FederatedVectorStore`.
+
+    Args:
+        policies: Names of the policy stores to search.
+        framework: Title of the framework ``controls`` belong to.
+        controls: The framework's controls, in reporting order.
+        k: Number of candidate chunks to retrieve for each control.
+        max_workers: Controls searched concurrently.
+        base_dir: Directory where policy vector stores are maintained.
+
+    Raises:
+        ValueError: If no policy is given or a policy store does not exist.
+    """
+    names = list(dict.fromkeys(policies))
+    available = list_vectorstores(base_dir)
+    missing = [name for name in names if name not in available]
+    if not names or missing:
+        raise ValueError(f"Policy store not found: {', '.join(missing)}")
+    # Taken before loading, so results are never cached under a newer version
+    version = ",".join(f"{name}:{store_version(name, base_dir)}" for name in sorted(names))
+    key = (
+        names,
+        framework,
+        k,
+        COVERAGE_ALGORITHM_VERSION,
+        version,
+        coverage_cache.controls_hash(controls),
+    )
+    cached = coverage_cache.lookup(*key)
+    if cached is not None:
+        return cached
+    if len(names) == 1:
+        vectorstore = get_vectorstore(names[0], base_dir)
+    else:
+        vectorstore = FederatedVectorStore.load(names, base_dir)
+    results = check_framework_coverage(vectorstore, controls, k=k, max_workers=max_workers)
+    coverage_cache.store(*key, results)
+    return results
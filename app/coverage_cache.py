@@ -0,0 +1,157 @@
+"""Persistent cache of framework coverage results.
+
+Results of :func:`app.control_mapper.check_framework_coverage` are stored in
+SQLite, one row per policy selection, framework, ``k`` and algorithm version.
+A row also records the content version of the policy stores and a hash of
+the framework's controls it was computed from, so it is only served while
+both are unchanged.  Rows are deleted outright when a policy store is
+rewritten (see :mod:`app.embeddings`) or controls are added to a framework
+(see :func:`app.db.insert_controls`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+COVERAGE_CACHE_PATH = "database/coverage_cache.db"
+
+logger = logging.getLogger(__name__)
+
+# Process-wide lookup totals
+_totals = {"hits": 0, "misses": 0}
+_totals_lock = threading.Lock()
+
+
+def coverage_cache_stats() -> Dict[str, int]:
+    """Return process-wide coverage cache hit and miss counts."""
+    with _totals_lock:
+        return dict(_totals)
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
+    """Ensure the coverage cache table exists."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS coverage (
+            policies TEXT NOT NULL,
+            framework TEXT NOT NULL,
+            k INTEGER NOT NULL,
+            algorithm INTEGER NOT NULL,
+            store_version TEXT NOT NULL,
+            controls_hash TEXT NOT NULL,
+            results TEXT NOT NULL,
+            created REAL NOT NULL,
+            PRIMARY KEY (policies, framework, k, algorithm)
+        )
+        """
+    )
+
+
+def _connect(path: str | None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or COVERAGE_CACHE_PATH)
+    _init_db(conn)
+    return conn
+
+
+def _policy_key(policies: Iterable[str]) -> str:
+    """Return the canonical key of a policy selection (names are comma-free)."""
+    return ",".join(sorted(set(policies)))
+
+
+def controls_hash(controls: Sequence[Dict[str, str]]) -> str:
+    """Return a SHA-256 digest of ``controls``, in order."""
+    material = json.dumps(
+        [
+            [c["framework_title"], c["control_number"], c["control_language"]]
+            for c in controls
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def lookup(
+    policies: Iterable[str],
+    framework: str,
+    k: int,
+    algorithm: int,
+    store_version: str,
+    controls_digest: str,
+    path: str | None = None,
+) -> List[Dict[str, Any]] | None:
+    """Return cached coverage results, or ``None`` when absent or stale."""
+    conn = _connect(path)
+    with conn:
+        row = conn.execute(
+            "SELECT results FROM coverage WHERE policies = ? AND framework = ? "
+            "AND k = ? AND algorithm = ? AND store_version = ? AND controls_hash = ?",
+            (_policy_key(policies), framework, k, algorithm, store_version, controls_digest),
+        ).fetchone()
+    conn.close()
+    with _totals_lock:
+        _totals["hits" if row else "misses"] += 1
+    return json.loads(row[0]) if row else None
+
+
+def store(
+    policies: Iterable[str],
+    framework: str,
+    k: int,
+    algorithm: int,
+    store_version: str,
+    controls_digest: str,
+    results: List[Dict[str, Any]],
+    path: str | None = None,
+) -> None:
+    """Save coverage results, replacing any older entry for the same request."""
+    conn = _connect(path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO coverage (policies, framework, k, algorithm, "
+            "store_version, controls_hash, results, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                _policy_key(policies),
+                framework,
+                k,
+                algorithm,
+                store_version,
+                controls_digest,
+                json.dumps(results, ensure_ascii=False),
+                time.time(),
+            ),
+        )
+    conn.close()
+
+
+def _delete(where: str, params: Sequence[Any], path: str | None) -> None:
+    """Delete matching rows; a cache that does not exist yet is left alone.
+
+    Failures are logged rather than raised: entries are keyed by content
+    version, so one that survives is never served for changed content.
+    """
+    if not Path(path or COVERAGE_CACHE_PATH).exists():
+        return
+    try:
+        conn = _connect(path)
+        with conn:
+            conn.executemany(f"DELETE FROM coverage WHERE {where}", params)
+        conn.close()
+    except sqlite3.Error as err:
+        logger.warning("Could not invalidate coverage cache: %s", err)
+
+
+def invalidate_policy(name: str, path: str | None = None) -> None:
+    """Drop cached results of every selection that includes policy ``name``."""
+    _delete("instr(',' || policies || ',', ?) > 0", [(f",{name},",)], path)
+
+
+def invalidate_frameworks(titles: Iterable[str], path: str | None = None) -> None:
+    """Drop cached results of the frameworks named in ``titles``."""
+    _delete("framework = ?", [(title,) for title in set(titles)], path)
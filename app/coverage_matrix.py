@@ -0,0 +1,131 @@
+"""Tiled control × chunk cosine similarity for framework coverage.
+
+Instead of one vector-store search per control, :func:`top_k_cosine` scores
+every control against every policy chunk with blocked matrix products and
+keeps the best ``k`` chunks per control with ``argpartition``.  The matrix is
+processed in tiles of :data:`COVERAGE_TILE_ROWS` controls by
+:data:`COVERAGE_TILE_COLS` chunks, so memory stays bounded however large the
+store is.
+
+Exact-search stores expose their chunk vectors through
+:func:`chunk_vectors`: FAISS stores with a flat index (read without copying)
+and memory-mapped flat stores (dequantized tile by tile).  Approximate
+indexes return ``None``; they exist to avoid scanning every chunk, so their
+coverage checks keep searching per control.
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+from .ann_index import faiss
+from .flatstore import FlatVectorStore
+
+COVERAGE_TILE_ROWS = 256  # Controls per tile
+COVERAGE_TILE_COLS = 16384  # Chunks per tile
+
+
+def chunk_vectors(vectorstore: Any) -> Tuple[Any, np.ndarray | None] | None:
+    """Return ``(vectors, scales)`` for the chunks of an exact-search store.
+
+    ``vectors`` is an array (possibly memory-mapped or quantized) with one
+    row per chunk in store order; ``scales`` is the int8 per-dimension scale
+    or ``None``.  Returns ``None`` for stores whose vectors are not directly
+    available.
+    """
+    if isinstance(vectorstore, FlatVectorStore):
+        return vectorstore.vectors, vectorstore.scales
+    index = getattr(vectorstore, "index", None)
+    if (
+        faiss is None
+        or not hasattr(vectorstore, "index_to_docstore_id")
+        or not isinstance(index, faiss.IndexFlat)
+    ):
+        return None
+    if not index.ntotal:
+        return np.zeros((0, index.d), dtype=np.float32), None
+    data = faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d)
+    return data.reshape(index.ntotal, index.d), None
+
+
+def chunk_documents(vectorstore: Any, positions: Sequence[int]) -> List[Any]:
+    """Return the documents stored at row ``positions`` of ``vectorstore``."""
+    if isinstance(vectorstore, FlatVectorStore):
+        return vectorstore.documents(positions)
+    return [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(position)])
+        for position in positions
+    ]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _best(scores: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keep the ``k`` highest ``scores`` of each row, unordered."""
+    if scores.shape[1] <= k:
+        return scores, ids
+    keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, keep, axis=1), np.take_along_axis(ids, keep, axis=1)
+
+
+def top_k_cosine(
+    queries: Any,
+    corpus: Any,
+    k: int,
+    scales: np.ndarray | None = None,
+    tile_rows: int = COVERAGE_TILE_ROWS,
+    tile_cols: int = COVERAGE_TILE_COLS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``k`` most cosine-similar ``corpus`` rows for every query.
+
+    Args:
+        queries: Matrix of shape ``(m, dim)``.
+        corpus: Matrix of shape ``(n, dim)``; may be memory-mapped or
+            quantized (see ``scales``).
+        k: Number of neighbours per query.
+        scales: Per-dimension int8 scales of ``corpus``, if quantized.
+        tile_rows: Queries scored per tile.
+        tile_cols: Corpus rows scored per tile.
+
+    Returns:
+        A tuple ``(indices, similarities)`` of shape ``(m, min(k, n))``,
+        most similar first; equal scores are ordered by corpus position.
+    """
+    queries = _normalize(np.asarray(queries, dtype=np.float32))
+    count = len(corpus)
+    k = min(k, count)
+    if not k or not len(queries):
+        empty = np.zeros((len(queries), k))
+        return empty.astype(np.int64), empty.astype(np.float32)
+
+    indices = np.empty((len(queries), k), dtype=np.int64)
+    similarities = np.empty((len(queries), k), dtype=np.float32)
+    for row in range(0, len(queries), tile_rows):
+        query_tile = queries[row : row + tile_rows]
+        best_scores = np.empty((len(query_tile), 0), dtype=np.float32)
+        best_ids = np.empty((len(query_tile), 0), dtype=np.int64)
+        for col in range(0, count, tile_cols):
+            block = np.asarray(corpus[col : col + tile_cols], dtype=np.float32)
+            if scales is not None:
+                block = block * scales
+            norms = np.linalg.norm(block, axis=1)
+            norms[norms == 0] = 1.0
+            scores = (query_tile @ block.T) / norms
+            ids = np.broadcast_to(np.arange(col, col + len(block)), scores.shape)
+            scores, ids = _best(scores, ids, k)
+            best_scores, best_ids = _best(
+                np.concatenate([best_scores, scores], axis=1),
+                np.concatenate([best_ids, ids], axis=1),
+                k,
+            )
+        # Sort by score, then by position so ties keep corpus order
+        order = np.lexsort((best_ids, -best_scores), axis=1)
+        indices[row : row + len(query_tile)] = np.take_along_axis(best_ids, order, axis=1)
+        similarities[row : row + len(query_tile)] = np.take_along_axis(best_scores, order, axis=1)
+    return indices, similarities
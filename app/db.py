@@ -3,6 +3,7 @@ import io
 import sqlite3
 from typing import Dict, Iterable, List
 
+from .coverage_cache import invalidate_frameworks
 from .validation import validate_input
 
 DB_PATH = "database/frameworks.db"
@@ -49,6 +50,8 @@ def insert_controls(rows: Iterable[Dict[str, str]], db_path: str = DB_PATH) -> i
             ],
         )
     conn.close()
+    # Cached coverage of these frameworks no longer lists all their controls
+    invalidate_frameworks(row["framework_title"] for row in rows)
     return len(rows)
 
 
@@ -0,0 +1,152 @@
+"""Content-addressed cache of parsed, chunked and embedded documents."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from .embeddings import load_vectorstore, save_vectorstore
+
+DOC_CACHE_DIR = Path("doc_cache")
+MAX_DOC_CACHE_BYTES = int(os.getenv("DOCUSEC_DOC_CACHE_BYTES", str(2 * 1024**3)))  # 2GB
+# Evict down to this fraction of the limit so eviction does not run per commit.
+_EVICT_TARGET = 0.9
+# Bump whenever parsing or chunking changes so stale entries are not reused.
+CHUNKER_VERSION = 2
+
+_INDEX_NAME = "index"
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(
+    digest: str, chunk_size: int = 250, overlap: int = 50, filetype: str | None = None
+) -> str:
+    """Return the cache key for a document and its parsing parameters.
+
+    Args:
+        digest: Hex SHA-256 digest of the uploaded file bytes.
+        chunk_size: Chunk size passed to :func:`app.ingestion.iter_chunks`.
+        overlap: Chunk overlap passed to :func:`app.ingestion.iter_chunks`.
+        filetype: Format detected by :func:`app.ingestion.detect_filetype`;
+            the same bytes parse differently as PDF, DOCX or plain text.
+    """
+    material = f"{digest}:{chunk_size}:{overlap}:{filetype}:{CHUNKER_VERSION}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def load_cached(key: str, base_dir: Path | str = DOC_CACHE_DIR) -> Tuple[Any, int] | None:
+    """Return ``(vectorstore, chunk_count)`` for a cached document, if any."""
+    entry = Path(base_dir) / key
+    meta_path = entry / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    os.utime(meta_path)  # Mark as recently used for eviction
+    return load_vectorstore(_INDEX_NAME, base_dir=entry), meta["chunks"]
+
+
+class CacheEntry:
+    """A cache entry being written while a document streams through ingestion.
+
+    Pages and chunks are recorded as they pass through :meth:`record_pages`
+    and :meth:`record_chunks`.  Everything is written to a private temporary
+    directory that only becomes visible under the cache key once
+    :meth:`commit` succeeds, so readers never observe partial entries.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        base_dir: Path | str = DOC_CACHE_DIR,
+        max_bytes: int = MAX_DOC_CACHE_BYTES,
+    ) -> None:
+        self.key = key
+        self.base_dir = Path(base_dir)
+        self.max_bytes = max_bytes
+        self.tmp_dir = self.base_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        self.tmp_dir.mkdir(parents=True)
+        self.chunks = 0
+
+    def record_pages(self, pages: Iterable[str]) -> Iterator[str]:
+        """Yield ``pages`` unchanged while writing the extracted text."""
+        with open(self.tmp_dir / "text.txt", "w", encoding="utf-8") as out:
+            for number, page in enumerate(pages):
+                if number:
+                    out.write("\n")
+                out.write(page)
+                yield page
+
+    def record_chunks(
+        self, chunks: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``chunks`` unchanged while writing them as JSON lines."""
+        with open(self.tmp_dir / "chunks.jsonl", "w", encoding="utf-8") as out:
+            for chunk, meta in chunks:
+                out.write(json.dumps({"text": chunk, "metadata": meta}) + "\n")
+                self.chunks += 1
+                yield chunk, meta
+
+    def commit(self, vectorstore: Any) -> None:
+        """Persist ``vectorstore`` and publish the entry under its key."""
+        save_vectorstore(vectorstore, _INDEX_NAME, base_dir=self.tmp_dir)
+        (self.tmp_dir / "meta.json").write_text(
+            json.dumps({"chunks": self.chunks}), encoding="utf-8"
+        )
+        try:
+            os.rename(self.tmp_dir, self.base_dir / self.key)
+        except OSError:
+            # A concurrent ingest of the same document got there first
+            self.discard()
+        evict(self.base_dir, self.max_bytes)
+
+    def discard(self) -> None:
+        """Remove the temporary directory of an abandoned entry."""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+
+
+def evict(base_dir: Path | str = DOC_CACHE_DIR, max_bytes: int = MAX_DOC_CACHE_BYTES) -> int:
+    """Remove least recently used entries once the cache exceeds ``max_bytes``.
+
+    Entries are aged by the modification time of their ``meta.json``, which
+    :func:`load_cached` refreshes on every hit.  In-progress entries are never
+    touched.
+
+    Returns:
+        The number of entries removed.
+    """
+    entries = []
+    for entry in Path(base_dir).iterdir():
+        meta_path = entry / "meta.json"
+        if entry.name.startswith(".") or not meta_path.exists():
+            continue
+        entries.append((meta_path.stat().st_mtime, entry, _entry_size(entry)))
+    total = sum(size for _, _, size in entries)
+    if total <= max_bytes:
+        return 0
+    target = int(max_bytes * _EVICT_TARGET)
+    removed = 0
+    for _, entry, size in sorted(entries, key=lambda e: e[0]):
+        if total <= target:
+            break
+        # Hide the entry from readers before deleting it
+        doomed = entry.with_name(f".{entry.name}.{uuid.uuid4().hex}.evict")
+        try:
+            os.rename(entry, doomed)
+        except OSError:
+            continue
+        shutil.rmtree(doomed, ignore_errors=True)
+        total -= size
+        removed += 1
+    logger.info("Evicted %d cached documents", removed)
+    return removed
@@ -0,0 +1,198 @@
+"""Persistent cache of chunk embeddings keyed by normalized text and model."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Sequence
+
+try:  # pragma: no cover - optional dependency
+    from langchain_core.embeddings import Embeddings
+except Exception:  # pragma: no cover - executed only when package missing
+    Embeddings = object  # type: ignore[assignment,misc]
+
+EMBEDDING_CACHE_PATH = "database/embedding_cache.db"
+MAX_CACHE_BYTES = 512 * 1024 * 1024  # 512MB of stored vectors
+# Evict down to this fraction of the limit so eviction does not run per insert.
+_EVICT_TARGET = 0.9
+# Stay well below SQLite's limit on bound parameters per statement.
+_SQL_BATCH = 500
+
+logger = logging.getLogger(__name__)
+
+# Process-wide totals across all CachedEmbeddings instances
+_totals = {"hits": 0, "misses": 0}
+_totals_lock = threading.Lock()
+
+
+def cache_stats() -> Dict[str, int]:
+    """Return process-wide embedding cache hit and miss counts."""
+    with _totals_lock:
+        return dict(_totals)
+
+
+def _init_db(conn: sqlite3.Connection) -> None:
+    """Ensure the embeddings cache table exists."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            key TEXT PRIMARY KEY,
+            vector BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+    )
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially reformatted chunks share an entry."""
+    return " ".join(text.split())
+
+
+def cache_key(text: str, model: str) -> str:
+    """Return the cache key for ``text`` embedded with ``model``."""
+    material = f"{model}\0{normalize_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def model_name(embeddings: Any) -> str:
+    """Best-effort identifier of the model behind an embeddings object.
+
+    Wrappers that keep their provider in ``embeddings`` (such as
+    :class:`app.embedding_executor.BatchedEmbeddings`) are looked through.
+    """
+    while hasattr(embeddings, "embeddings"):
+        embeddings = embeddings.embeddings
+    for attr in ("model", "model_name"):
+        name = getattr(embeddings, attr, None)
+        if isinstance(name, str) and name:
+            return f"{type(embeddings).__name__}:{name}"
+    return type(embeddings).__name__
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends unseen document texts to the provider.
+
+    Vectors are stored as float32 blobs in SQLite, keyed by
+    :func:`cache_key`.  When the stored vectors exceed ``max_bytes`` the least
+    recently used entries are evicted.  Hit and miss counts are available via
+    :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        db_path: str = EMBEDDING_CACHE_PATH,
+        max_bytes: int = MAX_CACHE_BYTES,
+    ) -> None:
+        self.embeddings = embeddings
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.model = model_name(embeddings)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return this instance's cache hits and misses so far."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        _init_db(conn)
+        return conn
+
+    def _lookup(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        conn = self._connect()
+        with conn:
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = list(keys[start : start + _SQL_BATCH])
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+                if rows:
+                    conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({marks})",
+                        [time.time(), *batch],
+                    )
+        conn.close()
+        return found
+
+    def _store(self, vectors: Dict[str, List[float]]) -> None:
+        now = time.time()
+        rows = []
+        for key, vector in vectors.items():
+            blob = array("f", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict(conn)
+        conn.close()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries once the cache exceeds its limit."""
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - int(self.max_bytes * _EVICT_TARGET)
+        freed = 0
+        victims = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM embeddings ORDER BY last_used"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        logger.info("Evicted %d cached embeddings (%d bytes)", len(victims), freed)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed ``texts``, reusing cached vectors where available.
+
+        Only texts found in the cache count as hits; repeats of an uncached
+        text within ``texts`` are embedded once but still count as misses.
+        """
+        keys = [cache_key(text, self.model) for text in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+        hits = sum(1 for key in keys if key in found)
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing, vectors))
+            self._store(fresh)
+            found.update(fresh)
+        with _totals_lock:
+            self.hits += hits
+            self.misses += len(texts) - hits
+            _totals["hits"] += hits
+            _totals["misses"] += len(texts) - hits
+        logger.debug("Embedding cache: %d hits, %d misses", hits, len(texts) - hits)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query directly with the provider.
+
+        Queries are user input rather than document chunks, so they are
+        neither persisted nor counted.
+        """
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,178 @@
+"""Batched, concurrent embedding requests with retry and metrics."""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+try:  # pragma: no cover - optional dependency
+    from langchain_core.embeddings import Embeddings
+except Exception:  # pragma: no cover - executed only when package missing
+    Embeddings = object  # type: ignore[assignment,misc]
+
+EMBED_REQUEST_BATCH_SIZE = int(os.getenv("DOCUSEC_EMBED_REQUEST_BATCH", "128"))
+EMBED_CONCURRENCY = int(os.getenv("DOCUSEC_EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("DOCUSEC_EMBED_MAX_RETRIES", "5"))
+EMBED_BACKOFF_SECONDS = 0.5  # First retry delay; doubles per attempt
+EMBED_MAX_BACKOFF_SECONDS = 30.0
+# Recent batch latencies kept for percentile reporting
+_LATENCY_WINDOW = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _is_retryable(err: Exception) -> bool:
+    """Return ``True`` for rate limits, timeouts and server-side failures.
+
+    HTTP errors are classified by status code when the exception carries one
+    (as OpenAI and httpx errors do); other errors are retried unless they are
+    ``ValueError``/``TypeError``, which indicate a bad request.
+    """
+    status = getattr(err, "status_code", None)
+    if status is None:
+        status = getattr(getattr(err, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    return not isinstance(err, (ValueError, TypeError))
+
+
+class EmbeddingMetrics:
+    """Thread-safe counters and latencies for embedding batches."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self.batches = 0
+            self.texts = 0
+            self.retries = 0
+            self.failures = 0
+            self.busy_seconds = 0.0
+            self._latencies: List[float] = []
+
+    def record(self, texts: int, seconds: float) -> None:
+        """Record a successful batch of ``texts`` that took ``seconds``."""
+        with self._lock:
+            self.batches += 1
+            self.texts += texts
+            self.busy_seconds += seconds
+            self._latencies.append(seconds)
+            del self._latencies[:-_LATENCY_WINDOW]
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters plus batch latency percentiles and throughput.
+
+        ``texts_per_second`` is texts embedded per second spent inside
+        successful provider calls, summed over concurrent batches.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            snapshot: Dict[str, Any] = {
+                "batches": self.batches,
+                "texts": self.texts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "texts_per_second": round(self.texts / self.busy_seconds, 2)
+                if self.busy_seconds
+                else 0.0,
+            }
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("max", 1.0)):
+            value = latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+            snapshot[f"latency_{name}_seconds"] = round(value, 6)
+        return snapshot
+
+
+# Process-wide metrics across all BatchedEmbeddings instances
+metrics = EmbeddingMetrics()
+
+
+def embedding_metrics() -> Dict[str, Any]:
+    """Return process-wide embedding batch metrics."""
+    return metrics.snapshot()
+
+
+class BatchedEmbeddings(Embeddings):
+    """Embeddings wrapper that splits requests into concurrent, retried batches.
+
+    ``embed_documents`` cuts its input into batches of ``batch_size`` texts
+    and sends at most ``concurrency`` of them to the provider at once.  Each
+    failed batch is retried up to ``max_retries`` times with exponential
+    backoff and jitter when the error is transient (see
+    :func:`_is_retryable`).  Vectors are returned in input order.  Latency and
+    throughput of every batch are recorded in :data:`metrics`.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        batch_size: int = EMBED_REQUEST_BATCH_SIZE,
+        concurrency: int = EMBED_CONCURRENCY,
+        max_retries: int = EMBED_MAX_RETRIES,
+        backoff: float = EMBED_BACKOFF_SECONDS,
+        max_backoff: float = EMBED_MAX_BACKOFF_SECONDS,
+    ) -> None:
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as err:
+                if attempt >= self.max_retries or not _is_retryable(err):
+                    metrics.record_failure()
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2**attempt)
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                metrics.record_retry()
+                logger.warning(
+                    "Embedding batch of %d failed (%s); retry %d in %.1fs",
+                    len(texts), err, attempt, delay,
+                )
+                time.sleep(delay)
+                continue
+            metrics.record(len(texts), time.perf_counter() - start)
+            return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed ``texts`` in concurrent batches, preserving their order."""
+        batches = [
+            texts[start : start + self.batch_size]
+            for start in range(0, len(texts), self.batch_size)
+        ]
+        if len(batches) <= 1 or self.concurrency <= 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.concurrency, len(batches)),
+                thread_name_prefix="docusec-embed",
+            ) as pool:
+                results = list(pool.map(self._embed_batch, batches))
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string directly with the provider."""
+        return self.embeddings.embed_query(text)
@@ -1,19 +1,176 @@
-from typing import List, Dict, Any
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple
 from pathlib import Path
 
+from .ann_index import delete_ids, merge_into, reindex
+from .coverage_cache import invalidate_policy
+from .embedding_cache import CachedEmbeddings
+from .embedding_executor import EMBED_CONCURRENCY, EMBED_REQUEST_BATCH_SIZE, BatchedEmbeddings
+from .flatstore import FlatVectorStore, is_flat_store, write_flat_store
+from .providers import get_provider
 from .utils import trace
 
 try:  # pragma: no cover - optional community dependency
-    from langchain.embeddings import OpenAIEmbeddings
     from langchain.vectorstores import FAISS
 except Exception:  # pragma: no cover - executed only when packages missing
-    OpenAIEmbeddings = None  # type: ignore[assignment]
     FAISS = None  # type: ignore[assignment]
 
 VECTORSTORE_DIR = Path("vector_store")
+# Chunks handed to the embeddings client per batch: enough for a full round of
+# concurrent provider requests (see app.embedding_executor)
+EMBED_BATCH_SIZE = EMBED_CONCURRENCY * EMBED_REQUEST_BATCH_SIZE
+EMBED_PREFETCH_BATCHES = 2  # Batches chunked ahead while one is embedding
+# Incremental updates are written as numbered delta segments next to a store's
+# snapshot; once this many accumulate the store is rewritten as one snapshot.
+MAX_DELTAS = 32
+_DELTA_DIR = "deltas"
 
+# On-disk format written by save_vectorstore: "faiss" (FAISS index plus pickled
+# docstore, supports incremental updates) or "flat" (memory-mapped vectors plus
+# SQLite, see app.flatstore)
+VECTORSTORE_FORMAT = os.getenv("DOCUSEC_VECTORSTORE_FORMAT", "faiss")
+# Vector encoding of flat stores: "none" (float32), "float16" or "int8"
+VECTORSTORE_QUANTIZATION = os.getenv("DOCUSEC_VECTORSTORE_QUANTIZATION", "none")
+_FAISS_FILES = ("index.faiss", "index.pkl")
+_FLAT_FILES = ("meta.json", "vectors.npy", "scales.npy", "norms.npy", "chunks.db")
+# Loaded stores kept in memory by get_vectorstore
+STORE_CACHE_SIZE = int(os.getenv("DOCUSEC_STORE_CACHE_SIZE", "8"))
 
-def embed_and_store(texts: List[str], metadatas: List[Dict[str, Any]] | None = None):
+logger = logging.getLogger(__name__)
+
+# One lock per store directory serialises read-modify-write updates within
+# this process (e.g. an API handler and a bulk ingestion job).
+_store_locks: Dict[Path, threading.RLock] = {}
+_store_locks_guard = threading.Lock()
+
+
+def _store_lock(path: Path) -> threading.RLock:
+    """Return the lock guarding updates to the store at ``path``."""
+    key = path.resolve()
+    with _store_locks_guard:
+        return _store_locks.setdefault(key, threading.RLock())
+
+
+class _StoreCache:
+    """Size-bounded LRU of loaded vector stores.
+
+    Entries are keyed by store directory and remember the on-disk version
+    they were loaded from, so a store changed by another process is reloaded
+    on its next lookup.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[Path, Tuple[Tuple, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: Path, version: Tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, path: Path, version: Tuple, vectorstore: Any) -> None:
+        with self._lock:
+            self._entries[path] = (version, vectorstore)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                logger.info("Evicted vector store %s from memory", evicted.name)
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+_store_cache = _StoreCache(STORE_CACHE_SIZE)
+
+
+def _invalidate(path: Path) -> None:
+    """Forget what is cached about the store at ``path`` before it is rewritten.
+
+    Only stores under :data:`VECTORSTORE_DIR` are named policies with cached
+    coverage results; document cache indexes and framework stores use the
+    same writers but live elsewhere.
+    """
+    path = path.resolve()
+    _store_cache.invalidate(path)
+    if path.parent == Path(VECTORSTORE_DIR).resolve():
+        invalidate_policy(path.name)
+
+
+def _store_version(path: Path) -> Tuple:
+    """Return a token that changes whenever the store at ``path`` is rewritten."""
+    files = [f for f in path.iterdir() if f.is_file()]
+    files.extend(_list_deltas(path))
+    return tuple(
+        (f.name, st.st_mtime_ns, st.st_size)
+        for f in files
+        for st in [f.stat()]
+    )
+
+
+def store_version(name: str, base_dir: Path | str = VECTORSTORE_DIR) -> str:
+    """Return a digest that changes whenever the named store is rewritten."""
+    path = Path(base_dir) / Path(name).name
+    version = json.dumps(_store_version(path))
+    return hashlib.sha256(version.encode("utf-8")).hexdigest()
+
+
+def get_vectorstore(name: str, base_dir: Path | str = VECTORSTORE_DIR) -> Any:
+    """Return a named store, reusing an in-memory copy when it is current.
+
+    Unlike :func:`load_vectorstore`, repeated calls share one loaded object,
+    so callers must treat it as read-only.  Entries are keyed by name and
+    the on-disk modification times of the store's files; writes through
+    :func:`save_vectorstore`, :func:`append_chunks` and
+    :func:`delete_document` drop the entry immediately.
+    """
+    path = (Path(base_dir) / Path(name).name).resolve()
+    version = _store_version(path)
+    vectorstore = _store_cache.get(path, version)
+    if vectorstore is None:
+        vectorstore = load_vectorstore(name, base_dir=base_dir)
+        _store_cache.put(path, version, vectorstore)
+    return vectorstore
+
+
+def store_cache_stats() -> Dict[str, int]:
+    """Return hits, misses and evictions of the loaded-store cache."""
+    return _store_cache.stats()
+
+
+def embed_and_store(
+    texts: List[str],
+    metadatas: List[Dict[str, Any]] | None = None,
+    index_type: str | None = None,
+):
     """Create embeddings for text chunks and store them in a FAISS vector store.
 
     Args:
@@ -21,36 +178,192 @@ def embed_and_store(texts: List[str], metadatas: List[Dict[str, Any]] | None = N
         metadatas: Optional list of metadata dictionaries to associate with each
             text.  When provided, the metadata at index ``i`` will be stored
             alongside ``texts[i]`` in the resulting vector store.
+        index_type: FAISS index to search with: ``flat``, ``ivf``, ``hnsw``,
+            ``ivfpq`` or ``auto`` (by corpus size).  Defaults to
+            :data:`app.ann_index.VECTOR_INDEX_TYPE`.
 
     Returns:
         A FAISS vector store containing the embedded texts and their metadata.
     """
-    if OpenAIEmbeddings is None or FAISS is None:
-        raise ImportError("LangChain community embeddings/vectorstores are unavailable")
+    if FAISS is None:
+        raise ImportError("LangChain community vectorstores are unavailable")
     with trace(
         "embeddings.embed_and_store",
         inputs={"texts": texts, "metadatas": metadatas},
     ):
-        embeddings = OpenAIEmbeddings()
+        embeddings = get_embeddings()
         vectorstore = FAISS.from_texts(texts, embeddings, metadatas=metadatas)
+        reindex(vectorstore, index_type)
     return vectorstore
 
 
+def get_embeddings() -> Any:
+    """Return the embeddings client used for ingestion and retrieval.
+
+    The provider is selected with :func:`app.providers.get_provider`.  Calls
+    to remote providers go through a persistent :class:`CachedEmbeddings`
+    layer so chunks that were embedded before are loaded from disk instead;
+    the remaining texts are sent in concurrent, retried batches by
+    :class:`BatchedEmbeddings`.
+    """
+    provider = get_provider()
+    if not getattr(provider, "cacheable", True):
+        return provider
+    return CachedEmbeddings(BatchedEmbeddings(provider))
+
+
+def _batched(
+    chunks: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int
+) -> Iterator[Tuple[List[str], List[Dict[str, Any]]]]:
+    """Group ``(text, metadata)`` pairs into ``(texts, metadatas)`` batches."""
+    iterator = iter(chunks)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield [text for text, _ in batch], [meta for _, meta in batch]
+
+
+def embed_chunks(
+    chunks: Iterable[Tuple[str, Dict[str, Any]]],
+    batch_size: int = EMBED_BATCH_SIZE,
+    prefetch: int = EMBED_PREFETCH_BATCHES,
+    on_batch: Callable[[int], None] | None = None,
+    keyed: bool = False,
+    index_type: str | None = None,
+) -> Tuple[Any, int]:
+    """Embed a stream of ``(text, metadata)`` pairs into a FAISS vector store.
+
+    ``chunks`` is consumed in a background thread that groups it into batches
+    of ``batch_size``, staying at most ``prefetch`` batches ahead of the
+    embedding calls.  Producing chunks (parsing and splitting a document, see
+    :func:`app.ingestion.iter_chunks`) therefore overlaps with embedding while
+    only a bounded number of chunks is held in memory at any time.
+    ``on_batch`` is called with the running chunk count after each batch.
+    With ``keyed`` set, every metadata dictionary must carry ``doc_id`` and
+    ``chunk`` (the chunk's position in its document); they become the
+    docstore ids, so documents can later be removed with
+    :func:`delete_document`.  Once every chunk is embedded the index is
+    rebuilt as ``index_type`` (see :func:`embed_and_store`).
+
+    Returns:
+        A tuple ``(vectorstore, count)`` with the FAISS vector store and the
+        number of chunks embedded.
+
+    Raises:
+        ValueError: If ``chunks`` is empty.
+    """
+    if FAISS is None:
+        raise ImportError("LangChain community vectorstores are unavailable")
+
+    batches: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def _put(item: Any) -> None:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce() -> None:
+        try:
+            for batch in _batched(chunks, batch_size):
+                _put(batch)
+                if stop.is_set():
+                    return
+        except BaseException as err:  # Re-raised in the consuming thread
+            _put(err)
+            return
+        _put(done)
+
+    producer = threading.Thread(target=_produce, name="embed-chunks", daemon=True)
+    producer.start()
+    vectorstore = None
+    count = 0
+    try:
+        with trace(
+            "embeddings.embed_chunks",
+            inputs={"batch_size": batch_size, "prefetch": prefetch},
+        ):
+            embeddings = get_embeddings()
+            while True:
+                item = batches.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                texts, metadatas = item
+                ids = None
+                if keyed:
+                    ids = [_chunk_id(m["doc_id"], m["chunk"]) for m in metadatas]
+                if vectorstore is None:
+                    vectorstore = FAISS.from_texts(
+                        texts, embeddings, metadatas=metadatas, ids=ids
+                    )
+                else:
+                    vectorstore.add_texts(texts, metadatas=metadatas, ids=ids)
+                count += len(texts)
+                if on_batch is not None:
+                    on_batch(count)
+    finally:
+        stop.set()
+        producer.join()
+    if vectorstore is None:
+        raise ValueError("No chunks to embed")
+    return reindex(vectorstore, index_type), count
+
+
 def save_vectorstore(
-    vectorstore: Any, name: str, base_dir: Path | str = VECTORSTORE_DIR
+    vectorstore: Any,
+    name: str,
+    base_dir: Path | str = VECTORSTORE_DIR,
+    format: str | None = None,
+    quantization: str | None = None,
 ) -> None:
     """Persist a vector store to disk under a given name.
 
     Args:
-        vectorstore: The FAISS vector store instance to persist.
+        vectorstore: The FAISS or flat vector store instance to persist.
         name: Identifier for the stored policy.
         base_dir: Directory where policy vector stores are maintained.
+        format: ``"faiss"`` or ``"flat"``; defaults to
+            :data:`VECTORSTORE_FORMAT`.
+        quantization: Vector encoding of flat stores: ``"none"``,
+            ``"float16"`` or ``"int8"``; defaults to
+            :data:`VECTORSTORE_QUANTIZATION`.  FAISS stores are always
+            float32.
     """
 
+    format = format or VECTORSTORE_FORMAT
+    if format not in ("faiss", "flat"):
+        raise ValueError(f"Unknown vector store format: {format}")
+    if format == "faiss" and quantization not in (None, "none"):
+        raise ValueError("Quantized vectors require format='flat'")
+    quantization = quantization or VECTORSTORE_QUANTIZATION
     safe_name = Path(name).name
     path = Path(base_dir) / safe_name
     path.mkdir(parents=True, exist_ok=True)
-    vectorstore.save_local(str(path))
+    with _store_lock(path):
+        _invalidate(path)
+        if format == "flat":
+            texts, metadatas, vectors = store_contents(vectorstore)
+            write_flat_store(
+                path, texts, metadatas, vectors, _store_ids(vectorstore), quantization
+            )
+            stale = _FAISS_FILES
+        else:
+            if not hasattr(vectorstore, "save_local"):
+                vectorstore = _to_faiss(vectorstore)
+            vectorstore.save_local(str(path))
+            stale = _FLAT_FILES
+        for stale_file in stale:
+            (path / stale_file).unlink(missing_ok=True)
+        # A full snapshot supersedes any incremental updates.  Should this be
+        # interrupted, replaying the leftover deltas is idempotent.
+        shutil.rmtree(path / _DELTA_DIR, ignore_errors=True)
 
 
 def list_vectorstores(base_dir: Path | str = VECTORSTORE_DIR) -> List[str]:
@@ -65,16 +378,217 @@ def list_vectorstores(base_dir: Path | str = VECTORSTORE_DIR) -> List[str]:
 def load_vectorstore(name: str, base_dir: Path | str = VECTORSTORE_DIR):
     """Load a previously saved vector store by name."""
 
-    if OpenAIEmbeddings is None or FAISS is None:
-        raise ImportError(
-            "LangChain community embeddings/vectorstores are unavailable"
-        )
+    if FAISS is None:
+        raise ImportError("LangChain community vectorstores are unavailable")
     safe_name = Path(name).name
     path = Path(base_dir) / safe_name
-    embeddings = OpenAIEmbeddings()
+    embeddings = get_embeddings()
+    if is_flat_store(path):
+        return FlatVectorStore.load(path, embeddings)
     # Explicitly disable dangerous deserialization to avoid executing
     # arbitrary code when loading persisted vector stores.
-    return FAISS.load_local(
+    vectorstore = FAISS.load_local(
         str(path), embeddings, allow_dangerous_deserialization=True
     )
+    for delta in _list_deltas(path):
+        if delta.suffix == ".add":
+            added = FAISS.load_local(
+                str(delta), embeddings, allow_dangerous_deserialization=True
+            )
+            # Chunks already in the snapshot (left over from an interrupted
+            # compaction) are replaced rather than merged twice
+            present = set(vectorstore.index_to_docstore_id.values()).intersection(
+                added.index_to_docstore_id.values()
+            )
+            if present:
+                delete_ids(vectorstore, list(present))
+            merge_into(vectorstore, added)
+        else:
+            doc_id = json.loads(delta.read_text(encoding="utf-8"))["doc_id"]
+            ids = document_chunk_ids(vectorstore, doc_id)
+            if ids:
+                delete_ids(vectorstore, ids)
+    return vectorstore
+
+
+def _list_deltas(path: Path) -> List[Path]:
+    """Return the delta segments of the store at ``path`` in apply order."""
+    delta_dir = path / _DELTA_DIR
+    if not delta_dir.exists():
+        return []
+    return sorted(delta_dir.iterdir(), key=lambda p: int(p.name.split(".")[0]))
+
+
+def _write_delta(path: Path, kind: str) -> Path:
+    """Return the path for the next ``kind`` (``add``/``delete``) delta.
+
+    Callers must hold :func:`_store_lock` for ``path`` until the delta is
+    written, or concurrent updates could pick the same number.
+    """
+    deltas = _list_deltas(path)
+    number = int(deltas[-1].name.split(".")[0]) + 1 if deltas else 1
+    (path / _DELTA_DIR).mkdir(parents=True, exist_ok=True)
+    return path / _DELTA_DIR / f"{number:06d}.{kind}"
+
+
+def _require_faiss_format(path: Path) -> None:
+    """Reject incremental updates to read-only flat stores."""
+    if is_flat_store(path):
+        raise ValueError(
+            f"Store {path.name} uses the read-only flat format; re-save it with "
+            "format='faiss' to update it incrementally"
+        )
+
+
+def _chunk_id(doc_id: str, position: int) -> str:
+    """Return the docstore id of chunk ``position`` of document ``doc_id``."""
+    return f"{doc_id}:{position}"
+
+
+def document_chunk_ids(vectorstore: Any, doc_id: str) -> List[str]:
+    """Return the docstore ids of every chunk of ``doc_id`` in ``vectorstore``."""
+    prefix = f"{doc_id}:"
+    return [i for i in vectorstore.index_to_docstore_id.values() if i.startswith(prefix)]
+
+
+def list_documents(vectorstore: Any) -> List[str]:
+    """Return the sorted ids of documents added with :func:`append_chunks`."""
+    return sorted(
+        {i.rsplit(":", 1)[0] for i in vectorstore.index_to_docstore_id.values() if ":" in i}
+    )
+
+
+def _store_ids(vectorstore: Any) -> List[str]:
+    """Return the chunk ids of a FAISS or flat store in row order."""
+    if isinstance(vectorstore, FlatVectorStore):
+        return vectorstore.contents()[2]
+    return [vectorstore.index_to_docstore_id[i] for i in range(vectorstore.index.ntotal)]
+
+
+def _to_faiss(vectorstore: Any) -> Any:
+    """Build an in-memory FAISS store holding the contents of ``vectorstore``."""
+    texts, metadatas, vectors = store_contents(vectorstore)
+    return FAISS.from_embeddings(
+        list(zip(texts, vectors)),
+        vectorstore.embeddings,
+        metadatas=metadatas,
+        ids=_store_ids(vectorstore),
+    )
+
+
+def store_contents(
+    vectorstore: Any,
+) -> Tuple[List[str], List[Dict[str, Any]], List[List[float]]]:
+    """Return the texts, metadata and stored vectors of a FAISS or flat store."""
+    if isinstance(vectorstore, FlatVectorStore):
+        texts, metadatas, _ = vectorstore.contents()
+        return texts, metadatas, vectorstore.dense_vectors().tolist()
+    count = vectorstore.index.ntotal
+    vectors = vectorstore.index.reconstruct_n(0, count).tolist() if count else []
+    docs = [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+        for i in range(count)
+    ]
+    return (
+        [doc.page_content for doc in docs],
+        [dict(doc.metadata) for doc in docs],
+        vectors,
+    )
+
+
+def append_chunks(
+    name: str,
+    doc_id: str,
+    texts: List[str],
+    metadatas: List[Dict[str, Any]] | None = None,
+    vectors: List[List[float]] | None = None,
+    base_dir: Path | str = VECTORSTORE_DIR,
+):
+    """Add a document's chunks to a named store, persisting only the change.
+
+    The chunks are written as a new delta segment next to the store's
+    snapshot rather than rewriting the whole index.  Chunks already stored for
+    ``doc_id`` are replaced.  A store that does not exist yet is created.
+
+    Args:
+        name: Identifier of the stored policy.
+        doc_id: Source document identifier; recorded in each chunk's metadata
+            and used by :func:`delete_document`.
+        texts: The textual chunks to add.
+        metadatas: Optional metadata for each chunk.
+        vectors: Optional precomputed embeddings for ``texts``, e.g. from
+            :func:`store_contents`.  Texts are embedded when omitted.
+        base_dir: Directory where policy vector stores are maintained.
+
+    Returns:
+        The updated vector store.
+    """
+    if FAISS is None:
+        raise ImportError("LangChain community vectorstores are unavailable")
+    path = Path(base_dir) / Path(name).name
+    embeddings = get_embeddings()
+    if vectors is None:
+        vectors = embeddings.embed_documents(texts)
+    metadatas = [
+        {**(meta or {}), "doc_id": doc_id}
+        for meta in (metadatas or [{}] * len(texts))
+    ]
+    delta = FAISS.from_embeddings(
+        list(zip(texts, vectors)),
+        embeddings,
+        metadatas=metadatas,
+        ids=[_chunk_id(doc_id, i) for i in range(len(texts))],
+    )
+    with _store_lock(path):
+        _require_faiss_format(path)
+        if not (path / "index.faiss").exists():
+            save_vectorstore(delta, name, base_dir=base_dir, format="faiss")
+            return delta
+
+        vectorstore = load_vectorstore(name, base_dir=base_dir)
+        if document_chunk_ids(vectorstore, doc_id):
+            delete_document(name, doc_id, base_dir=base_dir, vectorstore=vectorstore)
+        _invalidate(path)
+        delta.save_local(str(_write_delta(path, "add")))
+        merge_into(vectorstore, delta)
+        if len(_list_deltas(path)) > MAX_DELTAS:
+            save_vectorstore(vectorstore, name, base_dir=base_dir, format="faiss")
+    return vectorstore
+
+
+def delete_document(
+    name: str,
+    doc_id: str,
+    base_dir: Path | str = VECTORSTORE_DIR,
+    vectorstore: Any = None,
+) -> int:
+    """Remove every chunk of ``doc_id`` from a named store.
+
+    Only a small delete marker is persisted; the chunks are dropped from the
+    index when the store is next loaded or compacted.
+
+    Args:
+        name: Identifier of the stored policy.
+        doc_id: Source document identifier given to :func:`append_chunks`.
+        base_dir: Directory where policy vector stores are maintained.
+        vectorstore: The loaded store, if the caller already has it.  It is
+            updated in place.
+
+    Returns:
+        Number of chunks removed.
+    """
+    path = Path(base_dir) / Path(name).name
+    with _store_lock(path):
+        _require_faiss_format(path)
+        if vectorstore is None:
+            vectorstore = load_vectorstore(name, base_dir=base_dir)
+        ids = document_chunk_ids(vectorstore, doc_id)
+        if not ids:
+            return 0
+        _invalidate(path)
+        _write_delta(path, "delete").write_text(
+            json.dumps({"doc_id": doc_id}), encoding="utf-8"
+        )
+        delete_ids(vectorstore, ids)
+    return len(ids)
 
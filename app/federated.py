@@ -0,0 +1,158 @@
+"""Search several named policy stores as one.
+
+:class:`FederatedVectorStore` embeds each query once, searches every member
+store by vector in parallel and merges the hits into one global top-k by
+distance.  Each returned document carries the name of the store it came from
+in ``metadata["store"]``; chunk metadata such as the section title in
+``metadata["policy"]`` is kept.  It is a LangChain vector store, so it can be
+passed to :func:`app.control_mapper.check_framework_coverage` and
+:func:`app.rag_pipeline.build_rag` like a single store.
+
+All member stores must have been built with the same embedding provider:
+FAISS and flat stores both score by squared L2 distance, so distances from
+different stores are comparable only when their vectors share a space.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .embeddings import VECTORSTORE_DIR, get_embeddings, get_vectorstore, list_vectorstores
+
+try:  # pragma: no cover - optional dependency
+    from langchain_core.documents import Document
+    from langchain_core.vectorstores import VectorStore
+except Exception:  # pragma: no cover - executed only when package missing
+    Document = None  # type: ignore[assignment,misc]
+    VectorStore = object  # type: ignore[assignment,misc]
+
+# Member stores loaded and searched at once
+FEDERATED_SEARCH_WORKERS = int(os.getenv("DOCUSEC_FEDERATED_WORKERS", "4"))
+# Metadata key naming the store a federated hit came from; distinct from the
+# "policy" section title that chunking records
+STORE_KEY = "store"
+
+
+def _tag(doc: Any, name: str) -> Any:
+    """Return a copy of ``doc`` tagged with its store ``name``.
+
+    Member stores may be shared through :func:`get_vectorstore`, so their
+    documents are copied rather than modified.
+    """
+    return Document(
+        page_content=doc.page_content,
+        metadata={**(doc.metadata or {}), STORE_KEY: name},
+        id=getattr(doc, "id", None),
+    )
+
+
+class FederatedVectorStore(VectorStore):
+    """Read-only vector store that fans queries out to named stores."""
+
+    def __init__(
+        self,
+        stores: Dict[str, Any],
+        embeddings: Any,
+        max_workers: int = FEDERATED_SEARCH_WORKERS,
+    ) -> None:
+        self.stores = dict(stores)
+        self.embedding_function = embeddings
+        self.max_workers = max_workers
+
+    @classmethod
+    def load(
+        cls,
+        names: Sequence[str] | None = None,
+        base_dir: Path | str = VECTORSTORE_DIR,
+        max_workers: int = FEDERATED_SEARCH_WORKERS,
+    ) -> "FederatedVectorStore":
+        """Open the stores ``names`` (default: every stored policy) in parallel.
+
+        Stores are obtained through :func:`get_vectorstore`, so ones already
+        in memory are reused.
+
+        Raises:
+            ValueError: If a requested store does not exist.
+        """
+        available = list_vectorstores(base_dir)
+        names = list(available if names is None else dict.fromkeys(names))
+        missing = [name for name in names if name not in available]
+        if missing:
+            raise ValueError(f"Policy store not found: {', '.join(missing)}")
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(names))),
+            thread_name_prefix="docusec-federated",
+        ) as pool:
+            stores = list(pool.map(lambda name: get_vectorstore(name, base_dir), names))
+        return cls(dict(zip(names, stores)), get_embeddings(), max_workers)
+
+    @property
+    def embeddings(self) -> Any:
+        return self.embedding_function
+
+    def _search(
+        self, item: Tuple[str, Any], embedding: List[float], k: int
+    ) -> List[Tuple[float, str, Any]]:
+        name, store = item
+        return [
+            (float(score), name, doc)
+            for doc, score in store.similarity_search_with_score_by_vector(embedding, k=k)
+        ]
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: Sequence[float], k: int = 4, **_: Any
+    ) -> List[Tuple[Any, float]]:
+        """Return the global ``k`` nearest chunks to ``embedding`` with distances."""
+        if not self.stores:
+            return []
+        embedding = list(embedding)
+        if len(self.stores) == 1 or self.max_workers <= 1:
+            hits = [self._search(item, embedding, k) for item in self.stores.items()]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(self.stores)),
+                thread_name_prefix="docusec-federated",
+            ) as pool:
+                hits = list(
+                    pool.map(lambda item: self._search(item, embedding, k), self.stores.items())
+                )
+        # Ties are broken by store order, then by rank within the store
+        best = heapq.nsmallest(
+            k,
+            (
+                (score, order, rank, name, doc)
+                for order, store_hits in enumerate(hits)
+                for rank, (score, name, doc) in enumerate(store_hits)
+            ),
+            key=lambda hit: hit[:3],
+        )
+        return [(_tag(doc, name), score) for score, _, _, name, doc in best]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Any, float]]:
+        """Embed ``query`` once and return the global ``k`` nearest chunks."""
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Any]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Any]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def add_texts(self, texts: Iterable[str], metadatas: Any = None, **kwargs: Any) -> List[str]:
+        raise ValueError("federated vector stores are read-only")
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Any, metadatas: Any = None, **kwargs: Any):
+        raise ValueError("open member stores with FederatedVectorStore.load")
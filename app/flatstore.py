@@ -0,0 +1,315 @@
+"""Memory-mapped, pickle-free vector store format.
+
+A flat store is a directory holding:
+
+``vectors.npy``
+    Matrix of shape ``(count, dim)``, opened with ``mmap`` so loading is O(1)
+    and processes serving the same store share the OS page cache.  Vectors
+    are float32, or quantized to float16 or int8 to cut memory 2x or 4x.
+``scales.npy``
+    int8 stores only: per-dimension scale, so ``vector = codes * scales``.
+``norms.npy``
+    Squared L2 norm of every (dequantized) vector, used to score without
+    touching the vectors twice.
+``chunks.db``
+    SQLite table of chunk ids, text and JSON metadata by row position.
+``meta.json``
+    Format marker, version, dimension, count and quantization.
+
+Searches return squared L2 distances, like LangChain's default FAISS index,
+so relevance scores are interchangeable between the two formats.  Flat stores
+are read-only; incremental updates need the FAISS format.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    from langchain_core.documents import Document
+    from langchain_core.vectorstores import VectorStore
+except Exception:  # pragma: no cover - executed only when package missing
+    Document = None  # type: ignore[assignment,misc]
+    VectorStore = object  # type: ignore[assignment,misc]
+
+FLAT_FORMAT = "flat"
+FLAT_FORMAT_VERSION = 2
+# Version 1 stores (float32 only) are still readable
+_READABLE_VERSIONS = (1, 2)
+# Vector encodings: "none" (float32), "float16" or "int8" (per-dimension scales)
+QUANTIZATIONS = ("none", "float16", "int8")
+_INT8_MAX = 127
+# Rows scored per block so query memory stays bounded on large stores
+SEARCH_BLOCK_ROWS = 65536
+# Quantized blocks are converted to float32 before scoring; smaller blocks
+# keep that copy in cache
+QUANTIZED_BLOCK_ROWS = 2048
+
+
+def is_flat_store(path: Path | str) -> bool:
+    """Return ``True`` if ``path`` holds a store in the flat format."""
+    meta_path = Path(path) / "meta.json"
+    if not meta_path.exists():
+        return False
+    return json.loads(meta_path.read_text(encoding="utf-8")).get("format") == FLAT_FORMAT
+
+
+def quantize(matrix: np.ndarray, quantization: str) -> Tuple[np.ndarray, np.ndarray | None]:
+    """Encode float32 ``matrix`` as ``quantization``.
+
+    Returns:
+        A tuple ``(codes, scales)``.  ``scales`` is ``None`` except for
+        int8, where each dimension is scaled symmetrically so its largest
+        magnitude maps to 127.
+
+    Raises:
+        ValueError: If ``quantization`` is not one of :data:`QUANTIZATIONS`.
+    """
+    if quantization == "none":
+        return matrix, None
+    if quantization == "float16":
+        return matrix.astype(np.float16), None
+    if quantization == "int8":
+        peak = np.abs(matrix).max(axis=0) if len(matrix) else np.ones(matrix.shape[1])
+        scales = np.where(peak > 0, peak / _INT8_MAX, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(matrix / scales), -_INT8_MAX, _INT8_MAX).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Unknown vector quantization: {quantization}")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """Return float32 vectors from :func:`quantize` output."""
+    matrix = np.asarray(codes, dtype=np.float32)
+    return matrix * scales if scales is not None else matrix
+
+
+def write_flat_store(
+    path: Path | str,
+    texts: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+    vectors: Any,
+    ids: Sequence[str] | None = None,
+    quantization: str = "none",
+) -> None:
+    """Write chunks and their vectors to ``path`` in the flat format.
+
+    Files are written to a temporary directory next to ``path`` and moved
+    into place, replacing any previous flat store files.  ``quantization``
+    selects how vectors are encoded (see :data:`QUANTIZATIONS`).
+
+    Raises:
+        ValueError: If the inputs differ in length or ``quantization`` is
+            unknown.
+    """
+    path = Path(path)
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2 or not (len(texts) == len(metadatas) == matrix.shape[0]):
+        raise ValueError("texts, metadatas and vectors must have matching lengths")
+    ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+    codes, scales = quantize(matrix, quantization)
+    # Norms of what is actually stored, so distances stay consistent
+    stored = dequantize(codes, scales) if quantization != "none" else matrix
+
+    path.mkdir(parents=True, exist_ok=True)
+    tmp_dir = path / f".flat.{uuid.uuid4().hex}.tmp"
+    tmp_dir.mkdir()
+    try:
+        np.save(tmp_dir / "vectors.npy", codes)
+        np.save(tmp_dir / "norms.npy", np.einsum("ij,ij->i", stored, stored))
+        if scales is not None:
+            np.save(tmp_dir / "scales.npy", scales)
+        conn = sqlite3.connect(tmp_dir / "chunks.db")
+        with conn:
+            conn.execute(
+                "CREATE TABLE chunks (position INTEGER PRIMARY KEY, id TEXT, "
+                "text TEXT NOT NULL, metadata TEXT NOT NULL)"
+            )
+            conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?, ?)",
+                (
+                    (position, chunk_id, text, json.dumps(meta))
+                    for position, (chunk_id, text, meta) in enumerate(
+                        zip(ids, texts, metadatas)
+                    )
+                ),
+            )
+        conn.close()
+        (tmp_dir / "meta.json").write_text(
+            json.dumps(
+                {
+                    "format": FLAT_FORMAT,
+                    "version": FLAT_FORMAT_VERSION,
+                    "dim": int(matrix.shape[1]),
+                    "count": int(matrix.shape[0]),
+                    "quantization": quantization,
+                }
+            ),
+            encoding="utf-8",
+        )
+        # meta.json last, so a reader never sees a marker without its data
+        for name in ("scales.npy", "vectors.npy", "norms.npy", "chunks.db", "meta.json"):
+            if (tmp_dir / name).exists():
+                os.replace(tmp_dir / name, path / name)
+        if scales is None:
+            (path / "scales.npy").unlink(missing_ok=True)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the ``k`` smallest ``scores``, smallest first."""
+    if k >= len(scores):
+        return np.argsort(scores, kind="stable")
+    candidates = np.argpartition(scores, k)[:k]
+    return candidates[np.argsort(scores[candidates], kind="stable")]
+
+
+class FlatVectorStore(VectorStore):
+    """Read-only vector store over a memory-mapped flat store directory."""
+
+    def __init__(self, path: Path | str, embeddings: Any) -> None:
+        self.path = Path(path)
+        self.embedding_function = embeddings
+        meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != FLAT_FORMAT or meta.get("version") not in _READABLE_VERSIONS:
+            raise ValueError(f"Unsupported store format in {self.path}")
+        self.dim = meta["dim"]
+        self.count = meta["count"]
+        self.quantization = meta.get("quantization", "none")
+        self.scales = None
+        if self.quantization == "int8":
+            self.scales = np.load(self.path / "scales.npy")
+        if self.count:
+            self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+            self.norms = np.load(self.path / "norms.npy", mmap_mode="r")
+        else:  # Zero-length arrays cannot be memory-mapped
+            self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self.norms = np.zeros(0, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path: Path | str, embeddings: Any) -> "FlatVectorStore":
+        """Open the flat store at ``path``; vectors are paged in on demand."""
+        return cls(path, embeddings)
+
+    @property
+    def embeddings(self) -> Any:
+        return self.embedding_function
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"file:{self.path / 'chunks.db'}?mode=ro"
+        return sqlite3.connect(uri, uri=True)
+
+    def _distances(self, query: np.ndarray) -> np.ndarray:
+        """Squared L2 distance from ``query`` to every stored vector.
+
+        Quantized blocks are scored without dequantizing the store: int8
+        scales are folded into the query, since ``(codes * scales) @ q ==
+        codes @ (scales * q)``.
+        """
+        distances = np.empty(self.count, dtype=np.float32)
+        query_norm = float(query @ query)
+        if self.scales is not None:
+            query = query * self.scales
+        rows = SEARCH_BLOCK_ROWS if self.quantization == "none" else QUANTIZED_BLOCK_ROWS
+        for start in range(0, self.count, rows):
+            stop = min(start + rows, self.count)
+            block = np.asarray(self.vectors[start:stop], dtype=np.float32)
+            distances[start:stop] = self.norms[start:stop] - 2.0 * (block @ query) + query_norm
+        return np.maximum(distances, 0.0, out=distances)
+
+    def documents(self, positions: Iterable[int]) -> List[Any]:
+        """Return the documents stored at row ``positions``, in that order."""
+        positions = [int(p) for p in positions]
+        if not positions:
+            return []
+        marks = ",".join("?" * len(positions))
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT position, id, text, metadata FROM chunks WHERE position IN ({marks})",
+                positions,
+            ).fetchall()
+        finally:
+            conn.close()
+        by_position = {
+            position: Document(page_content=text, metadata=json.loads(meta), id=chunk_id)
+            for position, chunk_id, text, meta in rows
+        }
+        return [by_position[p] for p in positions]
+
+    def dense_vectors(self) -> np.ndarray:
+        """Return every stored vector as float32, dequantizing if needed."""
+        return dequantize(self.vectors, self.scales)
+
+    def contents(self) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """Return every chunk's text, metadata and id in row order."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, text, metadata FROM chunks ORDER BY position"
+            ).fetchall()
+        finally:
+            conn.close()
+        return (
+            [text for _, text, _ in rows],
+            [json.loads(meta) for _, _, meta in rows],
+            [chunk_id for chunk_id, _, _ in rows],
+        )
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: Sequence[float], k: int = 4, **_: Any
+    ) -> List[Tuple[Any, float]]:
+        """Return the ``k`` nearest chunks to ``embedding`` with their distances."""
+        if not self.count:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        distances = self._distances(query)
+        positions = top_k(distances, k)
+        return list(zip(self.documents(positions), distances[positions].tolist()))
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Any, float]]:
+        """Embed ``query`` and return the ``k`` nearest chunks with distances."""
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Any]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Any]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def add_texts(self, texts: Iterable[str], metadatas: Any = None, **kwargs: Any) -> List[str]:
+        raise ValueError("flat stores are read-only; rebuild with format='faiss'")
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Any,
+        metadatas: List[dict] | None = None,
+        *,
+        path: Path | str | None = None,
+        ids: List[str] | None = None,
+        **kwargs: Any,
+    ) -> "FlatVectorStore":
+        """Embed ``texts``, write them to ``path`` and open the result."""
+        if path is None:
+            raise ValueError("FlatVectorStore.from_texts requires a path")
+        vectors = embedding.embed_documents(list(texts))
+        write_flat_store(path, texts, metadatas or [{} for _ in texts], vectors, ids)
+        return cls(path, embedding)
@@ -2,11 +2,32 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
-from typing import Dict, List, Any
+import shutil
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
 
+from .ann_index import reindex
 from .db import fetch_controls
-from .embeddings import embed_and_store
+from .embedding_cache import model_name
+from .embeddings import (
+    FAISS,
+    embed_and_store,
+    get_embeddings,
+    load_vectorstore,
+    save_vectorstore,
+    store_contents,
+)
+from .utils import trace
+
+FRAMEWORK_STORE_DIR = Path(os.getenv("DOCUSEC_FRAMEWORK_STORE_DIR", "framework_store"))
+# Bump when _split_into_clauses or the stored metadata change, so persisted
+# framework stores are rebuilt
+CLAUSE_SPLITTER_VERSION = 1
+_MANIFEST = "manifest.json"
 
 
 def _split_into_clauses(text: str) -> List[str]:
@@ -21,35 +42,172 @@ def _split_into_clauses(text: str) -> List[str]:
     return [p.strip() for p in parts if p.strip()]
 
 
-def build_framework_vectorstores(db_path: str | None = None) -> Dict[str, Any]:
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _store_name(framework: str) -> str:
+    """Return a filesystem-safe, collision-free directory name for ``framework``."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", framework).strip("._") or "framework"
+    return f"{slug[:64]}-{_hash(framework)[:12]}"
+
+
+def _read_manifest(path: Path) -> Dict[str, Any] | None:
+    try:
+        return json.loads((path / _MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+    tmp = path / f".{_MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path / _MANIFEST)
+
+
+def _group_controls(
+    controls: List[Dict[str, str]],
+) -> Dict[str, Dict[str, List[str]]]:
+    """Group control language by framework, then control number, in row order."""
+    grouped: Dict[str, Dict[str, List[str]]] = {}
+    for row in controls:
+        framework = grouped.setdefault(row["framework_title"], {})
+        framework.setdefault(row["control_number"], []).append(row["control_language"])
+    return grouped
+
+
+def _build_framework(
+    framework: str,
+    controls: Dict[str, List[str]],
+    base_dir: Path,
+    embeddings: Any,
+) -> Tuple[Any, int]:
+    """Load, update or create the persisted store of one framework.
+
+    Returns:
+        A tuple ``(vectorstore, embedded)`` with the store and the number of
+        clauses that had to be embedded.
+    """
+    name = _store_name(framework)
+    path = base_dir / name
+    control_hashes = {
+        number: _hash(number, *languages) for number, languages in controls.items()
+    }
+    manifest = {
+        "framework": framework,
+        "splitter_version": CLAUSE_SPLITTER_VERSION,
+        "model": model_name(embeddings),
+        "hash": _hash(*(f"{n}={h}" for n, h in sorted(control_hashes.items()))),
+        "controls": control_hashes,
+    }
+    previous = _read_manifest(path)
+    compatible = previous is not None and all(
+        previous.get(key) == manifest[key]
+        for key in ("framework", "splitter_version", "model")
+    )
+    if compatible and previous["hash"] == manifest["hash"]:
+        return load_vectorstore(name, base_dir=base_dir), 0
+
+    # Vectors of controls whose text is unchanged are carried over
+    reused: Dict[str, List[Tuple[str, Dict[str, Any], List[float]]]] = {}
+    if compatible:
+        unchanged = {
+            number
+            for number, digest in control_hashes.items()
+            if previous["controls"].get(number) == digest
+        }
+        for text, meta, vector in zip(*store_contents(load_vectorstore(name, base_dir=base_dir))):
+            if meta.get("section_id") in unchanged:
+                reused.setdefault(meta["section_id"], []).append((text, meta, vector))
+
+    pending = [
+        (clause, {"framework": framework, "section_id": number})
+        for number, languages in controls.items()
+        if number not in reused
+        for language in languages
+        for clause in _split_into_clauses(language)
+    ]
+    fresh: Dict[str, List[Tuple[str, Dict[str, Any], List[float]]]] = {}
+    if pending:
+        vectors = embeddings.embed_documents([text for text, _ in pending])
+        for (text, meta), vector in zip(pending, vectors):
+            fresh.setdefault(meta["section_id"], []).append((text, meta, vector))
+    items = [
+        item for number in controls for item in reused.get(number) or fresh.get(number, [])
+    ]
+    if not items:
+        raise ValueError(f"Framework {framework} has no control text to embed")
+
+    vectorstore = FAISS.from_embeddings(
+        [(text, vector) for text, _, vector in items],
+        embeddings,
+        metadatas=[meta for _, meta, _ in items],
+    )
+    reindex(vectorstore)
+    # The manifest goes first and comes back last, so a build interrupted
+    # in between is redone from scratch rather than trusting a partial store
+    (path / _MANIFEST).unlink(missing_ok=True)
+    save_vectorstore(vectorstore, name, base_dir=base_dir, format="faiss")
+    _write_manifest(path, manifest)
+    return vectorstore, len(pending)
+
+
+def build_framework_vectorstores(
+    db_path: str | None = None,
+    base_dir: Path | str | None = FRAMEWORK_STORE_DIR,
+) -> Dict[str, Any]:
     """Create a vector store for each framework stored in the database.
 
     Each control is broken into atomic clauses which are embedded and stored
     with metadata describing the framework and the control (section) identifier.
 
+    Stores are persisted under ``base_dir`` together with a manifest of
+    content hashes of each framework and each of its controls.  On rebuild,
+    an unchanged framework is loaded from disk without embedding anything; a
+    changed one re-embeds only the clauses of controls whose text changed
+    and reuses the stored vectors of the rest.  Stores of frameworks that
+    are no longer in the database are removed.  Changing the embedding
+    model or :data:`CLAUSE_SPLITTER_VERSION` rebuilds everything.
+
     Args:
         db_path: Optional path to the frameworks database.  If not provided the
             default path from :func:`app.db.fetch_controls` is used.
+        base_dir: Directory of the persisted framework stores, or ``None`` to
+            build every store in memory from scratch.
 
     Returns:
         A mapping of framework name to its corresponding vector store.
     """
 
     controls = fetch_controls(db_path=db_path) if db_path else fetch_controls()
-    grouped: Dict[str, List[tuple[str, Dict[str, str]]]] = {}
-    for row in controls:
-        framework = row["framework_title"]
-        section_id = row["control_number"]
-        clauses = _split_into_clauses(row["control_language"])
-        for clause in clauses:
-            grouped.setdefault(framework, []).append(
-                (clause, {"framework": framework, "section_id": section_id})
-            )
-
+    grouped = _group_controls(controls)
     stores: Dict[str, Any] = {}
-    for framework, items in grouped.items():
-        texts = [text for text, _ in items]
-        metadata = [meta for _, meta in items]
-        stores[framework] = embed_and_store(texts, metadata)
-    return stores
+    if base_dir is None:
+        for framework, by_number in grouped.items():
+            items = [
+                (clause, {"framework": framework, "section_id": number})
+                for number, languages in by_number.items()
+                for language in languages
+                for clause in _split_into_clauses(language)
+            ]
+            texts = [text for text, _ in items]
+            metadata = [meta for _, meta in items]
+            stores[framework] = embed_and_store(texts, metadata)
+        return stores
 
+    base_dir = Path(base_dir)
+    base_dir.mkdir(parents=True, exist_ok=True)
+    embeddings = get_embeddings()
+    for framework, by_number in grouped.items():
+        with trace("framework_vectors.build_framework", inputs={"framework": framework}):
+            stores[framework], _ = _build_framework(framework, by_number, base_dir, embeddings)
+    # Drop stores of frameworks removed from the database
+    current = {_store_name(framework) for framework in grouped}
+    for path in base_dir.iterdir():
+        if path.is_dir() and path.name not in current and (path / _MANIFEST).exists():
+            shutil.rmtree(path, ignore_errors=True)
+    return stores
@@ -1,15 +1,20 @@
 """Utilities for ingesting policy documents."""
 
-from typing import Callable, Dict, List, Tuple
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import re
 import io
+import mmap
+import multiprocessing
+import os
+import tempfile
 
-try:  # pragma: no cover - optional dependency
-    from charset_normalizer import from_bytes
-except Exception:  # pragma: no cover - library may be absent
-    from_bytes = None
+from .utils import decode_bytes
 
 try:  # pragma: no cover - optional dependency
     import fitz  # type: ignore
@@ -22,18 +27,53 @@ except Exception:  # pragma: no cover - library may be absent
     Document = None  # type: ignore
 
 
-def read_file(
-    data: bytes,
-    filename: str | None = None,
-    mime_type: str | None = None,
-) -> str:
-    """Decode raw file bytes into text using detected format.
+# Raw document bytes, or the path of a file holding them.
+FileSource = Union[bytes, bytearray, memoryview, str, "os.PathLike[str]"]
+
+
+def _is_path(source: FileSource) -> bool:
+    """Return ``True`` when ``source`` names a file rather than holding bytes."""
+    return isinstance(source, (str, os.PathLike))
+
+
+@contextmanager
+def _open_buffer(source: FileSource) -> Iterator[Union[bytes, bytearray, memoryview, mmap.mmap]]:
+    """Yield a read-only buffer over ``source``.
+
+    Files are memory-mapped so their contents are paged in by the OS on demand
+    instead of being copied into a ``bytes`` object up front.
+    """
+
+    if not _is_path(source):
+        yield source  # type: ignore[misc]
+        return
+    with open(source, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            # Empty files cannot be memory-mapped
+            yield b""
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+# Documents with fewer pages than this are always extracted serially; below it
+# the cost of starting worker processes outweighs the parallel speedup.
+PDF_PARALLEL_MIN_PAGES = 32
 
-    ``filename`` or ``mime_type`` may be supplied to hint at the file format.
-    PDF documents are parsed with :mod:`PyMuPDF` and DOCX files via
-    :mod:`python-docx`.  Plain text inputs fall back to charset detection using
-    :mod:`charset_normalizer`.
+
+def process_pool_context() -> Any:
+    """Return the multiprocessing context used for worker process pools.
+
+    Pools are created from job and producer threads, where forking a
+    multi-threaded process can deadlock the child, so workers are started from
+    a clean server process (or spawned where that is unavailable).
     """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def detect_filetype(filename: str | None, mime_type: str | None) -> str | None:
+    """Return ``"pdf"``, ``"docx"`` or ``"text"`` from the supplied hints."""
 
     filetype = None
     if mime_type:
@@ -52,24 +92,122 @@ def read_file(
             filetype = "docx"
         elif name.endswith(".txt"):
             filetype = "text"
+    return filetype
+
+
+def _open_pdf(source: FileSource) -> Any:
+    """Open a PDF from a path or an in-memory buffer."""
+    if _is_path(source):
+        return fitz.open(str(source))
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _extract_page_range(source: FileSource, start: int, stop: int) -> List[str]:
+    """Return the text of pages ``start``..``stop - 1``.
+
+    Runs inside worker processes, so every call opens its own document handle.
+    """
+    with _open_pdf(source) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+def _iter_pdf_pages(source: FileSource, workers: int = 1) -> Iterator[str]:
+    """Yield the text of every page of a PDF, in page order.
+
+    With ``workers > 1`` and a large enough document, the page range is split
+    into contiguous slices that are extracted concurrently in a process pool.
+    Slices are handed back in order as soon as they complete, so callers can
+    start on the first pages while later ones are still being extracted.
+    """
+
+    with _open_pdf(source) as doc:
+        page_count = doc.page_count
+        if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+            for page in doc:
+                yield page.get_text()
+            return
+
+    spooled = None
+    if not _is_path(source):
+        # Hand workers a path rather than pickling the whole PDF per slice
+        with tempfile.NamedTemporaryFile(prefix="docusec-pdf-", suffix=".pdf", delete=False) as out:
+            out.write(source)
+        source = spooled = out.name
+    try:
+        workers = min(workers, page_count)
+        # Several slices per worker keep the pool busy while results stream out
+        step = max(1, -(-page_count // (workers * 4)))  # ceiling division
+        starts = list(range(0, page_count, step))
+        stops = [min(start + step, page_count) for start in starts]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as pool:
+            for pages in pool.map(_extract_page_range, [source] * len(starts), starts, stops):
+                yield from pages
+    finally:
+        if spooled is not None:
+            os.unlink(spooled)
+
+
+def iter_pages(
+    data: FileSource,
+    filename: str | None = None,
+    mime_type: str | None = None,
+    workers: int = 1,
+) -> Iterator[str]:
+    """Lazily decode a document into page texts.
+
+    PDFs yield one entry per page, extracted across ``workers`` processes when
+    ``workers`` is greater than one.  Formats without pages (DOCX and plain
+    text) yield a single entry.  See :func:`read_file` for the accepted inputs.
+    """
+
+    filetype = detect_filetype(filename, mime_type)
 
     if filetype == "pdf" and fitz is not None:  # pragma: no branch - depends on optional lib
-        with fitz.open(stream=data, filetype="pdf") as doc:
-            return "\n".join(page.get_text() for page in doc)
+        yield from _iter_pdf_pages(data, workers=workers)
+        return
 
     if filetype == "docx" and Document is not None:  # pragma: no branch - depends on optional lib
-        document = Document(io.BytesIO(data))
-        return "\n".join(p.text for p in document.paragraphs)
+        document = Document(str(data) if _is_path(data) else io.BytesIO(data))
+        yield "\n".join(p.text for p in document.paragraphs)
+        return
 
     # Treat anything else as plain text
-    if from_bytes is not None:
-        try:
-            result = from_bytes(data).best()
-            if result is not None:
-                return str(result)
-        except Exception:
-            pass
-    return data.decode("utf-8", errors="ignore")
+    with _open_buffer(data) as buf:
+        yield decode_bytes(buf)
+
+
+def read_pages(
+    data: FileSource,
+    filename: str | None = None,
+    mime_type: str | None = None,
+    workers: int = 1,
+) -> List[str]:
+    """Decode a document into a list of page texts.
+
+    See :func:`iter_pages` for details.
+    """
+
+    return list(iter_pages(data, filename, mime_type, workers=workers))
+
+
+def read_file(
+    data: FileSource,
+    filename: str | None = None,
+    mime_type: str | None = None,
+    workers: int = 1,
+) -> str:
+    """Decode a document into text using detected format.
+
+    ``data`` may be the raw file bytes or the path of a file on disk; paths are
+    opened directly (or memory-mapped for plain text) so the document never
+    has to be held in memory as a single ``bytes`` copy.  ``filename`` or
+    ``mime_type`` may be supplied to hint at the file format.  PDF documents
+    are parsed with :mod:`PyMuPDF` and DOCX files via :mod:`python-docx`.
+    Plain text inputs are decoded with :func:`app.utils.decode_bytes`, which
+    only falls back to charset detection when the bytes are not UTF-8.
+    """
+
+    return "\n".join(read_pages(data, filename, mime_type, workers=workers))
 
 
 def _default_length_function(text: str) -> int:
@@ -77,85 +215,261 @@ def _default_length_function(text: str) -> int:
     return len(text)
 
 
-def chunk_document(
-    text: str,
+def _numbered_lines(pages: Iterable[str]) -> Iterator[Tuple[str, int]]:
+    """Yield the lines of ``pages`` with their 1-based page number.
+
+    Lines are split as ``"\\n".join(pages).splitlines()`` would split them, so
+    chunking page lists and chunking the joined text agree.
+    """
+
+    previous: str | None = None
+    number = 0
+    for number, page in enumerate(pages, start=1):
+        if previous is not None:
+            # The newline stands in for the page separator of the joined text
+            for line in (previous + "\n").splitlines():
+                yield line, number - 1
+        previous = page
+    if previous is not None:
+        for line in previous.splitlines():
+            yield line, number
+
+
+@lru_cache(maxsize=None)
+def _get_encoding() -> Any:
+    """Return the shared ``cl100k_base`` tokenizer, or ``None`` if unavailable."""
+    try:  # pragma: no cover - optional tokenizer dependency
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:  # pragma: no cover - use simple fallback
+        return None
+
+
+# UTF-8 continuation bytes (0b10xxxxxx) never start a character
+_UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+
+
+def _token_char_offsets(
+    enc: Any, tokens: List[int], text: str, indices: List[int]
+) -> Dict[int, int]:
+    """Map token indices to character offsets into ``text``.
+
+    Only the requested ``indices`` are resolved.  Walking them in order and
+    decoding just the tokens in between keeps the total work linear in the
+    length of ``text``.  A token that starts inside a multi-byte character
+    maps to the start of that character.
+    """
+
+    if text.isascii():
+        data = None
+    else:
+        data = text.encode("utf-8")
+    offsets: Dict[int, int] = {}
+    prev_index = byte_pos = char_starts = 0
+    for index in sorted(set(indices)):
+        if index >= len(tokens):
+            offsets[index] = len(text)
+            continue
+        segment = enc.decode_bytes(tokens[prev_index:index])
+        prev_index = index
+        byte_pos += len(segment)
+        if data is None:
+            offsets[index] = byte_pos
+            continue
+        char_starts += len(segment.translate(None, _UTF8_CONTINUATION))
+        inside_char = byte_pos < len(data) and 0x80 <= data[byte_pos] < 0xC0
+        offsets[index] = char_starts - inside_char
+    return offsets
+
+
+def _token_spans(
+    text: str, chunk_size: int, overlap: int, enc: Any
+) -> Iterator[Tuple[int, int]]:
+    """Yield ``(start, end)`` character spans of overlapping token windows.
+
+    ``text`` is tokenized exactly once.  Windows hold ``chunk_size`` tokens and
+    consecutive windows share ``overlap`` tokens.  Without a tokenizer every
+    character counts as one token.
+    """
+
+    if enc is None:
+        tokens: List[int] = []
+        count = len(text)
+    else:
+        tokens = enc.encode(text, disallowed_special=())
+        count = len(tokens)
+    if count <= chunk_size:
+        yield 0, len(text)
+        return
+
+    step = max(1, chunk_size - overlap)
+    windows = [
+        (start, min(start + chunk_size, count))
+        for start in range(0, count - overlap, step)
+    ]
+    if enc is None:
+        yield from windows
+        return
+    offsets = _token_char_offsets(
+        enc, tokens, text, [i for window in windows for i in window]
+    )
+    for start, end in windows:
+        yield offsets[start], offsets[end]
+
+
+def _make_length_function() -> Callable[[str], int]:
+    """Return a token counting length function, or a character count fallback."""
+    enc = _get_encoding()
+    if enc is None:
+        return _default_length_function
+    return lambda txt: len(enc.encode(txt))
+
+
+def iter_chunks(
+    text: str | Iterable[str],
     chunk_size: int = 250,
     overlap: int = 50,
     length_func: Callable[[str], int] | None = None,
-) -> Tuple[List[str], List[Dict[str, str]]]:
-    """Split a policy document into chunks with policy-aware metadata.
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Lazily split a policy document into ``(chunk, metadata)`` pairs.
 
-    The first line of a policy is treated as the policy title.  Additional
-    policies can be supplied in the same document by starting a new line that
-    contains the word ``"policy"``.  Each policy body is further split into
-    paragraphs, and long paragraphs are broken into token-aware subchunks.  A
-    metadata dictionary is produced for every chunk indicating the policy it was
-    derived from.
+    ``text`` is either the whole document or an iterable of page texts such as
+    :func:`iter_pages` produces.  Pages are consumed one at a time and chunks
+    are yielded as soon as the paragraph they belong to is complete, so memory
+    use is bounded by the largest paragraph rather than the document.  See
+    :func:`chunk_document` for the splitting rules.
 
-    Returns a tuple ``(chunks, metadatas)`` where ``chunks`` is a list of text
-    snippets and ``metadatas`` contains a mapping with the originating policy
-    title for each chunk.
+    By default each paragraph is tokenized once and cut into windows of
+    ``chunk_size`` tokens overlapping by ``overlap`` tokens, which are mapped
+    back to character spans.  Supplying ``length_func`` switches to
+    LangChain's ``RecursiveCharacterTextSplitter``, which re-measures
+    candidate substrings with it.
     """
 
-    if length_func is None:
-        try:  # pragma: no cover - optional tokenizer dependency
-            import tiktoken
+    if overlap > chunk_size:
+        raise ValueError(
+            f"Got a larger chunk overlap ({overlap}) than chunk size ({chunk_size})."
+        )
+    splitter = None
+    enc = None
+    if length_func is not None:
+        # Arbitrary length functions need the generic (re-measuring) splitter
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=overlap,
+            length_function=length_func,
+        )
+    else:
+        enc = _get_encoding()
 
-            enc = tiktoken.get_encoding("cl100k_base")
-            length_func = lambda txt: len(enc.encode(txt))
-        except Exception:  # pragma: no cover - use simple fallback
-            length_func = _default_length_function
+    with_pages = not isinstance(text, str)
+    pages = text if with_pages else [text]
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=overlap,
-        length_function=length_func,
-    )
+    def _meta(policy_title: str, page: int) -> Dict[str, Any]:
+        meta: Dict[str, Any] = {"policy": policy_title}
+        if with_pages:
+            meta["page"] = page
+        return meta
+
+    def _spans(paragraph: str) -> Iterator[Tuple[int, str]]:
+        """Yield ``(offset, sub_chunk)`` pairs for a paragraph."""
+        if splitter is None:
+            for start, end in _token_spans(paragraph, chunk_size, overlap, enc):
+                sub_chunk = paragraph[start:end]
+                stripped = sub_chunk.lstrip()
+                if stripped.strip():
+                    yield start + len(sub_chunk) - len(stripped), stripped.rstrip()
+            return
+        start = cursor = 0
+        for sub_chunk in splitter.split_text(paragraph):
+            found = paragraph.find(sub_chunk, cursor)
+            if found >= 0:
+                start, cursor = found, found + 1
+            yield start, sub_chunk
 
-    # Break the document into individual policy sections based on lines that
-    # look like policy titles.
+    def _split(policy_title: str, para_lines: List[Tuple[str, int]]):
+        paragraph = "\n".join(line for line, _ in para_lines)
+        # Character offset at which each paragraph line starts
+        line_starts: List[int] = []
+        offset = 0
+        for line, _ in para_lines:
+            line_starts.append(offset)
+            offset += len(line) + 1
+        for start, sub_chunk in _spans(paragraph):
+            page = para_lines[bisect_right(line_starts, start) - 1][1]
+            yield f"{policy_title}\n\n{sub_chunk}".strip(), _meta(policy_title, page)
+
+    # Policy sections start at the first non-empty line and at every later
+    # line that looks like a policy title.  Paragraphs are runs of non-blank
+    # lines within a section.
     policy_pattern = re.compile(r"policy", re.IGNORECASE)
-    lines = text.splitlines()
-    sections: List[Tuple[str, List[str]]] = []
     title: str | None = None
-    buffer: List[str] = []
+    title_page = 1
+    has_content = False
+    paragraph: List[Tuple[str, int]] = []
 
-    for line in lines:
+    for line, page in _numbered_lines(pages):
         stripped = line.strip()
-        if not stripped and title is None:
-            # Skip leading blank lines
-            continue
         if title is None:
-            # The first non-empty line is the initial policy title
-            title = stripped
+            if stripped:
+                # The first non-empty line is the initial policy title
+                title, title_page = stripped, page
             continue
 
-        if policy_pattern.search(stripped):
+        if stripped and policy_pattern.search(stripped):
             # Encountered a new policy heading
-            sections.append((title, buffer))
-            title = stripped
-            buffer = []
-        else:
-            buffer.append(stripped)
+            if paragraph:
+                yield from _split(title, paragraph)
+            elif not has_content:
+                yield title, _meta(title, title_page)
+            title, title_page = stripped, page
+            has_content = False
+            paragraph = []
+            continue
+
+        has_content = True
+        if stripped:
+            paragraph.append((stripped, page))
+        elif paragraph:
+            yield from _split(title, paragraph)
+            paragraph = []
 
     if title is not None:
-        sections.append((title, buffer))
+        if paragraph:
+            yield from _split(title, paragraph)
+        elif not has_content:
+            yield title, _meta(title, title_page)
 
-    chunks: List[str] = []
-    metadatas: List[Dict[str, str]] = []
-    for policy_title, content_lines in sections:
-        if not content_lines:
-            chunks.append(policy_title)
-            metadatas.append({"policy": policy_title})
-            continue
 
-        paragraph_text = "\n".join(content_lines)
-        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", paragraph_text) if p.strip()]
-        for paragraph in paragraphs:
-            for sub_chunk in splitter.split_text(paragraph):
-                chunk = f"{policy_title}\n\n{sub_chunk}".strip()
-                chunks.append(chunk)
-                metadatas.append({"policy": policy_title})
+def chunk_document(
+    text: str | Iterable[str],
+    chunk_size: int = 250,
+    overlap: int = 50,
+    length_func: Callable[[str], int] | None = None,
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Split a policy document into chunks with policy-aware metadata.
 
-    return chunks, metadatas
+    The first line of a policy is treated as the policy title.  Additional
+    policies can be supplied in the same document by starting a new line that
+    contains the word ``"policy"``.  Each policy body is further split into
+    paragraphs, and long paragraphs are broken into token-aware subchunks.  A
+    metadata dictionary is produced for every chunk indicating the policy it was
+    derived from.
 
+    ``text`` may also be a list of page texts as returned by
+    :func:`read_pages`, in which case each metadata dictionary additionally
+    records the ``page`` number on which the chunk's text starts.
+
+    Returns a tuple ``(chunks, metadatas)`` where ``chunks`` is a list of text
+    snippets and ``metadatas`` contains a mapping with the originating policy
+    title for each chunk.  This is a list-building wrapper around
+    :func:`iter_chunks`.
+    """
+
+    chunks: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    for chunk, meta in iter_chunks(text, chunk_size, overlap, length_func):
+        chunks.append(chunk)
+        metadatas.append(meta)
+    return chunks, metadatas
@@ -0,0 +1,145 @@
+"""Bounded background job queue for long-running ingestion work."""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class Job:
+    """State of a queued job: status, current stage, progress and timings.
+
+    Jobs move through ``queued`` → ``running`` → ``succeeded``/``failed``.
+    While running, the job function reports named stages via
+    :meth:`set_stage` and a progress counter via :meth:`set_progress`; the
+    wall time spent in each stage is recorded in ``timings``.
+    """
+
+    def __init__(self, job_id: str) -> None:
+        self.id = job_id
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0
+        self.result: Any = None
+        self.error: str | None = None
+        self.timings: Dict[str, float] = {}
+        self._stage_started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def set_stage(self, stage: str) -> None:
+        """Close the timing of the current stage and enter ``stage``."""
+        now = time.perf_counter()
+        with self._lock:
+            self.timings[self.stage] = round(
+                self.timings.get(self.stage, 0.0) + now - self._stage_started, 6
+            )
+            self.stage = stage
+            self._stage_started = now
+
+    def set_progress(self, progress: int) -> None:
+        """Record the number of work items completed so far."""
+        self.progress = progress
+
+    def _finish(self, status: str) -> None:
+        self.set_stage("done")
+        with self._lock:
+            self.status = status
+            self.timings["total"] = round(
+                sum(v for k, v in self.timings.items() if k != "total"), 6
+            )
+        self._done.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the job finishes; return ``False`` on timeout."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot of the job."""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.progress,
+                "timings": dict(self.timings),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobQueue:
+    """Run jobs on a fixed pool of worker threads with a bounded backlog.
+
+    At most ``workers`` jobs run concurrently and at most ``max_pending``
+    more wait for a worker; further submissions raise
+    :class:`QueueFullError`.  Finished jobs are kept for status queries until
+    ``keep`` newer jobs have been submitted.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 16, keep: int = 1000) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="docusec-job"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Job:
+        """Queue ``fn(job, *args, **kwargs)`` and return its :class:`Job`.
+
+        The job function receives the :class:`Job` first so it can report
+        stages and progress.  Its return value becomes ``job.result``.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Job queue is full")
+        job = Job(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.keep:
+                self._jobs.popitem(last=False)
+        try:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        job.status = "running"
+        job.set_stage("running")
+        try:
+            job.result = fn(job, *args, **kwargs)
+        except Exception as err:
+            job.error = str(err)
+            job._finish("failed")
+        else:
+            job._finish("succeeded")
+        finally:
+            self._slots.release()
+
+    def get(self, job_id: str) -> Job | None:
+        """Return the job with ``job_id``, if it is still tracked."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Return worker count, capacity and current job counts by status."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {"queued": 0, "running": 0}
+        for job in jobs:
+            if job.status in counts:
+                counts[job.status] += 1
+        return {"workers": self.workers, "max_pending": self.max_pending, **counts}
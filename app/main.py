@@ -1,24 +1,29 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-from app.ingestion import read_file, chunk_document
 from app.embeddings import (
-    embed_and_store,
     save_vectorstore,
     list_vectorstores,
-    load_vectorstore,
 )
 
 from app.rag_pipeline import build_rag, answer_query
 from app.framework_loader import load_frameworks
-from app.control_mapper import check_framework_coverage
+from app.control_mapper import check_policy_coverage
 from app.utils import ensure_utf8
 from app.db import fetch_controls, store_csv_in_db
+from app.pipeline import ingest, ingest_bulk, stage_uploads
 from app.validation import validate_input
 
 # Streamlit frontend reusing core FastAPI logic
 # This app leverages existing ingestion, RAG, and control mapping functions.
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_BULK_SIZE = 200 * 1024 * 1024  # 200MB
 ALLOWED_MIME_TYPES = {
     "application/pdf",
     "text/plain",
@@ -56,24 +61,66 @@ if page == "Ingest Policy Document":
         elif uploaded_file.size > MAX_FILE_SIZE:
             st.error("File too large. Limit 10MB.")
         else:
-            text = read_file(
-                uploaded_file.read(),
-                filename=uploaded_file.name,
-                mime_type=uploaded_file.type,
-            )
+            data = uploaded_file.getvalue()
             try:
-                validate_input(text)
+                vectorstore, count, cache_hit = ingest(
+                    data,
+                    hashlib.sha256(data).hexdigest(),
+                    filename=uploaded_file.name,
+                    mime_type=uploaded_file.type,
+                    workers=os.cpu_count() or 1,
+                )
             except ValueError as err:
                 st.error(str(err))
             else:
-                chunks, metadatas = chunk_document(text)
-                st.session_state.vectorstore = embed_and_store(chunks, metadatas)
+                st.session_state.vectorstore = vectorstore
                 save_vectorstore(st.session_state.vectorstore, policy_name)
                 st.session_state.rag_chain = build_rag(st.session_state.vectorstore)
                 st.success(
-                    f"Document ingested with {len(chunks)} chunks and saved as '{policy_name}'."
+                    f"Document ingested with {count} chunks and saved as '{policy_name}'."
+                    + (" (reused cached embeddings)" if cache_hit else "")
                 )
 
+    st.header("Bulk Upload")
+    bulk_files = st.file_uploader(
+        "Upload several documents or a ZIP archive",
+        type=["pdf", "docx", "txt", "zip"],
+        accept_multiple_files=True,
+    )
+    store_name = st.text_input("Store name")
+    if bulk_files and store_name and st.button("Ingest all"):
+        if sum(f.size for f in bulk_files) > MAX_BULK_SIZE:
+            st.error("Upload too large. Limit 200MB.")
+        else:
+            tmp_dir = tempfile.mkdtemp(prefix="docusec-bulk-")
+            try:
+                uploads = []
+                for number, bulk_file in enumerate(bulk_files):
+                    path = Path(tmp_dir) / f"{number}-{Path(bulk_file.name).name}"
+                    path.write_bytes(bulk_file.getvalue())
+                    uploads.append((bulk_file.name, path, bulk_file.type))
+                files = stage_uploads(uploads, tmp_dir, MAX_FILE_SIZE, MAX_BULK_SIZE)
+                with st.spinner(f"Ingesting {len(files)} documents..."):
+                    vectorstore, report = ingest_bulk(
+                        files, workers=os.cpu_count() or 1
+                    )
+            except ValueError as err:
+                st.error(str(err))
+            else:
+                st.dataframe(pd.DataFrame(report["documents"]))
+                if vectorstore is None:
+                    st.error("No documents could be ingested.")
+                else:
+                    st.session_state.vectorstore = vectorstore
+                    save_vectorstore(vectorstore, store_name)
+                    st.session_state.rag_chain = build_rag(vectorstore)
+                    st.success(
+                        f"Ingested {report['chunks']} chunks into '{store_name}'"
+                        f" ({report['failed']} failed)."
+                    )
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
 elif page == "Interrogate Policy":
     st.header("Ask a Question")
     if st.session_state.rag_chain is None:
@@ -122,14 +169,19 @@ elif page == "Framework Coverage":
     elif not policies:
         st.info("No stored policies found. Ingest a policy first.")
     else:
-        policy_choice = st.selectbox("Select a policy", policies)
+        policy_choice = st.multiselect(
+            "Select policies", policies, default=policies[:1]
+        )
         selected = st.selectbox("Select a framework", frameworks)
-        if st.button("Check coverage"):
-            vectorstore = load_vectorstore(policy_choice)
+        if st.button("Check coverage") and policy_choice:
             selected_controls = [
                 c for c in controls if c["framework_title"] == selected
             ]
-            coverage = check_framework_coverage(vectorstore, selected_controls)
+            # Several policies are searched together and ranked as one;
+            # unchanged policies and frameworks are answered from the cache
+            coverage = check_policy_coverage(
+                policy_choice, selected, selected_controls
+            )
             if coverage:
                 table_data = [
                     {
@@ -137,7 +189,12 @@ elif page == "Framework Coverage":
                         "Control Number": c["control_number"],
                         "Control Text": c["control_language"],
                         "Policy Excerpts": "\n\n".join(
-                            ensure_utf8(e) for e in c["policy_excerpts"]
+                            f"[{policy}] {ensure_utf8(e)}" if policy else ensure_utf8(e)
+                            for e, policy in zip(
+                                c["policy_excerpts"],
+                                c.get("excerpt_policies")
+                                or [None] * len(c["policy_excerpts"]),
+                            )
                         ),
                     }
                     for c in coverage
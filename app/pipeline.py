@@ -0,0 +1,337 @@
+"""End-to-end document ingestion shared by the API and the Streamlit app."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from . import doc_cache
+from .embeddings import EMBED_BATCH_SIZE, embed_chunks
+from .ingestion import (
+    FileSource,
+    chunk_document,
+    detect_filetype,
+    iter_chunks,
+    iter_pages,
+    process_pool_context,
+    read_pages,
+)
+from .utils import trace
+from .validation import validate_input, validate_stream
+
+# Shared embedding batches span document boundaries; two rounds of concurrent
+# provider requests each
+BULK_EMBED_BATCH_SIZE = 2 * EMBED_BATCH_SIZE
+BULK_EXTENSIONS = {".pdf", ".docx", ".txt"}
+ZIP_MIME_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+# A bulk upload entry: ``(filename, data or path, mime_type)``.  An entry that
+# could not be staged carries the exception instead and is reported as failed.
+BulkFile = Tuple[str, "FileSource | Exception", "str | None"]
+
+
+def is_zip(filename: str | None, mime_type: str | None) -> bool:
+    """Return ``True`` if an upload is a ZIP archive by MIME type or extension."""
+    if mime_type and mime_type.lower() in ZIP_MIME_TYPES:
+        return True
+    return bool(filename) and filename.lower().endswith(".zip")
+
+
+def ingest(
+    data: FileSource,
+    digest: str,
+    filename: str | None = None,
+    mime_type: str | None = None,
+    workers: int = 1,
+    on_stage: Callable[[str], None] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> Tuple[Any, int, bool]:
+    """Parse, chunk and embed a document, reusing cached results when possible.
+
+    Documents are looked up in :mod:`app.doc_cache` by ``digest``, the hex
+    SHA-256 of their bytes, and the file format detected from the hints.
+    On a miss, parsing, validation, chunking and embedding run as a
+    streaming pipeline whose extracted text, chunks and vector store are
+    recorded in the cache for the next identical upload.
+
+    ``on_stage`` is told when the pipeline enters each of its stages
+    (``cache_lookup``, ``embedding`` and ``saving``) and ``on_progress``
+    receives the number of chunks embedded so far.
+
+    Returns:
+        A tuple ``(vectorstore, chunk_count, cache_hit)``.
+
+    Raises:
+        ValueError: If the document fails validation or yields no chunks.
+    """
+    stage = on_stage or (lambda _: None)
+    stage("cache_lookup")
+    with trace("pipeline.cache_lookup", inputs={"digest": digest}):
+        key = doc_cache.cache_key(digest, filetype=detect_filetype(filename, mime_type))
+        cached = doc_cache.load_cached(key)
+    if cached is not None:
+        vectorstore, count = cached
+        return vectorstore, count, True
+
+    entry = doc_cache.CacheEntry(key)
+    try:
+        # Parsing and chunking stream into embedding, so they share a stage
+        stage("embedding")
+        with trace("pipeline.embedding", inputs={"filename": filename, "workers": workers}):
+            pages = iter_pages(data, filename, mime_type, workers=workers)
+            pages = entry.record_pages(validate_stream(pages))
+            chunks = entry.record_chunks(iter_chunks(pages))
+            vectorstore, count = embed_chunks(chunks, on_batch=on_progress)
+        stage("saving")
+        with trace("pipeline.saving", inputs={"chunks": count}):
+            entry.commit(vectorstore)
+    except BaseException:
+        entry.discard()
+        raise
+    return vectorstore, count, False
+
+
+def expand_zip(
+    path: str | Path,
+    dest_dir: str | Path,
+    max_file_size: int,
+    max_total_size: int,
+    on_error: Callable[[str, ValueError], None] | None = None,
+) -> List[Tuple[str, Path]]:
+    """Extract the supported documents of a ZIP archive into ``dest_dir``.
+
+    Entries are flattened to their base names (deduplicated with a numeric
+    suffix) so archive paths cannot escape ``dest_dir``.  Unsupported entries
+    are skipped.  Sizes are enforced while extracting rather than trusting the
+    archive's headers.
+
+    Args:
+        path: The archive.
+        dest_dir: Directory the documents are extracted into.
+        max_file_size: Largest allowed size of one extracted document.
+        max_total_size: Largest allowed size of all extracted documents.
+        on_error: Receives the entry name and error instead of raising when
+            an entry is too large, or when the documents exceed
+            ``max_total_size`` (the remaining entries are then skipped).  An
+            entry that fails is not extracted; the others are.
+
+    Returns:
+        A list of ``(filename, extracted_path)`` pairs in archive order.
+
+    Raises:
+        ValueError: If the archive is invalid, or a size limit is exceeded
+            and no ``on_error`` is given.
+    """
+    dest = Path(dest_dir)
+    extracted: List[Tuple[str, Path]] = []
+    seen: Dict[str, int] = {}
+    total = 0
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as err:
+        raise ValueError(f"Invalid ZIP archive: {err}")
+    with archive:
+        for info in archive.infolist():
+            name = Path(info.filename).name
+            if info.is_dir() or Path(name).suffix.lower() not in BULK_EXTENSIONS:
+                continue
+            count = seen.get(name, 0)
+            seen[name] = count + 1
+            target = dest / (f"{count}-{name}" if count else name)
+            size = 0
+            error = None
+            with archive.open(info) as src, open(target, "wb") as out:
+                while True:
+                    block = src.read(1024 * 1024)
+                    if not block:
+                        break
+                    size += len(block)
+                    total += len(block)
+                    if size > max_file_size:
+                        error = ValueError(f"{name} exceeds the per-file size limit")
+                    elif total > max_total_size:
+                        error = ValueError("ZIP archive exceeds the total size limit")
+                    if error is not None:
+                        break
+                    out.write(block)
+            if error is None:
+                extracted.append((name, target))
+                continue
+            target.unlink()
+            if on_error is None:
+                raise error
+            on_error(name, error)
+            if total > max_total_size:
+                break
+            # A rejected entry does not count towards the archive's total
+            total -= size
+    return extracted
+
+
+def _parse_document(
+    source: FileSource, filename: str, mime_type: str | None = None
+) -> Tuple[List[str], List[Dict[str, Any]], str, float]:
+    """Parse, validate and chunk one document of a bulk upload.
+
+    Runs in worker processes.  Returns the chunks, their metadata, the
+    document's SHA-256 digest and the time spent.
+    """
+    start = time.perf_counter()
+    digest = hashlib.sha256()
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(block)
+    else:
+        digest.update(source)
+    pages = read_pages(source, filename=filename, mime_type=mime_type)
+    validate_input("\n".join(pages))
+    chunks, metadatas = chunk_document(pages)
+    return chunks, metadatas, digest.hexdigest(), time.perf_counter() - start
+
+
+def ingest_bulk(
+    files: List[BulkFile],
+    workers: int = 1,
+    on_stage: Callable[[str], None] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Ingest many documents into a single combined vector store.
+
+    Documents are parsed and chunked concurrently across ``workers``
+    processes.  A document that fails to parse or validate is reported and
+    skipped without aborting the batch.  The chunks of all remaining documents
+    are embedded in large shared batches into one store whose metadata records
+    each chunk's ``source`` file, ``doc_id`` (the document's SHA-256 digest)
+    and position (``chunk``).
+
+    Args:
+        files: ``(filename, data, mime_type)`` entries; ``data`` is bytes, a
+            file path or the error that prevented staging the file, and
+            ``mime_type`` may be ``None``.
+        workers: Number of parsing processes.
+        on_stage: Receives the name of each stage (``parsing``, ``embedding``).
+        on_progress: Receives the number of chunks embedded so far.
+
+    Returns:
+        A tuple ``(vectorstore, report)``.  ``vectorstore`` is ``None`` when no
+        document produced chunks.  ``report`` lists, per file, its status,
+        chunk count, parse time and any error, plus totals and the time spent
+        embedding.
+    """
+    stage = on_stage or (lambda _: None)
+    stage("parsing")
+    documents: List[Dict[str, Any]] = []
+    parsed: List[Tuple[str, List[str], List[Dict[str, Any]], str]] = []
+    # Entries that failed staging keep their error and are not parsed
+    outcomes: List[Any] = [data if isinstance(data, Exception) else None for _, data, _ in files]
+    pending = [n for n, outcome in enumerate(outcomes) if outcome is None]
+    if workers > 1 and len(pending) > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)), mp_context=process_pool_context()
+        )
+        futures = {
+            n: pool.submit(_parse_document, files[n][1], files[n][0], files[n][2])
+            for n in pending
+        }
+        for n, future in futures.items():
+            try:
+                outcomes[n] = future.result()
+            except Exception as err:
+                outcomes[n] = err
+        pool.shutdown()
+    else:
+        for n in pending:
+            name, data, mime = files[n]
+            try:
+                outcomes[n] = _parse_document(data, name, mime)
+            except Exception as err:
+                outcomes[n] = err
+
+    seen_ids: Dict[str, str] = {}
+    for (name, _, _), outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            documents.append({"filename": name, "status": "failed", "error": str(outcome)})
+            continue
+        chunks, metadatas, doc_id, seconds = outcome
+        report = {
+            "filename": name,
+            "doc_id": doc_id,
+            "chunks": len(chunks),
+            "parse_seconds": round(seconds, 6),
+        }
+        if doc_id in seen_ids:
+            report.update(status="skipped", error=f"Duplicate of {seen_ids[doc_id]}")
+        elif not chunks:
+            report.update(status="failed", error="No text extracted")
+        else:
+            report["status"] = "ok"
+            seen_ids[doc_id] = name
+            parsed.append((name, chunks, metadatas, doc_id))
+        documents.append(report)
+
+    def _chunks() -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for name, chunks, metadatas, doc_id in parsed:
+            for position, (chunk, meta) in enumerate(zip(chunks, metadatas)):
+                yield chunk, {**meta, "source": name, "doc_id": doc_id, "chunk": position}
+
+    stage("embedding")
+    vectorstore = None
+    total = 0
+    start = time.perf_counter()
+    if parsed:
+        vectorstore, total = embed_chunks(
+            _chunks(),
+            batch_size=BULK_EMBED_BATCH_SIZE,
+            on_batch=on_progress,
+            keyed=True,
+        )
+    return vectorstore, {
+        "documents": documents,
+        "chunks": total,
+        "failed": sum(1 for d in documents if d["status"] == "failed"),
+        "embed_seconds": round(time.perf_counter() - start, 6),
+    }
+
+
+def stage_uploads(
+    uploads: List[Tuple[str, Path, str | None]],
+    dest_dir: str | Path,
+    max_file_size: int,
+    max_total_size: int,
+) -> List[BulkFile]:
+    """Expand ZIP archives among spooled ``uploads`` into individual documents.
+
+    ``uploads`` are ``(filename, path, mime_type)`` entries; archives are
+    recognised with :func:`is_zip`.  Other uploads are passed through
+    unchanged.  Documents extracted from archives have no MIME type and are
+    identified by extension.  An invalid archive, or an archive entry over
+    a size limit, becomes an entry carrying its error (see :data:`BulkFile`)
+    so :func:`ingest_bulk` reports it as failed and ingests the rest.
+    """
+    files: List[BulkFile] = []
+    for name, path, mime_type in uploads:
+        if is_zip(name, mime_type):
+            sub_dir = Path(dest_dir) / f"zip-{len(files)}-{Path(name).stem}"
+            sub_dir.mkdir(parents=True, exist_ok=True)
+            failed: List[BulkFile] = []
+            try:
+                extracted = expand_zip(
+                    path,
+                    sub_dir,
+                    max_file_size,
+                    max_total_size,
+                    on_error=lambda entry, err: failed.append((entry, err, None)),
+                )
+            except ValueError as err:
+                files.append((name, err, None))
+                continue
+            files.extend((entry, entry_path, None) for entry, entry_path in extracted)
+            files.extend(failed)
+        else:
+            files.append((name, path, mime_type))
+    return files
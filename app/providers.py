@@ -0,0 +1,122 @@
+"""Pluggable embedding providers.
+
+The provider used for ingestion and retrieval is chosen by the
+``DOCUSEC_EMBEDDING_PROVIDER`` environment variable:
+
+``openai`` (default)
+    OpenAI embeddings through LangChain.
+``local``
+    :class:`HashingEmbeddings`, a dependency-free NumPy backend that needs no
+    network access.  Intended for CI, load tests and low-sensitivity
+    workloads; its vectors capture shared vocabulary rather than meaning.
+
+A store must be queried with the provider that built it, since providers
+produce vectors of different dimensions.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    from langchain_core.embeddings import Embeddings
+except Exception:  # pragma: no cover - executed only when package missing
+    Embeddings = object  # type: ignore[assignment,misc]
+
+try:  # pragma: no cover - optional community dependency
+    from langchain.embeddings import OpenAIEmbeddings
+except Exception:  # pragma: no cover - executed only when packages missing
+    OpenAIEmbeddings = None  # type: ignore[assignment]
+
+EMBEDDING_PROVIDER = os.getenv("DOCUSEC_EMBEDDING_PROVIDER", "openai")
+HASH_EMBEDDING_DIM = int(os.getenv("DOCUSEC_HASH_EMBEDDING_DIM", "384"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Local embeddings from hashed word unigrams and bigrams.
+
+    Each feature is hashed into one of ``dim`` buckets with a hashed sign,
+    weighted by ``1 + log(count)`` and the vector L2-normalised, so cosine
+    similarity approximates TF overlap.  Hashing uses BLAKE2b rather than
+    :func:`hash`, so vectors are identical across processes and restarts.
+    """
+
+    # Cheaper to recompute than to look up in the embedding cache
+    cacheable = False
+
+    def __init__(self, dim: int = HASH_EMBEDDING_DIM) -> None:
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    def _features(self, text: str) -> Dict[str, int]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for first, second in zip(tokens, tokens[1:]):
+            bigram = f"{first} {second}"
+            counts[bigram] = counts.get(bigram, 0) + 1
+        return counts
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed each of ``texts``."""
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string."""
+        return self._embed(text)
+
+
+def _openai() -> Any:
+    if OpenAIEmbeddings is None:
+        raise ImportError("LangChain OpenAI embeddings are unavailable")
+    return OpenAIEmbeddings()
+
+
+_PROVIDERS: Dict[str, Callable[[], Any]] = {
+    "openai": _openai,
+    "local": HashingEmbeddings,
+}
+
+
+def register_provider(name: str, factory: Callable[[], Any]) -> None:
+    """Make an embeddings factory selectable as ``name``."""
+    _PROVIDERS[name] = factory
+
+
+def get_provider(name: str | None = None) -> Any:
+    """Return a new embeddings object for ``name``.
+
+    Args:
+        name: Registered provider name; defaults to
+            :data:`EMBEDDING_PROVIDER`.
+
+    Raises:
+        ValueError: If no provider is registered under ``name``.
+    """
+    name = name or EMBEDDING_PROVIDER
+    try:
+        factory = _PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown embedding provider: {name}")
+    return factory()
@@ -1,12 +1,164 @@
+import codecs
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Any
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
 
 try:  # pragma: no cover - optional dependency
-    from langsmith.run_helpers import trace  # type: ignore[import]
+    from langsmith.run_helpers import trace as _langsmith_trace  # type: ignore[import]
 except Exception:  # pragma: no cover - executed when langsmith missing
-    @contextmanager
-    def trace(_: str, **__: object):  # type: ignore[override]
-        yield
+    _langsmith_trace = None
+
+# Where sampled spans go: "langsmith" (when installed), "local" (JSON lines
+# appended to TRACE_FILE, no network) or "none".  Stage timings are recorded
+# for every span whatever the sink.
+TRACE_SINK = os.getenv(
+    "DOCUSEC_TRACE_SINK", "langsmith" if _langsmith_trace is not None else "none"
+)
+# Fraction of spans sent to the sink
+TRACE_SAMPLE_RATE = float(os.getenv("DOCUSEC_TRACE_SAMPLE_RATE", "1.0"))
+TRACE_FILE = Path(os.getenv("DOCUSEC_TRACE_FILE", "traces.jsonl"))
+# Spans kept in memory by the local sink, newest last
+_RECENT_SPANS = 100
+# Sequence items hashed when summarizing a payload; longer ones are counted
+_SUMMARY_HASH_ITEMS = 10_000
+
+
+def _digest(data: Any) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def summarize(value: Any) -> Any:
+    """Describe a trace payload by counts, sizes and hashes instead of content.
+
+    Strings and bytes become their length and a short SHA-256 prefix; lists
+    become their length, total text size and a hash over their items;
+    mappings are summarized per key.  Numbers, booleans and ``None`` are
+    kept as they are.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return {"chars": len(value), "sha256": _digest(value.encode("utf-8"))}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"bytes": len(value), "sha256": _digest(value)}
+    if isinstance(value, dict):
+        return {str(key): summarize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        digest = hashlib.sha256()
+        chars = 0
+        for item in value[:_SUMMARY_HASH_ITEMS]:
+            text = item if isinstance(item, str) else repr(item)
+            chars += len(text)
+            digest.update(text.encode("utf-8", "surrogatepass"))
+        return {"count": len(value), "chars": chars, "sha256": digest.hexdigest()[:16]}
+    return {"type": type(value).__name__}
+
+
+class StageTimings:
+    """Thread-safe wall-time totals per traced stage."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(
+                name, {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            stage["calls"] += 1
+            stage["errors"] += failed
+            stage["total_seconds"] += seconds
+            stage["max_seconds"] = max(stage["max_seconds"], seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return per-stage calls, errors and total/mean/max wall time."""
+        with self._lock:
+            return {
+                name: {
+                    **stage,
+                    "total_seconds": round(stage["total_seconds"], 6),
+                    "mean_seconds": round(stage["total_seconds"] / stage["calls"], 6),
+                    "max_seconds": round(stage["max_seconds"], 6),
+                }
+                for name, stage in self._stages.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+# Process-wide stage timings across all traced spans
+stage_timings = StageTimings()
+_recent_spans: "deque[Dict[str, Any]]" = deque(maxlen=_RECENT_SPANS)
+_sink_lock = threading.Lock()
+
+
+def _write_local(span: Dict[str, Any]) -> None:
+    """Append ``span`` to :data:`TRACE_FILE` and the in-memory buffer."""
+    line = json.dumps(span, default=str)
+    with _sink_lock:
+        _recent_spans.append(span)
+        with TRACE_FILE.open("a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+
+def trace_stats() -> Dict[str, Dict[str, float]]:
+    """Return wall-time statistics for every traced stage."""
+    return stage_timings.snapshot()
+
+
+def recent_spans() -> List[Dict[str, Any]]:
+    """Return the spans most recently written by the local sink."""
+    with _sink_lock:
+        return list(_recent_spans)
+
+
+@contextmanager
+def trace(name: str, inputs: Dict[str, Any] | None = None, **kwargs: Any) -> Iterator[Any]:
+    """Time the enclosed block as stage ``name`` and maybe export a span.
+
+    Wall time always goes to :data:`stage_timings`.  A
+    :data:`TRACE_SAMPLE_RATE` fraction of spans is also sent to
+    :data:`TRACE_SINK`, with ``inputs`` replaced by :func:`summarize` so no
+    document text or questions leave the process.
+    """
+    sampled = TRACE_SINK != "none" and (
+        TRACE_SAMPLE_RATE >= 1.0 or random.random() < TRACE_SAMPLE_RATE
+    )
+    started = time.time()
+    start = time.perf_counter()
+    failed = False
+    try:
+        if sampled and TRACE_SINK == "langsmith" and _langsmith_trace is not None:
+            with _langsmith_trace(name, inputs=summarize(inputs or {}), **kwargs) as run:
+                yield run
+        else:
+            yield None
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        stage_timings.record(name, seconds, failed)
+        if sampled and TRACE_SINK == "local":
+            _write_local(
+                {
+                    "name": name,
+                    "start": started,
+                    "seconds": round(seconds, 6),
+                    "error": failed,
+                    "inputs": summarize(inputs or {}),
+                }
+            )
 
 
 def health() -> dict:
@@ -16,31 +168,135 @@ def health() -> dict:
 
 try:  # pragma: no cover - optional dependency
     from charset_normalizer import from_bytes as _from_bytes
+    from charset_normalizer.md import mess_ratio as _mess_ratio
 except Exception:  # pragma: no cover - executed when library missing
     _from_bytes = None
+    _mess_ratio = None
+
+
+# Bytes examined when the encoding has to be guessed.  Even, so UTF-16 input
+# without a BOM is never cut mid code unit.
+DETECT_SAMPLE_SIZE = 64 * 1024
+# Single-byte codecs decode almost any bytes without error, so a guess is only
+# trusted when the decoded text scores at most this on charset_normalizer's
+# "mess" measure (its own default threshold).
+MAX_MESS_RATIO = 0.2
+# Tried after charset_normalizer's pick when that does not decode the sample
+# readably.  Never tried first: other Windows code pages (cp1250, cp1254,
+# cp1257, ...) also decode as cp1252 without error and with a low mess ratio,
+# just to the wrong letters.
+LIKELY_CODECS = ("cp1252",)
+# UTF-32 marks are checked before UTF-16 because BOM_UTF32_LE starts with
+# BOM_UTF16_LE.
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _plausible(sample: bytes, codec: str) -> bool:
+    """Return ``True`` if ``sample`` decodes cleanly and readably with ``codec``."""
+    try:
+        text = sample.decode(codec)
+    except (UnicodeDecodeError, LookupError):
+        return False
+    return _mess_ratio(text, maximum_threshold=1.0) <= MAX_MESS_RATIO
+
+
+def _guess_codec(data: Any, sample_size: int) -> str | None:
+    """Guess the codec of ``data`` from its first and last ``sample_size`` bytes."""
+    head = bytes(data[:sample_size])
+    # A tail cut mid character fails the check and defers to full detection
+    tail = bytes(data[-sample_size:]) if len(data) > sample_size else b""
+    candidates = []
+    try:
+        match = _from_bytes(head).best()
+    except Exception:
+        match = None
+    if match is not None:
+        candidates.append(match.encoding)
+    candidates.extend(codec for codec in LIKELY_CODECS if codec not in candidates)
+    for codec in candidates:
+        if _plausible(head, codec) and (not tail or _plausible(tail, codec)):
+            return codec
+    return None
+
+
+def _decode_tiered(data: Any, sample_size: int = DETECT_SAMPLE_SIZE) -> Tuple[str, str]:
+    """Decode ``data`` and report which tier of :func:`decode_bytes` succeeded.
+
+    Returns:
+        A tuple ``(text, tier)`` where ``tier`` is one of ``"bom"``,
+        ``"utf-8"``, ``"sample"``, ``"full"`` or ``"lossy"``.
+    """
+    head = bytes(data[:4])
+    for bom, codec in _BOMS:
+        if head.startswith(bom):
+            try:
+                return str(data, codec), "bom"
+            except UnicodeDecodeError:
+                break
+
+    try:
+        text = str(data, "utf-8")
+    except UnicodeDecodeError:
+        pass
+    else:
+        # ASCII-heavy UTF-16/32 without a BOM is also valid UTF-8, but with a
+        # NUL in every second or fourth byte.  Occasional NULs are kept as text.
+        window = text[:sample_size]
+        if window.count("\x00") * 4 < len(window):
+            return text, "utf-8"
+
+    if _from_bytes is not None:
+        codec = _guess_codec(data, sample_size)
+        if codec is not None:
+            try:
+                return str(data, codec), "sample"
+            except UnicodeDecodeError:
+                pass
+        try:
+            match = _from_bytes(bytes(data)).best()
+            if match is not None:
+                return str(match), "full"
+        except Exception:
+            pass
+
+    return str(data, "utf-8", errors="ignore"), "lossy"
+
+
+def decode_bytes(data: Any, sample_size: int = DETECT_SAMPLE_SIZE) -> str:
+    """Decode raw document bytes to text, trying the cheapest option first.
+
+    The tiers are, in order: a byte order mark selecting UTF-8/16/32; strict
+    UTF-8, which covers the vast majority of inputs; a codec guessed from the
+    first and last ``sample_size`` bytes (:mod:`charset_normalizer`'s pick,
+    then :data:`LIKELY_CODECS`), used only if both samples decode to
+    readable text and the whole payload then decodes strictly; detection over
+    the whole payload; and finally UTF-8 with ``errors="ignore"``.
+
+    Args:
+        data: Any bytes-like object, including ``memoryview`` and ``mmap``.
+        sample_size: Number of leading bytes used for charset detection.
+    """
+    return _decode_tiered(data, sample_size)[0]
 
 
 def ensure_utf8(text: Any) -> str:
     """Return ``text`` as a UTF-8 encoded string.
 
     ``text`` may be raw bytes from a vector store or any object that can be
-    stringified. Bytes are decoded using :mod:`charset_normalizer` when
-    available, falling back to UTF-8 with ``errors="ignore"``. Non-string
+    stringified. Bytes are decoded with :func:`decode_bytes`. Non-string
     objects are coerced to strings and re-encoded as UTF-8 to strip any invalid
     characters.
     """
 
     if isinstance(text, bytes):
-        if _from_bytes is not None:
-            try:
-                result = _from_bytes(text).best()
-                if result is not None:
-                    return str(result)
-            except Exception:
-                pass
-        return text.decode("utf-8", errors="ignore")
+        return decode_bytes(text)
 
     if not isinstance(text, str):
         text = str(text)
     return text.encode("utf-8", errors="ignore").decode("utf-8", errors="ignore")
-
@@ -1,4 +1,5 @@
 import re
+from typing import Iterable, Iterator
 
 # Patterns that indicate potential prompt/SQL/code injection
 _PROHIBITED_PATTERNS = {
@@ -22,6 +23,17 @@ def validate_input(text: str) -> None:
             raise ValueError(f"Input rejected: {reason} detected.")
 
 
+def validate_stream(texts: Iterable[str]) -> Iterator[str]:
+    """Yield ``texts`` unchanged after checking each with :func:`validate_input`.
+
+    The prohibited patterns never span a line break, so validating a document
+    page by page is equivalent to validating the joined text.
+    """
+    for text in texts:
+        validate_input(text)
+        yield text
+
+
 def validate_policy_name(name: str) -> None:
     """Ensure policy names contain only allowed characters."""
 
@@ -29,3 +41,12 @@ def validate_policy_name(name: str) -> None:
         raise ValueError(
             "Invalid policy name. Use only letters, numbers, underscores, and hyphens."
         )
+
+
+def validate_document_id(doc_id: str) -> None:
+    """Ensure document ids contain only allowed characters."""
+
+    if not _POLICY_NAME_PATTERN.match(doc_id):
+        raise ValueError(
+            "Invalid document id. Use only letters, numbers, underscores, and hyphens."
+        )
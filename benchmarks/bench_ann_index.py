@@ -0,0 +1,71 @@
+"""Benchmark approximate FAISS indexes against exact (flat) search.
+
+Builds every index type from :mod:`app.ann_index` over the same synthetic,
+clustered unit vectors and reports build time, mean query latency and
+recall@k, i.e. the fraction of the exact top-k that each index returns.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_ann_index.py --chunks 200000 --dim 384 --k 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from app.ann_index import INDEX_TYPES, build_index
+
+
+def make_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    """Return ``count`` unit vectors drawn around 256 random topic centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((256, dim), dtype=np.float32)
+    vectors = centres[rng.integers(0, len(centres), count)]
+    vectors += 0.6 * rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.chunks, args.dim, seed=0)
+    queries = make_vectors(args.queries, args.dim, seed=1)
+
+    print(f"{args.chunks} chunks x {args.dim} dims, {args.queries} queries, k={args.k}")
+    print(f"{'index':<8}{'build s':>10}{'query ms':>10}{'recall@k':>10}")
+    exact = None
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        built = time.perf_counter()
+        ids = np.empty((args.queries, args.k), dtype=np.int64)
+        # One query at a time, as the RAG chain issues them
+        for n, query in enumerate(queries):
+            ids[n] = index.search(query[None, :], args.k)[1][0]
+        queried = time.perf_counter()
+        if exact is None:
+            exact = ids
+        recall = np.mean(
+            [len(set(row) & set(truth)) / args.k for row, truth in zip(ids, exact)]
+        )
+        print(
+            f"{index_type:<8}{built - start:>10.2f}"
+            f"{(queried - built) * 1000 / args.queries:>10.3f}{recall:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
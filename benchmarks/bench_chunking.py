@@ -0,0 +1,122 @@
+"""Benchmark the token-offset chunker against LangChain's recursive splitter.
+
+Builds a multi-megabyte synthetic policy and chunks it twice with
+:func:`app.ingestion.chunk_document`: once with the default token-window
+chunker and once with ``RecursiveCharacterTextSplitter`` measuring candidates
+with the same tokenizer (the previous default).  Reports tokenizer calls and
+wall time for each.
+
+When the ``cl100k_base`` encoding cannot be downloaded, a byte-level
+``tiktoken`` encoding built locally is used instead.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_chunking.py --megabytes 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import tiktoken
+
+import app.ingestion as ingestion
+
+WORDS = (
+    "access accounts administrators annually approved assets audit "
+    "authentication authorized backup changes confidential controls data "
+    "encryption employees incidents information logging management monitoring "
+    "owner passwords personnel privileged procedures protected records "
+    "reviewed risk security systems third-party training vendors"
+).split()
+
+
+def build_policy(megabytes: float, seed: int = 0) -> str:
+    """Return a synthetic policy of roughly ``megabytes`` MB."""
+    rng = random.Random(seed)
+    parts = ["Information Security Policy"]
+    size = 0
+    while size < megabytes * 1_000_000:
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize()
+            + "."
+            for _ in range(rng.randint(3, 40))
+        ]
+        paragraph = " ".join(sentences)
+        parts.append(paragraph + "\n")
+        size += len(paragraph) + 1
+    return "\n".join(parts)
+
+
+def load_encoding() -> tiktoken.Encoding:
+    """Return ``cl100k_base`` or a locally built byte-level fallback."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return tiktoken.Encoding(
+            name="bench_bytes",
+            pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\w+| ?\d+| ?[^\s\w]+|\s+""",
+            mergeable_ranks={bytes([i]): i for i in range(256)},
+            special_tokens={},
+        )
+
+
+class CountingEncoding:
+    """Proxy that counts ``encode`` calls on a tiktoken encoding."""
+
+    def __init__(self, enc: tiktoken.Encoding) -> None:
+        self.enc = enc
+        self.calls = 0
+
+    def encode(self, text: str, **kwargs: object) -> list[int]:
+        self.calls += 1
+        return self.enc.encode(text, **kwargs)
+
+    def decode_bytes(self, tokens: list[int]) -> bytes:
+        return self.enc.decode_bytes(tokens)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=3.0)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--overlap", type=int, default=50)
+    args = parser.parse_args()
+
+    text = build_policy(args.megabytes)
+    enc = load_encoding()
+    print(f"policy: {len(text) / 1e6:.1f} MB, encoding: {enc.name}")
+
+    native = CountingEncoding(enc)
+    ingestion._get_encoding = lambda: native  # type: ignore[assignment]
+    start = time.perf_counter()
+    chunks, _ = ingestion.chunk_document(text, args.chunk_size, args.overlap)
+    native_time = time.perf_counter() - start
+
+    legacy = CountingEncoding(enc)
+    start = time.perf_counter()
+    legacy_chunks, _ = ingestion.chunk_document(
+        text,
+        args.chunk_size,
+        args.overlap,
+        length_func=lambda txt: len(legacy.encode(txt)),
+    )
+    legacy_time = time.perf_counter() - start
+
+    print(f"{'chunker':<22}{'chunks':>8}{'encode calls':>14}{'seconds':>10}")
+    print(f"{'token offsets':<22}{len(chunks):>8}{native.calls:>14}{native_time:>10.2f}")
+    print(
+        f"{'recursive splitter':<22}{len(legacy_chunks):>8}"
+        f"{legacy.calls:>14}{legacy_time:>10.2f}"
+    )
+    print(f"speedup x{legacy_time / native_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark tiled control × chunk scoring against per-control searches.
+
+Builds a FAISS policy store of ``--chunks`` synthetic unit vectors and scores
+``--controls`` control vectors against it two ways:
+
+``per-control``
+    One ``similarity_search_with_score_by_vector`` call and sort per control,
+    as :func:`app.control_mapper.check_framework_coverage` did.
+``matrix``
+    One :func:`app.coverage_matrix.top_k_cosine` call over the store's
+    vectors, processed in tiles.
+
+Reports wall time of each and how often their top-k sets agree.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_coverage_matrix.py --controls 1000 --chunks 50000 --dim 384
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.coverage_matrix import chunk_vectors, top_k_cosine
+from app.embeddings import FAISS
+
+
+class NoEmbeddings(Embeddings):
+    """Placeholder; the benchmark only searches by vector."""
+
+    def embed_query(self, text: str) -> list[float]:
+        raise NotImplementedError
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        raise NotImplementedError
+
+
+def unit_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--controls", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    chunks = unit_vectors(args.chunks, args.dim, seed=0)
+    controls = unit_vectors(args.controls, args.dim, seed=1)
+    store = FAISS.from_embeddings(
+        [(f"chunk {n}", vector) for n, vector in enumerate(chunks)],
+        NoEmbeddings(),
+        metadatas=[{"n": n} for n in range(args.chunks)],
+    )
+
+    start = time.perf_counter()
+    looped = []
+    for vector in controls.tolist():
+        hits = store.similarity_search_with_score_by_vector(vector, k=args.k)
+        hits.sort(key=lambda hit: hit[1])
+        looped.append({doc.metadata["n"] for doc, _ in hits})
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors, scales = chunk_vectors(store)
+    indices, _ = top_k_cosine(controls, vectors, args.k, scales=scales)
+    matrix_seconds = time.perf_counter() - start
+
+    agreement = np.mean([set(row.tolist()) == hits for row, hits in zip(indices, looped)])
+    print(f"{args.controls} controls x {args.chunks} chunks x {args.dim} dims, k={args.k}")
+    print(f"per-control: {loop_seconds:8.2f} s")
+    print(f"matrix:      {matrix_seconds:8.2f} s  ({loop_seconds / matrix_seconds:.1f}x)")
+    print(f"identical top-k sets: {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark tiered text decoding against full-payload charset detection.
+
+Builds a multi-megabyte synthetic policy, encodes it as UTF-8, UTF-8 with a
+BOM, UTF-16 and cp1252, and decodes each fixture twice: with
+:func:`app.utils.decode_bytes` (reporting which tier handled it) and with
+``charset_normalizer.from_bytes(...).best()`` over the whole payload (the
+previous behaviour).  Reports throughput in MB/s for each.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_decoding.py --megabytes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from charset_normalizer import from_bytes
+
+from app.utils import _decode_tiered
+
+WORDS = (
+    "access accounts administrators annually approved assets audit "
+    "authentication authorized backup changes confidential controls data "
+    "encryption employees incidents information logging management monitoring "
+    "owner passwords personnel privileged procedures protected records "
+    "reviewed risk security systems third-party training vendors "
+    "“policy” café naïve €"
+).split()
+
+
+def build_policy(megabytes: float, seed: int = 0) -> str:
+    """Return a synthetic policy of roughly ``megabytes`` MB."""
+    rng = random.Random(seed)
+    lines = []
+    size = 0
+    while size < megabytes * 1_000_000:
+        line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))) + "."
+        lines.append(line.capitalize())
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def best_time(fn, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` calls to ``fn``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = build_policy(args.megabytes)
+    fixtures = {
+        "utf-8": text.encode("utf-8"),
+        "utf-8 bom": text.encode("utf-8-sig"),
+        "utf-16": text.encode("utf-16"),
+        "cp1252": text.encode("cp1252"),
+    }
+    print(f"{'fixture':<12}{'MB':>6}{'tier':>8}{'tiered MB/s':>14}{'full MB/s':>12}{'speedup':>9}")
+    for name, data in fixtures.items():
+        size_mb = len(data) / 1e6
+        decoded, tier = _decode_tiered(data)
+        assert decoded == text, f"{name} decoded incorrectly via {tier}"
+        tiered = best_time(lambda: _decode_tiered(data), args.repeat)
+        full = best_time(lambda: str(from_bytes(data).best()), args.repeat)
+        print(
+            f"{name:<12}{size_mb:>6.1f}{tier:>8}{size_mb / tiered:>14.1f}"
+            f"{size_mb / full:>12.1f}{full / tiered:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
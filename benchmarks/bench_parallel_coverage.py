@@ -0,0 +1,87 @@
+"""Benchmark concurrent framework coverage against sequential coverage.
+
+Runs :func:`app.control_mapper.check_framework_coverage` over ``--controls``
+controls against a store whose searches sleep ``--latency`` milliseconds, as
+a remote vector store or federated search over slow disks would, and
+returns chunks of ``--sentences`` sentences to quote from.  Reports wall
+time sequentially and with each ``--workers`` setting.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_parallel_coverage.py --controls 500 --latency 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.control_mapper import check_framework_coverage
+
+WORDS = (
+    "access accounts administrators annually approved audit authentication "
+    "backup changes configuration controls data encrypted incident logging "
+    "monitored monthly network passwords privileged quarterly records "
+    "recovery reviewed risk security systems tested training users vendors"
+).split()
+
+
+class Chunk:
+    def __init__(self, text: str) -> None:
+        self.page_content = text
+
+
+class SlowStore:
+    """Text-only store that returns random chunks after a fixed delay."""
+
+    def __init__(self, chunks: list, latency: float) -> None:
+        self.chunks = chunks
+        self.latency = latency
+
+    def similarity_search(self, query: str, k: int = 4) -> list:
+        time.sleep(self.latency)
+        rng = random.Random(query)
+        return [Chunk(text) for text in rng.sample(self.chunks, k)]
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(6, 18))).capitalize() + "."
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--controls", type=int, default=500)
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--sentences", type=int, default=8, help="sentences per chunk")
+    parser.add_argument("--latency", type=float, default=20.0, help="ms per search")
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    chunks = [" ".join(sentence(rng) for _ in range(args.sentences)) for _ in range(args.chunks)]
+    controls = [
+        {"framework_title": "Bench", "control_number": str(n), "control_language": sentence(rng)}
+        for n in range(args.controls)
+    ]
+    store = SlowStore(chunks, args.latency / 1000)
+
+    print(f"{args.controls} controls, {args.latency:g} ms per search")
+    start = time.perf_counter()
+    expected = check_framework_coverage(store, controls, k=3)
+    sequential = time.perf_counter() - start
+    print(f"{'sequential':<12}{sequential:8.2f} s")
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = check_framework_coverage(store, controls, k=3, max_workers=workers)
+        seconds = time.perf_counter() - start
+        same = "identical" if results == expected else "DIFFERENT"
+        print(f"{f'{workers} workers':<12}{seconds:8.2f} s  ({sequential / seconds:.1f}x, {same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark serial versus page-parallel PDF text extraction.
+
+Generates a large synthetic policy binder with PyMuPDF and times
+:func:`app.ingestion.read_pages` with an increasing number of workers.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_pdf_extraction.py --pages 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import fitz  # type: ignore
+
+from app.ingestion import read_pages
+
+PARAGRAPH = (
+    "Access to production systems is reviewed quarterly by the system owner. "
+    "Privileged accounts require multi-factor authentication and are logged. "
+)
+
+
+def build_pdf(path: Path, pages: int) -> None:
+    """Write a ``pages``-page PDF filled with policy-like text."""
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        body = f"Section {number + 1}\n" + PARAGRAPH * 30
+        page.insert_textbox(page.rect + (36, 36, -36, -36), body, fontsize=9)
+    doc.save(path)
+
+
+def time_extraction(path: Path, workers: int, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` extractions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read_pages(path, filename=path.name, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "binder.pdf"
+        build_pdf(path, args.pages)
+        size_mb = path.stat().st_size / 1e6
+        print(f"{args.pages} pages, {size_mb:.1f} MB")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            elapsed = time_extraction(path, workers, args.repeat)
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:<3d} {elapsed * 1000:8.1f} ms  "
+                f"speedup x{baseline / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
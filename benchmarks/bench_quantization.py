@@ -0,0 +1,81 @@
+"""Benchmark quantized flat stores: memory saved versus recall lost.
+
+Writes the same synthetic, clustered unit vectors as float32, float16 and
+int8 flat stores with :func:`app.flatstore.write_flat_store`, then reports
+the size of each store's vectors, mean query latency and recall@k against
+the float32 results.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_quantization.py --chunks 100000 --dim 1536 --k 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from app.flatstore import QUANTIZATIONS, FlatVectorStore, top_k, write_flat_store
+
+
+def make_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    """Return ``count`` unit vectors drawn around 256 random topic centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((256, dim), dtype=np.float32)
+    vectors = centres[rng.integers(0, len(centres), count)]
+    vectors += 0.6 * rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = make_vectors(args.chunks, args.dim, seed=0)
+    queries = make_vectors(args.queries, args.dim, seed=1)
+    texts = [""] * args.chunks
+    metadatas = [{}] * args.chunks
+
+    print(f"{args.chunks} chunks x {args.dim} dims, {args.queries} queries, k={args.k}")
+    print(f"{'vectors':<9}{'MB':>9}{'saved':>8}{'query ms':>10}{'recall@k':>10}")
+    exact = None
+    base_mb = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantization in QUANTIZATIONS:
+            path = Path(tmp) / quantization
+            write_flat_store(path, texts, metadatas, vectors, quantization=quantization)
+            store = FlatVectorStore.load(path, embeddings=None)
+            size_mb = sum(
+                (path / name).stat().st_size
+                for name in ("vectors.npy", "scales.npy", "norms.npy")
+                if (path / name).exists()
+            ) / 1e6
+            start = time.perf_counter()
+            ids = np.array([top_k(store._distances(query), args.k) for query in queries])
+            elapsed = time.perf_counter() - start
+            if exact is None:
+                exact, base_mb = ids, size_mb
+            recall = np.mean(
+                [len(set(row) & set(truth)) / args.k for row, truth in zip(ids, exact)]
+            )
+            label = "float32" if quantization == "none" else quantization
+            print(
+                f"{label:<9}{size_mb:>9.1f}{1 - size_mb / base_mb:>8.0%}"
+                f"{elapsed * 1000 / args.queries:>10.2f}{recall:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
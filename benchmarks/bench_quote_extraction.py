@@ -0,0 +1,131 @@
+"""Benchmark quote extraction: trigram Dice versus ``SequenceMatcher``.
+
+Generates synthetic policy chunks and control statements from a shared
+security vocabulary, then picks the best sentence of ``--chunks-per-control``
+chunks for every control two ways:
+
+``sequencematcher``
+    The previous implementation: regex sentence split per call and
+    ``difflib.SequenceMatcher.ratio`` against every sentence.
+``trigram``
+    :class:`app.control_mapper.QuoteExtractor`, with sentences split and
+    reduced to trigram sets once per chunk.
+
+Half of the chunks a control retrieves contain a paraphrase of it (the
+control with some words dropped or replaced), as a chunk that really
+addresses the control would.  Reports the time of each method, the
+agreement rate (how often both pick the same sentence) and how often each
+picks the planted paraphrase.  Chunks without a paraphrase contain only
+unrelated sentences, so which one is "most similar" is close to arbitrary
+and agreement there is reported separately.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_quote_extraction.py --controls 1000 --chunks 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.control_mapper import QuoteExtractor
+
+WORDS = (
+    "access accounts administrators annually approved audit authentication "
+    "authorized backup business changes configuration controls data "
+    "encrypted incident information logging management monitored monthly "
+    "must network passwords personnel privileged procedures quarterly "
+    "records recovery reviewed risk security systems tested third-party "
+    "training users vendors vulnerability"
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(6, 18))
+    return " ".join(words).capitalize() + "."
+
+
+def paraphrase(control: str, rng: random.Random) -> str:
+    """Return ``control`` with about a quarter of its words dropped or replaced."""
+    words = control.rstrip(".").lower().split()
+    kept = []
+    for word in words:
+        roll = rng.random()
+        if roll < 0.125:
+            continue
+        kept.append(rng.choice(WORDS) if roll < 0.25 else word)
+    return " ".join(kept).capitalize() + "."
+
+
+def sequence_matcher_quote(control_lang: str, policy_text: str) -> str:
+    """The previous ``_extract_quote`` implementation."""
+    sentences = re.split(r"(?<=[.!?])\s+", policy_text)
+    best_sentence = policy_text.strip()
+    best_ratio = 0.0
+    control_lower = control_lang.lower()
+    for candidate in sentences:
+        ratio = SequenceMatcher(None, control_lower, candidate.lower()).ratio()
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_sentence = candidate.strip()
+    return best_sentence
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--controls", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--sentences", type=int, default=8, help="sentences per chunk")
+    parser.add_argument("--chunks-per-control", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    chunks = [" ".join(sentence(rng) for _ in range(args.sentences)) for _ in range(args.chunks)]
+    controls = [sentence(rng) for _ in range(args.controls)]
+    # Controls retrieve overlapping chunks, as neighbouring controls do
+    pairs = []
+    planted = []
+    for control in controls:
+        for chunk in rng.sample(chunks, args.chunks_per_control):
+            target = None
+            if rng.random() < 0.5:
+                sentences = re.split(r"(?<=[.!?])\s+", chunk)
+                target = paraphrase(control, rng)
+                sentences[rng.randrange(len(sentences))] = target
+                chunk = " ".join(sentences)
+            pairs.append((control, chunk))
+            planted.append(target)
+
+    start = time.perf_counter()
+    reference = [sequence_matcher_quote(control, chunk) for control, chunk in pairs]
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor = QuoteExtractor()
+    fast = [extractor.extract(control, chunk) for control, chunk in pairs]
+    fast_seconds = time.perf_counter() - start
+
+    def rate(flags: list) -> str:
+        return f"{sum(flags) / max(1, len(flags)):.1%}"
+
+    with_target = [n for n, target in enumerate(planted) if target]
+    without = [n for n, target in enumerate(planted) if not target]
+    print(f"{len(pairs)} extractions, {args.sentences} sentences per chunk")
+    print(f"sequencematcher: {reference_seconds:8.3f} s")
+    print(f"trigram:         {fast_seconds:8.3f} s  ({reference_seconds / fast_seconds:.1f}x)")
+    print(f"agreement, chunks with a paraphrase:    {rate([reference[n] == fast[n] for n in with_target])}")
+    print(f"agreement, chunks without a paraphrase: {rate([reference[n] == fast[n] for n in without])}")
+    print(f"paraphrase found, sequencematcher:      {rate([reference[n] == planted[n] for n in with_target])}")
+    print(f"paraphrase found, trigram:              {rate([fast[n] == planted[n] for n in with_target])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark loading a large policy store in the FAISS and flat formats.
+
+Builds a synthetic store of random unit vectors, saves it with
+:func:`app.embeddings.save_vectorstore` in both formats, then loads each in a
+fresh interpreter and reports load time, the first query's latency and the
+resident memory added by loading.  Flat stores are memory-mapped, so their
+vectors are only paged in as queries touch them and are shared between
+processes through the OS page cache.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_store_format.py --chunks 100000 --dim 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class FixedEmbeddings(Embeddings):
+    """Embeds every query as the same random unit vector."""
+
+    def __init__(self, dim: int) -> None:
+        vector = np.random.default_rng(1).standard_normal(dim).astype(np.float32)
+        self.vector = (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vector for _ in texts]
+
+
+def rss_mb() -> float:
+    """Return this process's resident set size in MB."""
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def build(base_dir: Path, chunks: int, dim: int) -> None:
+    """Save the same synthetic store as ``faiss`` and ``flat``."""
+    import app.embeddings as emb
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((chunks, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"Policy chunk {n} describing access control and logging." for n in range(chunks)]
+    store = emb.FAISS.from_embeddings(
+        list(zip(texts, vectors)),
+        FixedEmbeddings(dim),
+        metadatas=[{"policy": "bench", "chunk": n} for n in range(chunks)],
+    )
+    for fmt in ("faiss", "flat"):
+        emb.save_vectorstore(store, fmt, base_dir=base_dir, format=fmt)
+
+
+def child(base_dir: Path, fmt: str, dim: int) -> None:
+    """Load one store and print its timings as JSON."""
+    import app.embeddings as emb
+
+    emb.get_embeddings = lambda: FixedEmbeddings(dim)  # type: ignore[assignment]
+    before = rss_mb()
+    start = time.perf_counter()
+    store = emb.load_vectorstore(fmt, base_dir=base_dir)
+    loaded = time.perf_counter()
+    store.similarity_search_with_score("access reviews", k=5)
+    queried = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "load_ms": (loaded - start) * 1000,
+                "query_ms": (queried - loaded) * 1000,
+                "rss_mb": rss_mb() - before,
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--child", nargs=2, metavar=("BASE_DIR", "FORMAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(Path(args.child[0]), args.child[1], args.dim)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        build(base_dir, args.chunks, args.dim)
+        size_mb = sum(f.stat().st_size for f in base_dir.rglob("*") if f.is_file()) / 2e6
+        print(f"{args.chunks} chunks x {args.dim} dims, ~{size_mb:.0f} MB per store")
+        print(f"{'format':<8}{'load ms':>10}{'1st query ms':>14}{'RSS +MB':>10}")
+        for fmt in ("faiss", "flat"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--dim", str(args.dim), "--child", tmp, fmt],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{fmt:<8}{result['load_ms']:>10.1f}{result['query_ms']:>14.1f}"
+                f"{result['rss_mb']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
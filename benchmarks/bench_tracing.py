@@ -0,0 +1,62 @@
+"""Benchmark the overhead of :func:`app.utils.trace` on an ingest-sized payload.
+
+Wraps an empty block carrying ``embed_and_store``'s inputs (``--chunks``
+texts of ``--chars`` characters plus metadata) in ``trace`` under each sink
+and sampling rate, and reports the mean time added per call.  For
+comparison, ``full payload`` serializes the raw inputs to JSON, which is
+roughly what exporting them untouched would cost before any network I/O.
+
+Usage::
+
+    PYTHONPATH=$(pwd) python benchmarks/bench_tracing.py --chunks 10000 --chars 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.utils as utils
+
+
+def time_calls(make_context, calls: int) -> float:
+    """Return the mean seconds per ``with make_context():`` block."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        with make_context():
+            pass
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--chars", type=int, default=1000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    texts = [f"{n:08d}" + "x" * (args.chars - 8) for n in range(args.chunks)]
+    inputs = {"texts": texts, "metadatas": [{"chunk": n, "page": 1} for n in range(args.chunks)]}
+    baseline = time_calls(nullcontext, args.calls)
+
+    print(f"payload: {args.chunks} chunks x {args.chars} chars, {args.calls} calls")
+    print(f"{'mode':<24}{'ms/call':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.TRACE_FILE = Path(tmp) / "traces.jsonl"
+        for sink, rate in (("none", 1.0), ("local", 0.1), ("local", 1.0)):
+            utils.TRACE_SINK, utils.TRACE_SAMPLE_RATE = sink, rate
+            seconds = time_calls(lambda: utils.trace("bench", inputs=inputs), args.calls)
+            print(f"{f'{sink} @ {rate:g}':<24}{(seconds - baseline) * 1000:>10.3f}")
+    seconds = time_calls(lambda: nullcontext(json.dumps(inputs)), args.calls)
+    print(f"{'full payload (json)':<24}{(seconds - baseline) * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.ann_index as ann
+import app.embeddings as emb
+from app.providers import HashingEmbeddings
+
+if emb.FAISS is None or ann.faiss is None:  # pragma: no cover - optional dependency
+    pytest.skip("FAISS not available", allow_module_level=True)
+
+TEXTS = [f"Control {n} requires {word} reviews." for n, word in enumerate(
+    ["access", "backup", "vendor", "incident", "encryption", "logging"] * 50
+)]
+
+
+@pytest.fixture
+def local_embeddings(monkeypatch):
+    model = HashingEmbeddings(dim=32)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    return model
+
+
+def test_choose_index_type(monkeypatch):
+    monkeypatch.setattr(ann, "AUTO_ANN_MIN_VECTORS", 100)
+    assert ann.choose_index_type(99, "auto") == "flat"
+    assert ann.choose_index_type(100, "auto") == "ivf"
+    assert ann.choose_index_type(5, "hnsw") == "hnsw"
+    with pytest.raises(ValueError):
+        ann.choose_index_type(5, "lsh")
+
+
+@pytest.mark.parametrize("index_type", ["ivf", "hnsw", "ivfpq"])
+def test_approximate_store_persists_and_updates(tmp_path, local_embeddings, index_type):
+    store = emb.embed_and_store(TEXTS, [{"n": n} for n in range(len(TEXTS))], index_type=index_type)
+    expected = "ivf" if index_type == "ivfpq" else index_type  # Too few vectors for PQ
+    assert ann.index_type_of(store.index) == expected
+    assert store.similarity_search(TEXTS[7], k=1)[0].page_content == TEXTS[7]
+
+    emb.save_vectorstore(store, "Ann", base_dir=tmp_path)
+    emb.append_chunks("Ann", "extra", ["Badges are revoked on exit."], base_dir=tmp_path)
+    emb.append_chunks("Ann", "other", ["Keys are rotated yearly."], base_dir=tmp_path)
+    assert emb.delete_document("Ann", "extra", base_dir=tmp_path) == 1
+
+    loaded = emb.load_vectorstore("Ann", base_dir=tmp_path)
+    assert ann.index_type_of(loaded.index) == expected
+    assert loaded.index.ntotal == len(TEXTS) + 1
+    hit = loaded.similarity_search("Keys are rotated yearly.", k=1)[0]
+    assert hit.page_content == "Keys are rotated yearly."
+    assert loaded.similarity_search(TEXTS[3], k=1)[0].page_content == TEXTS[3]
+    assert "Badges are revoked on exit." not in emb.store_contents(loaded)[0]
+
+
+def test_ivfpq_trains_on_large_corpus():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((ann._POINTS_PER_CENTROID * 256, 16), dtype=np.float32)
+    index = ann.build_index(vectors, "ivfpq")
+    assert ann.index_type_of(index) == "ivfpq" and index.ntotal == len(vectors)
+    _, ids = index.search(vectors[:20], 10)
+    assert np.mean([n in row for n, row in enumerate(ids)]) >= 0.8
@@ -21,6 +21,7 @@ def test_read_file_pdf_docx(tmp_path):
     doc.save(pdf_path)
     data = pdf_path.read_bytes()
     assert "Hello PDF" in read_file(data, filename="sample.pdf")
+    assert "Hello PDF" in read_file(pdf_path, filename="sample.pdf")
 
     # create a simple DOCX
     try:
@@ -34,3 +35,35 @@ def test_read_file_pdf_docx(tmp_path):
     d.save(docx_path)
     data = docx_path.read_bytes()
     assert "Hello DOCX" in read_file(data, filename="sample.docx")
+    assert "Hello DOCX" in read_file(docx_path, filename="sample.docx")
+
+
+def test_read_pages_parallel_preserves_order(tmp_path, monkeypatch):
+    try:
+        import fitz  # PyMuPDF
+    except Exception:
+        import pytest
+        pytest.skip("PyMuPDF not available")
+    import app.ingestion as ingestion
+
+    doc = fitz.open()
+    for number in range(1, 6):
+        doc.new_page().insert_text((72, 72), f"Page {number}")
+    pdf_path = tmp_path / "multi.pdf"
+    doc.save(pdf_path)
+
+    monkeypatch.setattr(ingestion, "PDF_PARALLEL_MIN_PAGES", 1)
+    serial = ingestion.read_pages(pdf_path, filename="multi.pdf")
+    parallel = ingestion.read_pages(pdf_path, filename="multi.pdf", workers=2)
+    assert parallel == serial
+    assert [page.strip() for page in parallel] == [f"Page {n}" for n in range(1, 6)]
+    spooled = []
+    real_tempfile = ingestion.tempfile.NamedTemporaryFile
+    monkeypatch.setattr(
+        ingestion.tempfile,
+        "NamedTemporaryFile",
+        lambda **kw: spooled.append(real_tempfile(**kw)) or spooled[-1],
+    )
+    in_memory = ingestion.read_pages(pdf_path.read_bytes(), filename="multi.pdf", workers=2)
+    assert in_memory == serial
+    assert len(spooled) == 1 and not Path(spooled[0].name).exists()
@@ -0,0 +1,167 @@
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.pipeline as pipeline
+
+
+def _capture_embed(monkeypatch):
+    captured = {}
+
+    def fake_embed(chunks, batch_size=None, on_batch=None, keyed=False):
+        captured["chunks"] = list(chunks)
+        captured["batch_size"] = batch_size
+        captured["keyed"] = keyed
+        return "store", len(captured["chunks"])
+
+    monkeypatch.setattr(pipeline, "embed_chunks", fake_embed)
+    return captured
+
+
+def test_ingest_bulk_combines_documents_with_metadata(tmp_path, monkeypatch):
+    captured = _capture_embed(monkeypatch)
+    first = tmp_path / "a.txt"
+    first.write_text("Access Policy\nAccess is reviewed quarterly.")
+    files = [("a.txt", first, None), ("b.txt", b"Backup Policy\nBackups run nightly.", None)]
+
+    store, report = pipeline.ingest_bulk(files)
+
+    assert store == "store"
+    assert captured["keyed"] is True
+    assert captured["batch_size"] == pipeline.BULK_EMBED_BATCH_SIZE
+    sources = [meta["source"] for _, meta in captured["chunks"]]
+    assert sources == ["a.txt", "b.txt"]
+    assert all(meta["chunk"] == 0 for _, meta in captured["chunks"])
+    assert [d["status"] for d in report["documents"]] == ["ok", "ok"]
+    assert report["documents"][0]["doc_id"] != report["documents"][1]["doc_id"]
+    assert report["chunks"] == 2 and report["failed"] == 0
+
+
+def test_ingest_bulk_failure_does_not_abort_batch(monkeypatch):
+    captured = _capture_embed(monkeypatch)
+    files = [
+        ("bad.pdf", b"not a pdf", None),
+        ("good.txt", b"Good Policy\nPasswords rotate yearly.", None),
+        ("copy.txt", b"Good Policy\nPasswords rotate yearly.", None),
+    ]
+
+    store, report = pipeline.ingest_bulk(files)
+
+    statuses = {d["filename"]: d["status"] for d in report["documents"]}
+    assert statuses == {"bad.pdf": "failed", "good.txt": "ok", "copy.txt": "skipped"}
+    assert report["documents"][0]["error"]
+    assert report["failed"] == 1
+    assert [meta["source"] for _, meta in captured["chunks"]] == ["good.txt"]
+
+
+def test_ingest_bulk_without_valid_documents(monkeypatch):
+    _capture_embed(monkeypatch)
+    store, report = pipeline.ingest_bulk([("bad.pdf", b"not a pdf", None)])
+    assert store is None
+    assert report["chunks"] == 0 and report["failed"] == 1
+
+
+def test_stage_uploads_expands_zip(tmp_path):
+    archive = tmp_path / "upload.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("policies/a.txt", "A")
+        zf.writestr("other/a.txt", "B")
+        zf.writestr("../escape.txt", "C")
+        zf.writestr("image.png", "D")
+    plain = tmp_path / "plain.txt"
+    plain.write_text("E")
+
+    files = pipeline.stage_uploads(
+        [("upload", archive, "application/zip"), ("plain.txt", plain, "text/plain")],
+        tmp_path,
+        100,
+        1000,
+    )
+
+    assert [name for name, _, _ in files] == ["a.txt", "a.txt", "escape.txt", "plain.txt"]
+    assert [path.read_text() for _, path, _ in files] == ["A", "B", "C", "E"]
+    assert [mime for _, _, mime in files] == [None, None, None, "text/plain"]
+    assert all(tmp_path in path.parents for _, path, _ in files)
+
+
+def test_ingest_bulk_uses_mime_type_without_extension(monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    captured = _capture_embed(monkeypatch)
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Encryption Policy")
+    pdf = doc.tobytes()
+
+    _, report = pipeline.ingest_bulk([("upload", pdf, "application/pdf")])
+
+    assert report["documents"][0]["status"] == "ok"
+    assert captured["chunks"][0][0].strip() == "Encryption Policy"
+
+
+def test_expand_zip_enforces_limits(tmp_path):
+    archive = tmp_path / "upload.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.txt", "x" * 50)
+        zf.writestr("b.txt", "x" * 50)
+    with pytest.raises(ValueError, match="per-file"):
+        pipeline.expand_zip(archive, tmp_path, 40, 1000)
+    with pytest.raises(ValueError, match="total"):
+        pipeline.expand_zip(archive, tmp_path, 100, 80)
+    with pytest.raises(ValueError, match="Invalid ZIP"):
+        pipeline.expand_zip(tmp_path / "a.txt", tmp_path, 100, 1000)
+
+
+def test_expand_zip_reports_entry_errors_and_continues(tmp_path):
+    archive = tmp_path / "upload.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("big.txt", "x" * 50)
+        zf.writestr("a.txt", "x" * 30)
+        zf.writestr("b.txt", "x" * 30)
+        zf.writestr("c.txt", "x" * 30)
+    errors = []
+    extracted = pipeline.expand_zip(
+        archive, tmp_path, 40, 70, on_error=lambda name, err: errors.append((name, str(err)))
+    )
+    assert [name for name, _ in extracted] == ["a.txt", "b.txt"]
+    assert [name for name, _ in errors] == ["big.txt", "c.txt"]
+    assert "per-file" in errors[0][1] and "total" in errors[1][1]
+    assert not (tmp_path / "big.txt").exists() and not (tmp_path / "c.txt").exists()
+
+
+def test_bad_zip_does_not_abort_bulk_batch(tmp_path, monkeypatch):
+    captured = _capture_embed(monkeypatch)
+    corrupt = tmp_path / "corrupt.zip"
+    corrupt.write_bytes(b"PK\x03\x04 not really a zip")
+    mixed = tmp_path / "mixed.zip"
+    with zipfile.ZipFile(mixed, "w") as zf:
+        zf.writestr("huge.txt", "Huge Policy\n" + "x" * 200)
+        zf.writestr("vendor.txt", "Vendor Policy\nVendors are assessed.")
+    plain = tmp_path / "access.txt"
+    plain.write_text("Access Policy\nAccess is reviewed quarterly.")
+
+    files = pipeline.stage_uploads(
+        [
+            ("corrupt.zip", corrupt, "application/zip"),
+            ("mixed.zip", mixed, "application/zip"),
+            ("access.txt", plain, "text/plain"),
+        ],
+        tmp_path / "staged",
+        100,
+        1000,
+    )
+    store, report = pipeline.ingest_bulk(files)
+
+    statuses = {d["filename"]: d["status"] for d in report["documents"]}
+    assert statuses == {
+        "corrupt.zip": "failed",
+        "vendor.txt": "ok",
+        "huge.txt": "failed",
+        "access.txt": "ok",
+    }
+    errors = {d["filename"]: d.get("error", "") for d in report["documents"]}
+    assert "Invalid ZIP" in errors["corrupt.zip"] and "per-file" in errors["huge.txt"]
+    assert store == "store" and report["failed"] == 2
+    assert [meta["source"] for _, meta in captured["chunks"]] == ["vendor.txt", "access.txt"]
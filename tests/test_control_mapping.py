@@ -0,0 +1,65 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.control_mapper as cm
+from app.aho_corasick import AhoCorasick
+
+
+def _naive(frameworks, documents):
+    return {
+        name: [
+            cid for cid, text in controls.items()
+            if any(text.lower() in doc.lower() for doc in documents)
+        ]
+        for name, controls in frameworks.items()
+    }
+
+
+def test_automaton_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers", "", "xyz"])
+    assert matcher.matches("ushers") == {0, 1, 3, 4}
+    assert matcher.matches("") == {4}
+    assert AhoCorasick(["aab"]).matches("aaab") == {0}
+
+
+def test_map_controls_matches_naive_substring_search():
+    rng = random.Random(0)
+    words = ["access", "review", "log", "backup", "encrypt", "vendor", "key"]
+    frameworks = {
+        f"FW{f}": {
+            f"{f}.{c}": " ".join(rng.choices(words, k=rng.randint(1, 3)))
+            for c in range(40)
+        }
+        for f in range(3)
+    }
+    frameworks["FW0"]["caps"] = "Access REVIEW"
+    documents = [
+        " ".join(rng.choices(words, k=60)).title() for _ in range(5)
+    ]
+    assert cm.map_controls(frameworks, documents) == _naive(frameworks, documents)
+    assert cm.map_controls(frameworks, []) == {name: [] for name in frameworks}
+
+
+def test_map_controls_caches_automaton_per_frameworks_version():
+    cm._matchers.clear()
+    frameworks = {"ISO": {"A.1": "access review"}}
+    assert cm.map_controls(frameworks, ["Quarterly ACCESS REVIEW."]) == {"ISO": ["A.1"]}
+    cm.map_controls(frameworks, ["other"])
+    assert len(cm._matchers) == 1
+
+    frameworks["ISO"]["A.2"] = "key rotation"
+    assert cm.map_controls(frameworks, ["Key rotation yearly"]) == {"ISO": ["A.2"]}
+    assert len(cm._matchers) == 2
+
+
+def test_quote_extractor_returns_closest_sentence_verbatim():
+    policy = "Backups run nightly.  Access to PROD is Reviewed quarterly! Keys rotate."
+    quotes = cm.QuoteExtractor()
+    assert quotes.extract("access reviewed quarterly", policy) == "Access to PROD is Reviewed quarterly!"
+    assert quotes.extract("key rotation", policy) == "Keys rotate."
+    # Sentences are split once per chunk, controls reduced once per text
+    assert len(quotes._sentences) == 1 and len(quotes._controls) == 2
+    assert quotes.extract("zzzz", "  qqqq  ") == "qqqq"
@@ -0,0 +1,105 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.control_mapper as cm
+import app.coverage_cache as coverage_cache
+import app.embeddings as emb
+from app.db import insert_controls
+from app.providers import HashingEmbeddings
+
+if emb.FAISS is None:  # pragma: no cover - optional dependency
+    pytest.skip("FAISS not available", allow_module_level=True)
+
+CONTROLS = [
+    {"framework_title": "ISO", "control_number": "A.9", "control_language": "Access is reviewed"},
+    {"framework_title": "ISO", "control_number": "A.12", "control_language": "Backups are tested"},
+]
+
+
+@pytest.fixture
+def cached(tmp_path, monkeypatch):
+    model = HashingEmbeddings(dim=64)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    monkeypatch.setattr("app.federated.get_embeddings", lambda: model)
+    monkeypatch.setattr(coverage_cache, "COVERAGE_CACHE_PATH", str(tmp_path / "coverage.db"))
+    # Stores under VECTORSTORE_DIR are policies whose writes invalidate coverage
+    monkeypatch.setattr(emb, "VECTORSTORE_DIR", tmp_path)
+    for name, text in (("Access", "Access is reviewed quarterly."), ("Backup", "Backups are tested.")):
+        emb.save_vectorstore(emb.FAISS.from_texts([text], model), name, base_dir=tmp_path)
+
+    runs = []
+    check = cm.check_framework_coverage
+
+    def counting(vectorstore, controls, **kwargs):
+        runs.append(len(controls))
+        return check(vectorstore, controls, **kwargs)
+
+    monkeypatch.setattr(cm, "check_framework_coverage", counting)
+    return tmp_path, model, runs
+
+
+def _cached_policies():
+    conn = sqlite3.connect(coverage_cache.COVERAGE_CACHE_PATH)
+    rows = sorted(policies for (policies,) in conn.execute("SELECT policies FROM coverage"))
+    conn.close()
+    return rows
+
+
+def test_repeat_checks_are_served_from_cache(cached):
+    base_dir, _, runs = cached
+    first = cm.check_policy_coverage(["Access", "Backup"], "ISO", CONTROLS, base_dir=base_dir)
+    again = cm.check_policy_coverage(["Backup", "Access"], "ISO", CONTROLS, base_dir=base_dir)
+    assert again == first and len(runs) == 1
+    assert first[0]["policy_excerpts"][0] == "Access is reviewed quarterly."
+
+    # k, controls and the policy selection are all part of the key
+    cm.check_policy_coverage(["Access", "Backup"], "ISO", CONTROLS, k=2, base_dir=base_dir)
+    cm.check_policy_coverage(["Access", "Backup"], "ISO", CONTROLS[:1], base_dir=base_dir)
+    cm.check_policy_coverage(["Access"], "ISO", CONTROLS, base_dir=base_dir)
+    assert len(runs) == 4
+    with pytest.raises(ValueError):
+        cm.check_policy_coverage(["Missing"], "ISO", CONTROLS, base_dir=base_dir)
+
+
+def test_reingest_and_framework_upload_invalidate(cached, tmp_path):
+    base_dir, model, runs = cached
+    cm.check_policy_coverage(["Access"], "ISO", CONTROLS, base_dir=base_dir)
+    cm.check_policy_coverage(["Access", "Backup"], "ISO", CONTROLS, base_dir=base_dir)
+
+    store = emb.FAISS.from_texts(["Access reviews are logged."], model)
+    assert _cached_policies() == ["Access", "Access,Backup"]
+    emb.save_vectorstore(store, "Access", base_dir=base_dir)
+    assert _cached_policies() == []
+    result = cm.check_policy_coverage(["Access"], "ISO", CONTROLS, base_dir=base_dir)
+    assert result[0]["policy_excerpts"] == ["Access reviews are logged."]
+    assert len(runs) == 3
+
+    cm.check_policy_coverage(["Backup"], "ISO", CONTROLS, base_dir=base_dir)
+    insert_controls([{**CONTROLS[0], "control_number": "A.10"}], db_path=str(tmp_path / "fw.db"))
+    cm.check_policy_coverage(["Backup"], "ISO", CONTROLS, base_dir=base_dir)
+    assert len(runs) == 5
+
+
+def test_policy_invalidation_matches_whole_names(tmp_path):
+    path = str(tmp_path / "coverage.db")
+    for policies in (["Access"], ["Access_v2"], ["Backup", "Access"]):
+        coverage_cache.store(policies, "ISO", 8, 1, "v", "c", [{"n": 1}], path=path)
+    coverage_cache.invalidate_policy("Access", path=path)
+    assert coverage_cache.lookup(["Access_v2"], "ISO", 8, 1, "v", "c", path=path) == [{"n": 1}]
+    assert coverage_cache.lookup(["Access"], "ISO", 8, 1, "v", "c", path=path) is None
+    assert coverage_cache.lookup(["Access", "Backup"], "ISO", 8, 1, "v", "c", path=path) is None
+
+
+def test_stores_outside_policy_dir_keep_coverage(cached):
+    base_dir, model, _ = cached
+    cm.check_policy_coverage(["Access"], "ISO", CONTROLS, base_dir=base_dir)
+    store = emb.FAISS.from_texts(["Framework control text."], model)
+    # e.g. a document cache index or a framework store of the same name
+    emb.save_vectorstore(store, "Access", base_dir=base_dir / "framework_store")
+    emb.save_vectorstore(store, "index", base_dir=base_dir / "doc_cache" / "ab12")
+    assert _cached_policies() == ["Access"]
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.coverage_matrix as cm
+import app.embeddings as emb
+from app.ann_index import reindex
+from app.control_mapper import check_framework_coverage
+from app.providers import HashingEmbeddings
+
+if emb.FAISS is None:  # pragma: no cover - optional dependency
+    pytest.skip("FAISS not available", allow_module_level=True)
+
+
+def test_tiled_top_k_matches_full_matrix():
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((37, 16), dtype=np.float32)
+    corpus = rng.standard_normal((501, 16), dtype=np.float32) * rng.uniform(0.5, 2, (501, 1))
+    corpus[7] = 0.0  # Zero vectors score 0 instead of dividing by zero
+
+    indices, scores = cm.top_k_cosine(queries, corpus, 5, tile_rows=8, tile_cols=64)
+
+    qn = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    norms = np.linalg.norm(corpus, axis=1)
+    norms[norms == 0] = 1
+    full = qn @ (corpus / norms[:, None]).T
+    expected = np.argsort(-full, axis=1, kind="stable")[:, :5]
+    assert indices.tolist() == expected.tolist()
+    assert scores == pytest.approx(np.take_along_axis(full, expected, axis=1), abs=1e-5)
+    assert cm.top_k_cosine(queries, corpus[:3], 5)[0].shape == (37, 3)
+
+
+def test_coverage_uses_store_vectors(tmp_path, monkeypatch):
+    model = HashingEmbeddings(dim=64)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    policy = [
+        "Privileged access is reviewed quarterly.",
+        "Backups are encrypted and tested monthly.",
+        "Visitors are escorted at all times.",
+    ]
+    store = emb.FAISS.from_texts(policy, model)
+    vectors, scales = cm.chunk_vectors(store)
+    assert vectors.shape == (3, 64) and scales is None
+    assert np.allclose(vectors, emb.store_contents(store)[2])
+
+    controls = [{
+        "framework_title": "ISO", "control_number": "1",
+        "control_language": "Backups are tested",
+    }]
+    calls = []
+    monkeypatch.setattr(
+        store, "similarity_search_with_score_by_vector",
+        lambda *args, **kwargs: calls.append(args) or [],
+    )
+    result = check_framework_coverage(store, controls, k=2)
+    assert calls == []  # Scored by the matrix, not per-control searches
+    assert result[0]["policy_excerpts"][0] == policy[1]
+
+    emb.save_vectorstore(store, "Flat", base_dir=tmp_path, format="flat", quantization="int8")
+    flat = emb.load_vectorstore("Flat", base_dir=tmp_path)
+    assert cm.chunk_vectors(flat)[1] is not None
+    assert check_framework_coverage(flat, controls, k=2) == result
+
+    assert cm.chunk_vectors(reindex(store, "hnsw")) is None
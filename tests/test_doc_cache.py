@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.doc_cache as doc_cache
+
+
+class DummyStore:
+    def save_local(self, path: str) -> None:  # pragma: no cover - behaves like FAISS
+        Path(path).mkdir(parents=True, exist_ok=True)
+        (Path(path) / "index.faiss").write_text("index")
+
+
+def test_cache_key_depends_on_chunking_parameters():
+    digest = "ab" * 32
+    assert doc_cache.cache_key(digest) == doc_cache.cache_key(digest, 250, 50)
+    assert doc_cache.cache_key(digest) != doc_cache.cache_key(digest, 500, 50)
+
+
+def test_cache_entry_commit_and_load(tmp_path, monkeypatch):
+    entry = doc_cache.CacheEntry("key", base_dir=tmp_path)
+    pages = list(entry.record_pages(["Page one", "Page two"]))
+    chunks = list(entry.record_chunks([("chunk", {"policy": "P"})]))
+    assert pages == ["Page one", "Page two"]
+    assert chunks == [("chunk", {"policy": "P"})]
+    assert doc_cache.load_cached("key", base_dir=tmp_path) is None
+
+    entry.commit(DummyStore())
+    cached_dir = tmp_path / "key"
+    assert (cached_dir / "text.txt").read_text() == "Page one\nPage two"
+    assert (cached_dir / "chunks.jsonl").read_text().count("\n") == 1
+    assert (cached_dir / "index" / "index.faiss").exists()
+
+    loaded = []
+    monkeypatch.setattr(
+        doc_cache,
+        "load_vectorstore",
+        lambda name, base_dir: loaded.append((name, Path(base_dir))) or "store",
+    )
+    assert doc_cache.load_cached("key", base_dir=tmp_path) == ("store", 1)
+    assert loaded == [("index", cached_dir)]
+
+
+def test_cache_entry_discard(tmp_path):
+    entry = doc_cache.CacheEntry("key", base_dir=tmp_path)
+    list(entry.record_pages(["text"]))
+    entry.discard()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cache_key_depends_on_filetype():
+    digest = "ab" * 32
+    assert doc_cache.cache_key(digest, filetype="pdf") != doc_cache.cache_key(
+        digest, filetype="text"
+    )
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path):
+    import os
+
+    for age, key in enumerate(["old", "mid", "new"]):
+        entry = tmp_path / key
+        entry.mkdir()
+        (entry / "text.txt").write_text("x" * 100)
+        (entry / "meta.json").write_text('{"chunks": 1}')
+        os.utime(entry / "meta.json", (1000 + age, 1000 + age))
+    (tmp_path / ".pending.tmp").mkdir()
+
+    assert doc_cache.evict(tmp_path, max_bytes=1000) == 0
+    assert doc_cache.evict(tmp_path, max_bytes=250) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".pending.tmp", "new"]
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.embedding_cache import CachedEmbeddings, cache_key
+
+
+class CountingEmbeddings:
+    model = "dummy-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text)), 0.0]
+
+
+def test_cached_embeddings_only_embeds_unseen_text(tmp_path):
+    provider = CountingEmbeddings()
+    cache = CachedEmbeddings(provider, db_path=str(tmp_path / "cache.db"))
+    assert cache.embed_documents(["alpha", "beta"]) == [[5.0, 1.0], [4.0, 1.0]]
+    # Whitespace differences normalize to the same entry
+    assert cache.embed_documents(["alpha ", "gamma", "gamma"]) == [
+        [5.0, 1.0],
+        [5.0, 1.0],
+        [5.0, 1.0],
+    ]
+    assert provider.calls == [["alpha", "beta"], ["gamma"]]
+    # The repeated "gamma" is embedded once but both copies are misses
+    assert cache.stats() == {"hits": 1, "misses": 4}
+
+    # A fresh instance reads the persisted vectors
+    reopened = CachedEmbeddings(CountingEmbeddings(), db_path=str(tmp_path / "cache.db"))
+    assert reopened.embed_documents(["beta"]) == [[4.0, 1.0]]
+    assert reopened.stats() == {"hits": 1, "misses": 0}
+
+
+def test_cached_embeddings_does_not_cache_queries(tmp_path):
+    provider = CountingEmbeddings()
+    cache = CachedEmbeddings(provider, db_path=str(tmp_path / "cache.db"))
+    assert cache.embed_query("what is our password policy?") == [28.0, 0.0]
+    assert provider.calls == ["what is our password policy?"]
+    assert cache.stats() == {"hits": 0, "misses": 0}
+    assert not (tmp_path / "cache.db").exists()
+
+
+def test_cache_key_includes_model():
+    assert cache_key("text", "model-a") != cache_key("text", "model-b")
+    assert cache_key("a  b", "m") == cache_key("a b", "m")
+
+
+def test_cached_embeddings_evicts_least_recently_used(tmp_path):
+    provider = CountingEmbeddings()
+    # Each vector is two float32 values: 8 bytes, so only two fit
+    cache = CachedEmbeddings(provider, db_path=str(tmp_path / "cache.db"), max_bytes=20)
+    cache.embed_documents(["one"])
+    cache.embed_documents(["two"])
+    cache.embed_documents(["one"])  # refresh "one"
+    cache.embed_documents(["three"])
+    provider.calls.clear()
+    cache.embed_documents(["one", "two"])
+    assert provider.calls == [["two"]]
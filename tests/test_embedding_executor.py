@@ -0,0 +1,95 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.embedding_executor as executor
+from app.embedding_cache import model_name
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FlakyEmbeddings:
+    model = "flaky"
+
+    def __init__(self, failures=0, error=RateLimitError):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            fail = self.failures > 0
+            self.failures -= fail
+        try:
+            threading.Event().wait(0.02)  # time.sleep is patched out
+            if fail:
+                raise self.error("rate limited")
+            return [[float(text)] for text in texts]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(executor, "metrics", executor.EmbeddingMetrics())
+    monkeypatch.setattr(executor.time, "sleep", lambda _: None)
+
+
+def test_batches_run_concurrently_and_keep_order():
+    provider = FlakyEmbeddings()
+    batched = executor.BatchedEmbeddings(provider, batch_size=3, concurrency=2)
+    texts = [str(n) for n in range(10)]
+    assert batched.embed_documents(texts) == [[float(n)] for n in range(10)]
+    assert sorted(len(call) for call in provider.calls) == [1, 3, 3, 3]
+    assert provider.peak == 2
+    metrics = executor.embedding_metrics()
+    assert metrics["batches"] == 4 and metrics["texts"] == 10
+    assert metrics["texts_per_second"] > 0 and metrics["latency_max_seconds"] > 0
+
+
+def test_transient_errors_are_retried():
+    provider = FlakyEmbeddings(failures=2)
+    batched = executor.BatchedEmbeddings(provider, batch_size=5, concurrency=1)
+    assert batched.embed_documents(["1", "2"]) == [[1.0], [2.0]]
+    assert len(provider.calls) == 3
+    assert executor.embedding_metrics()["retries"] == 2
+
+
+def test_permanent_errors_and_exhausted_retries_fail():
+    batched = executor.BatchedEmbeddings(FlakyEmbeddings(failures=1, error=ValueError))
+    with pytest.raises(ValueError):
+        batched.embed_documents(["1"])
+    batched = executor.BatchedEmbeddings(FlakyEmbeddings(failures=5), max_retries=2)
+    with pytest.raises(RateLimitError):
+        batched.embed_documents(["1"])
+    metrics = executor.embedding_metrics()
+    assert metrics["failures"] == 2 and metrics["retries"] == 2
+
+
+def test_is_retryable_classifies_status_codes():
+    class Response:
+        status_code = 400
+
+    class BadRequest(Exception):
+        response = Response()
+
+    assert executor._is_retryable(RateLimitError())
+    assert not executor._is_retryable(BadRequest())
+    assert executor._is_retryable(ConnectionError())
+
+
+def test_cache_key_model_looks_through_wrapper():
+    assert model_name(executor.BatchedEmbeddings(FlakyEmbeddings())) == "FlakyEmbeddings:flaky"
@@ -13,4 +13,75 @@ def test_read_file_detects_cp1252_encoding():
 def test_ensure_utf8_normalizes_bytes():
     text = "Smart quotes: “Hello” and euro sign €"
     data = text.encode("cp1252")
-    assert ensure_utf8(data) == text
\ No newline at end of file
+    assert ensure_utf8(data) == text
+
+
+def test_read_file_accepts_path(tmp_path):
+    text = "Smart quotes: “Hello” and euro sign €"
+    path = tmp_path / "policy.txt"
+    path.write_bytes(text.encode("cp1252"))
+    assert read_file(path) == text
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert read_file(str(empty)) == ""
+
+
+def test_decode_bytes_tiers():
+    from app.utils import _decode_tiered
+
+    text = "Smart quotes: “Hello” and euro sign €\n" * 50
+    assert _decode_tiered(text.encode("utf-8")) == (text, "utf-8")
+    assert _decode_tiered(memoryview(text.encode("utf-8-sig"))) == (text, "bom")
+    assert _decode_tiered(text.encode("utf-16")) == (text, "bom")
+    assert _decode_tiered(text.encode("utf-32")) == (text, "bom")
+    assert _decode_tiered(text.encode("cp1252")) == (text, "sample")
+
+
+def test_decode_bytes_detects_from_bounded_sample(monkeypatch):
+    import app.utils as utils
+
+    seen = []
+    real = utils._from_bytes
+    monkeypatch.setattr(utils, "_from_bytes", lambda data: seen.append(len(data)) or real(data))
+    expected = "Politique de sécurité: “accès” réservé, coût 5 €.\n" * 1000
+    decoded, tier = utils._decode_tiered(expected.encode("cp1252"), sample_size=4096)
+    matches = decoded == expected
+    assert matches and tier == "sample"
+    assert seen == [4096]
+
+
+def test_decode_bytes_rejects_implausible_sample_guess():
+    from app.utils import _decode_tiered
+
+    text = "Политика информационной безопасности. Доступ к системам.\n" * 20
+    assert _decode_tiered(text.encode("cp1251")) == (text, "sample")
+    assert _decode_tiered("Policy\x00text".encode("utf-8")) == ("Policy\x00text", "utf-8")
+
+
+
+def test_decode_bytes_keeps_other_windows_code_pages():
+    from app.utils import _decode_tiered
+
+    for codec, text in (
+        (
+            "cp1250",
+            "Zásady řízení přístupu k informačním systémům. Přístup k systémům je "
+            "přezkoumáván čtvrtletně. Účty jsou zrušeny při odchodu zaměstnance. "
+            "Zálohy se šifrují a testují každý měsíc.",
+        ),
+        (
+            "cp1254",
+            "Erişim kontrol politikası tüm çalışanlar için geçerlidir. Ayrıcalıklı "
+            "erişim üç ayda bir gözden geçirilir. Çalışanların hesapları işten "
+            "ayrıldıklarında kapatılır. Yedekler şifrelenir ve her ay test edilir.",
+        ),
+        (
+            "cp1257",
+            "Prieigos kontrolės politika taikoma visiems darbuotojams. Privilegijuota "
+            "prieiga peržiūrima kas ketvirtį. Darbuotojų paskyros uždaromos jiems "
+            "išėjus. Atsarginės kopijos šifruojamos ir tikrinamos kas mėnesį.",
+        ),
+    ):
+        decoded, tier = _decode_tiered(text.encode(codec))
+        matches = decoded == text
+        assert matches and tier == "sample", codec
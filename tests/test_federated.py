@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.embeddings as emb
+from app.control_mapper import check_framework_coverage
+from app.federated import FederatedVectorStore
+from app.providers import HashingEmbeddings
+
+if emb.FAISS is None:  # pragma: no cover - optional dependency
+    pytest.skip("FAISS not available", allow_module_level=True)
+
+POLICIES = {
+    "Access": ["Privileged access is reviewed quarterly.", "Accounts are disabled on exit."],
+    "Backup": ["Backups are encrypted and tested monthly.", "Restores are rehearsed yearly."],
+    "Vendor": ["Vendors are assessed before onboarding."],
+}
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    model = HashingEmbeddings(dim=64)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    monkeypatch.setattr("app.federated.get_embeddings", lambda: model)
+    for name, texts in POLICIES.items():
+        emb.save_vectorstore(
+            emb.FAISS.from_texts(texts, model), name, base_dir=tmp_path,
+            format="flat" if name == "Vendor" else "faiss",
+        )
+    return tmp_path
+
+
+def test_federated_search_merges_stores_by_score(stores):
+    federated = FederatedVectorStore.load(base_dir=stores)
+    assert sorted(federated.stores) == sorted(POLICIES)
+
+    hits = federated.similarity_search_with_score("Backups are encrypted and tested monthly.", k=3)
+    assert hits[0][0].page_content == POLICIES["Backup"][0]
+    assert hits[0][0].metadata["store"] == "Backup"
+    assert [score for _, score in hits] == sorted(score for _, score in hits)
+    single = emb.get_vectorstore("Backup", base_dir=stores)
+    best = single.similarity_search_with_score(POLICIES["Backup"][0], k=1)[0]
+    assert hits[0][1] == pytest.approx(float(best[1]), abs=1e-5)
+    assert "store" not in best[0].metadata  # Shared store documents stay untagged
+
+    retriever = federated.as_retriever(search_kwargs={"k": 1})
+    assert retriever.invoke("vendors assessed onboarding")[0].metadata["store"] == "Vendor"
+
+
+def test_federated_subset_and_coverage(stores):
+    federated = FederatedVectorStore.load(["Access", "Vendor"], base_dir=stores)
+    controls = [{
+        "framework_title": "ISO",
+        "control_number": "A.9",
+        "control_language": "Privileged access rights are reviewed",
+    }]
+    coverage = check_framework_coverage(federated, controls, k=2)
+    assert coverage[0]["policy_excerpts"][0] == POLICIES["Access"][0]
+    assert set(coverage[0]["excerpt_policies"]) <= {"Access", "Vendor"}
+    assert coverage[0]["excerpt_policies"][0] == "Access"
+    with pytest.raises(ValueError, match="Missing"):
+        FederatedVectorStore.load(["Access", "Missing"], base_dir=stores)
+    with pytest.raises(ValueError, match="read-only"):
+        federated.add_texts(["text"])
+    with pytest.raises(ValueError, match="FederatedVectorStore.load"):
+        FederatedVectorStore.from_texts(["text"], HashingEmbeddings())
+
+
+def test_store_tag_keeps_section_title_metadata(tmp_path, monkeypatch):
+    model = HashingEmbeddings(dim=64)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    monkeypatch.setattr("app.federated.get_embeddings", lambda: model)
+    texts = ["Access rights are reviewed quarterly.", "Backups are tested monthly."]
+    titles = [{"policy": "Access Control Policy"}, {"policy": "Backup Policy"}]
+    emb.save_vectorstore(
+        emb.FAISS.from_texts(texts, model, metadatas=titles), "acme", base_dir=tmp_path
+    )
+    controls = [{
+        "framework_title": "ISO",
+        "control_number": "A.9",
+        "control_language": "Access rights are reviewed",
+    }]
+
+    single = emb.get_vectorstore("acme", base_dir=tmp_path)
+    coverage = check_framework_coverage(single, controls, k=2)
+    assert coverage[0]["policy_excerpts"][0] == texts[0]
+    assert "excerpt_policies" not in coverage[0]
+
+    federated = FederatedVectorStore.load(["acme"], base_dir=tmp_path)
+    hit = federated.similarity_search(texts[0], k=1)[0]
+    assert hit.metadata == {"policy": "Access Control Policy", "store": "acme"}
+    coverage = check_framework_coverage(federated, controls, k=2)
+    assert coverage[0]["excerpt_policies"] == ["acme", "acme"]
@@ -0,0 +1,106 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.embeddings as emb
+import app.flatstore as flatstore
+from app.providers import HashingEmbeddings
+
+if emb.FAISS is None:  # pragma: no cover - optional dependency
+    pytest.skip("FAISS not available", allow_module_level=True)
+
+TEXTS = [
+    "Privileged access is reviewed quarterly.",
+    "Backups are encrypted and tested monthly.",
+    "Visitors are escorted at all times.",
+    "Passwords must be rotated every year.",
+]
+
+
+@pytest.fixture
+def local_embeddings(monkeypatch):
+    model = HashingEmbeddings(dim=32)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    return model
+
+
+def _faiss_store(model):
+    return emb.FAISS.from_texts(
+        TEXTS, model, metadatas=[{"n": n} for n in range(len(TEXTS))],
+        ids=[f"doc:{n}" for n in range(len(TEXTS))],
+    )
+
+
+def test_flat_store_matches_faiss_results(tmp_path, local_embeddings):
+    faiss_store = _faiss_store(local_embeddings)
+    emb.save_vectorstore(faiss_store, "Flat", base_dir=tmp_path, format="flat")
+    assert not (tmp_path / "Flat" / "index.pkl").exists()
+
+    flat = emb.load_vectorstore("Flat", base_dir=tmp_path)
+    assert isinstance(flat, flatstore.FlatVectorStore)
+    assert isinstance(flat.vectors, np.memmap)
+
+    query = "how often is privileged access reviewed"
+    expected = faiss_store.similarity_search_with_relevance_scores(query, k=3)
+    actual = flat.similarity_search_with_relevance_scores(query, k=3)
+    assert [d.page_content for d, _ in actual] == [d.page_content for d, _ in expected]
+    assert [s for _, s in actual] == pytest.approx([s for _, s in expected], abs=1e-5)
+    assert actual[0][0].metadata == {"n": 0} and actual[0][0].id == "doc:0"
+    assert flat.as_retriever(search_kwargs={"k": 1}).invoke(query)[0].page_content == TEXTS[0]
+
+
+def test_flat_store_converts_back_to_faiss(tmp_path, local_embeddings):
+    emb.save_vectorstore(_faiss_store(local_embeddings), "Store", base_dir=tmp_path, format="flat")
+    flat = emb.load_vectorstore("Store", base_dir=tmp_path)
+    with pytest.raises(ValueError, match="read-only flat format"):
+        emb.append_chunks("Store", "new", ["text"], base_dir=tmp_path)
+    with pytest.raises(ValueError, match="read-only"):
+        flat.add_texts(["text"])
+
+    emb.save_vectorstore(flat, "Store", base_dir=tmp_path, format="faiss")
+    assert not flatstore.is_flat_store(tmp_path / "Store")
+    restored = emb.load_vectorstore("Store", base_dir=tmp_path)
+    assert sorted(emb.store_contents(restored)[0]) == sorted(TEXTS)
+    emb.append_chunks("Store", "new", ["text"], base_dir=tmp_path)
+
+
+def test_top_k_and_blocked_search(tmp_path, local_embeddings, monkeypatch):
+    assert flatstore.top_k(np.array([3.0, 1.0, 2.0, 0.5]), 2).tolist() == [3, 1]
+    assert flatstore.top_k(np.array([3.0, 1.0]), 5).tolist() == [1, 0]
+    monkeypatch.setattr(flatstore, "SEARCH_BLOCK_ROWS", 3)
+    vectors = local_embeddings.embed_documents(TEXTS)
+    flatstore.write_flat_store(tmp_path, TEXTS, [{}] * 4, vectors)
+    store = flatstore.FlatVectorStore.load(tmp_path, local_embeddings)
+    hits = store.similarity_search_with_score_by_vector(vectors[3], k=2)
+    assert hits[0][0].page_content == TEXTS[3] and hits[0][1] == pytest.approx(0.0, abs=1e-6)
+    with pytest.raises(ValueError):
+        flatstore.write_flat_store(tmp_path, TEXTS, [{}], vectors)
+
+
+@pytest.mark.parametrize("quantization, dtype", [("float16", np.float16), ("int8", np.int8)])
+def test_quantized_flat_store(tmp_path, local_embeddings, quantization, dtype):
+    faiss_store = _faiss_store(local_embeddings)
+    emb.save_vectorstore(
+        faiss_store, "Small", base_dir=tmp_path, format="flat", quantization=quantization
+    )
+    store = emb.load_vectorstore("Small", base_dir=tmp_path)
+    assert store.vectors.dtype == dtype
+    assert (tmp_path / "Small" / "scales.npy").exists() == (quantization == "int8")
+
+    query = "how often is privileged access reviewed"
+    expected = faiss_store.similarity_search_with_score(query, k=4)
+    actual = store.similarity_search_with_score(query, k=4)
+    assert [d.page_content for d, _ in actual] == [d.page_content for d, _ in expected]
+    assert [s for _, s in actual] == pytest.approx([s for _, s in expected], abs=0.02)
+    original = np.array(emb.store_contents(faiss_store)[2])
+    assert np.abs(store.dense_vectors() - original).max() < 0.01
+
+    # Re-saving unquantized drops the scales file
+    emb.save_vectorstore(store, "Small", base_dir=tmp_path, format="flat", quantization="none")
+    assert not (tmp_path / "Small" / "scales.npy").exists()
+    with pytest.raises(ValueError):
+        emb.save_vectorstore(store, "Small", base_dir=tmp_path, format="faiss", quantization="int8")
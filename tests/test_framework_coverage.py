@@ -133,3 +133,91 @@ def test_check_framework_coverage_extracts_sentence():
     results = check_framework_coverage(store, controls, k=1)
     assert results[0]["policy_excerpts"] == ["Policy matches requirement exactly."]
     assert store.queries == [("requirement exactly", 1)]
+
+
+def test_check_framework_coverage_batches_control_embeddings():
+    import pytest
+
+    import app.embeddings as emb
+    from app.providers import HashingEmbeddings
+
+    if emb.FAISS is None:  # pragma: no cover - optional dependency
+        pytest.skip("FAISS not available")
+
+    class CountingEmbeddings(HashingEmbeddings):
+        def __init__(self):
+            super().__init__(dim=64)
+            self.document_calls = []
+            self.query_calls = 0
+
+        def embed_documents(self, texts):
+            self.document_calls.append(list(texts))
+            return super().embed_documents(texts)
+
+        def embed_query(self, text):
+            self.query_calls += 1
+            return super().embed_query(text)
+
+    policy = [
+        "Privileged access is reviewed quarterly. Reviews are logged.",
+        "Backups are encrypted and tested monthly.",
+        "Visitors are escorted at all times.",
+    ]
+    model = CountingEmbeddings()
+    store = emb.FAISS.from_texts(policy, model)
+    controls = [
+        {"framework_title": "ISO", "control_number": str(n), "control_language": text}
+        for n, text in enumerate(
+            ["Access rights are reviewed", "Backups are tested", "Access rights are reviewed"]
+        )
+    ]
+    model.document_calls.clear()
+
+    results = check_framework_coverage(store, controls, k=2)
+    assert model.document_calls == [["Access rights are reviewed", "Backups are tested"]]
+    assert model.query_calls == 0
+    assert results[0]["policy_excerpts"][0] == "Privileged access is reviewed quarterly."
+    assert results[1]["policy_excerpts"][0] == "Backups are encrypted and tested monthly."
+    assert results[2] == {**results[0], "control_number": "2"}
+
+    # Same results as searching each control by text
+    class TextOnlyStore:
+        def similarity_search_with_relevance_scores(self, query, k=4):
+            return store.similarity_search_with_relevance_scores(query, k=k)
+
+    assert check_framework_coverage(TextOnlyStore(), controls, k=2) == results
+
+
+def test_concurrent_coverage_keeps_order_and_isolates_failures():
+    import threading
+    import time
+
+    class SlowStore:
+        def __init__(self) -> None:
+            self.active = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+
+        def similarity_search(self, query: str, k: int = 4):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            # Later controls finish first
+            time.sleep(0.02 * (10 - int(query.split()[-1])))
+            with self.lock:
+                self.active -= 1
+            if query.endswith(" 3"):
+                raise RuntimeError("search failed")
+            return [DummyDoc(f"Policy for {query}. Unrelated.")]
+
+    controls = [
+        {"framework_title": "ISO", "control_number": str(n), "control_language": f"control {n}"}
+        for n in range(10)
+    ]
+    store = SlowStore()
+    results = check_framework_coverage(store, controls, k=1, max_workers=4)
+    assert [r["control_number"] for r in results] == [str(n) for n in range(10)]
+    assert results[3]["policy_excerpts"] == []
+    assert results[5]["policy_excerpts"] == ["Policy for control 5."]
+    assert 1 < store.peak <= 4
+    assert results == check_framework_coverage(SlowStore(), controls, k=1)
@@ -1,6 +1,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure application modules are importable
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
@@ -37,7 +39,7 @@ def test_build_framework_vectorstores(monkeypatch):
 
     monkeypatch.setattr(framework_vectors, "embed_and_store", fake_embed)
 
-    stores = framework_vectors.build_framework_vectorstores()
+    stores = framework_vectors.build_framework_vectorstores(base_dir=None)
 
     assert set(stores.keys()) == {"ISO", "NIST"}
 
@@ -56,3 +58,54 @@ def test_build_framework_vectorstores(monkeypatch):
         {"framework": "NIST", "section_id": "A"},
     ]
 
+
+
+def test_framework_stores_persist_and_rebuild_incrementally(monkeypatch, tmp_path):
+    import app.embeddings as emb
+    from app.providers import HashingEmbeddings
+
+    if emb.FAISS is None:  # pragma: no cover - optional dependency
+        pytest.skip("FAISS not available")
+
+    class CountingEmbeddings(HashingEmbeddings):
+        embedded: list = []
+
+        def embed_documents(self, texts):
+            self.embedded.extend(texts)
+            return super().embed_documents(texts)
+
+    model = CountingEmbeddings(dim=32)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: model)
+    monkeypatch.setattr(framework_vectors, "get_embeddings", lambda: model)
+    rows = [
+        {"framework_title": "ISO", "control_number": "1", "control_language": "Clause one. Clause two"},
+        {"framework_title": "ISO", "control_number": "2", "control_language": "Another clause"},
+        {"framework_title": "NIST", "control_number": "A", "control_language": "Alpha; Beta"},
+    ]
+    monkeypatch.setattr(framework_vectors, "fetch_controls", lambda db_path=None: rows)
+
+    def build():
+        model.embedded.clear()
+        return framework_vectors.build_framework_vectorstores(base_dir=tmp_path)
+
+    first = build()
+    assert sorted(model.embedded) == sorted(
+        ["Clause one", "Clause two", "Another clause", "Alpha", "Beta"]
+    )
+    assert first["ISO"].similarity_search("Another clause", k=1)[0].metadata == {
+        "framework": "ISO", "section_id": "2",
+    }
+
+    # Nothing changed: every store is loaded from disk
+    build()
+    assert model.embedded == []
+
+    # One control edited, one framework removed: only the edit is embedded
+    rows[1] = {**rows[1], "control_language": "Revised clause"}
+    del rows[2]
+    stores = build()
+    assert model.embedded == ["Revised clause"]
+    assert set(stores) == {"ISO"}
+    texts = sorted(emb.store_contents(stores["ISO"])[0])
+    assert texts == ["Clause one", "Clause two", "Revised clause"]
+    assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == 1
@@ -0,0 +1,127 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.embeddings as emb
+
+if emb.FAISS is None:  # pragma: no cover - optional dependency
+    pytest.skip("FAISS not available", allow_module_level=True)
+
+from langchain_core.embeddings import Embeddings
+
+
+class LengthEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    monkeypatch.setattr(emb, "get_embeddings", LengthEmbeddings)
+
+
+def _texts(name, store_dir):
+    store = emb.load_vectorstore(name, base_dir=store_dir)
+    return sorted(doc.page_content for doc in store.docstore._dict.values())
+
+
+def test_append_and_delete_persist_deltas(tmp_path, fake_embeddings):
+    emb.append_chunks("Policy", "docA", ["a1", "a2"], [{"policy": "A"}] * 2, base_dir=tmp_path)
+    emb.append_chunks("Policy", "docB", ["b1"], base_dir=tmp_path)
+    deltas = sorted(p.name for p in (tmp_path / "Policy" / "deltas").iterdir())
+    assert deltas == ["000001.add"]
+    assert _texts("Policy", tmp_path) == ["a1", "a2", "b1"]
+
+    store = emb.load_vectorstore("Policy", base_dir=tmp_path)
+    assert emb.list_documents(store) == ["docA", "docB"]
+    assert store.docstore.search("docA:0").metadata == {"policy": "A", "doc_id": "docA"}
+
+    assert emb.delete_document("Policy", "docA", base_dir=tmp_path) == 2
+    assert emb.delete_document("Policy", "docA", base_dir=tmp_path) == 0
+    assert _texts("Policy", tmp_path) == ["b1"]
+
+    # Re-appending a document replaces its previous chunks
+    emb.append_chunks("Policy", "docB", ["b2"], base_dir=tmp_path)
+    assert _texts("Policy", tmp_path) == ["b2"]
+
+
+def test_append_compacts_after_max_deltas(tmp_path, fake_embeddings, monkeypatch):
+    monkeypatch.setattr(emb, "MAX_DELTAS", 2)
+    for number in range(4):
+        emb.append_chunks("Policy", f"doc{number}", [f"text {number}"], base_dir=tmp_path)
+    # The third delta exceeded the limit and was folded into the snapshot
+    assert not (tmp_path / "Policy" / "deltas").exists()
+    assert _texts("Policy", tmp_path) == [f"text {n}" for n in range(4)]
+
+
+def test_store_contents_round_trip(tmp_path, fake_embeddings):
+    store = emb.append_chunks("Policy", "doc", ["one", "three"], base_dir=tmp_path)
+    texts, metadatas, vectors = emb.store_contents(store)
+    assert texts == ["one", "three"]
+    assert metadatas == [{"doc_id": "doc"}, {"doc_id": "doc"}]
+    assert vectors == [[3.0, 1.0], [5.0, 1.0]]
+
+
+def test_replay_after_interrupted_compaction(tmp_path, fake_embeddings, monkeypatch):
+    emb.append_chunks("Policy", "docA", ["a1"], base_dir=tmp_path)
+    emb.append_chunks("Policy", "docB", ["b1"], base_dir=tmp_path)
+    store = emb.append_chunks("Policy", "docC", ["c1"], base_dir=tmp_path)
+    # Simulate a crash after the snapshot was written but before the deltas
+    # were removed
+    with monkeypatch.context() as patch:
+        patch.setattr(emb.shutil, "rmtree", lambda *a, **k: None)
+        emb.save_vectorstore(store, "Policy", base_dir=tmp_path)
+    assert (tmp_path / "Policy" / "deltas").exists()
+    assert _texts("Policy", tmp_path) == ["a1", "b1", "c1"]
+
+
+def test_concurrent_appends_keep_every_delta(tmp_path, fake_embeddings):
+    import threading
+
+    emb.append_chunks("Policy", "seed", ["seed"], base_dir=tmp_path)
+    threads = [
+        threading.Thread(
+            target=emb.append_chunks, args=("Policy", f"doc{n}", [f"text {n}"]),
+            kwargs={"base_dir": tmp_path},
+        )
+        for n in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _texts("Policy", tmp_path) == ["seed"] + [f"text {n}" for n in range(8)]
+
+
+def test_get_vectorstore_caches_until_store_changes(tmp_path, fake_embeddings, monkeypatch):
+    monkeypatch.setattr(emb, "_store_cache", emb._StoreCache(max_size=1))
+    loads = []
+    real_load = emb.load_vectorstore
+    monkeypatch.setattr(
+        emb, "load_vectorstore", lambda name, base_dir: loads.append(name) or real_load(name, base_dir)
+    )
+    emb.append_chunks("A", "doc", ["a1"], base_dir=tmp_path)
+    emb.append_chunks("B", "doc", ["b1"], base_dir=tmp_path)
+
+    first = emb.get_vectorstore("A", base_dir=tmp_path)
+    assert emb.get_vectorstore("A", base_dir=tmp_path) is first
+    emb.append_chunks("A", "doc2", ["a2"], base_dir=tmp_path)
+    loads.clear()
+    updated = emb.get_vectorstore("A", base_dir=tmp_path)
+    assert updated is not first and loads == ["A"]
+    assert sorted(d.page_content for d in updated.docstore._dict.values()) == ["a1", "a2"]
+
+    emb.get_vectorstore("B", base_dir=tmp_path)  # evicts A
+    emb.get_vectorstore("A", base_dir=tmp_path)
+    assert emb.store_cache_stats() == {
+        "hits": 1,
+        "misses": 4,
+        "evictions": 2,
+        "size": 1,
+        "max_size": 1,
+    }
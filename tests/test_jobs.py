@@ -0,0 +1,52 @@
+import sys
+import threading
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.jobs import JobQueue, QueueFullError
+
+
+def test_job_reports_stages_progress_and_result():
+    queue = JobQueue(workers=1, max_pending=0)
+
+    def work(job, value):
+        job.set_stage("parsing")
+        job.set_progress(3)
+        job.set_stage("embedding")
+        return value * 2
+
+    job = queue.submit(work, 21)
+    assert job.wait(timeout=5)
+    data = queue.get(job.id).to_dict()
+    assert data["status"] == "succeeded"
+    assert data["stage"] == "done"
+    assert data["result"] == 42
+    assert data["progress"] == 3
+    assert {"queued", "running", "parsing", "embedding", "total"} <= set(data["timings"])
+
+
+def test_job_failure_is_recorded():
+    queue = JobQueue(workers=1)
+
+    def fail(job):
+        raise ValueError("bad document")
+
+    job = queue.submit(fail)
+    assert job.wait(timeout=5)
+    assert job.to_dict()["status"] == "failed"
+    assert job.to_dict()["error"] == "bad document"
+
+
+def test_queue_rejects_work_beyond_capacity():
+    queue = JobQueue(workers=1, max_pending=1)
+    release = threading.Event()
+    blocked = [queue.submit(lambda job: release.wait(5)) for _ in range(2)]
+    assert queue.stats()["queued"] + queue.stats()["running"] == 2
+    with pytest.raises(QueueFullError):
+        queue.submit(lambda job: None)
+    release.set()
+    for job in blocked:
+        assert job.wait(timeout=5)
+    assert queue.submit(lambda job: "ok").wait(timeout=5)
@@ -31,7 +31,7 @@ def test_load_vectorstore_sanitizes_name(tmp_path: Path, monkeypatch):
             return "loaded"
 
     monkeypatch.setattr(emb, "FAISS", DummyFAISS)
-    monkeypatch.setattr(emb, "OpenAIEmbeddings", lambda: None)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: None)
     result = emb.load_vectorstore("../PolicyC", base_dir=tmp_path)
     assert result == "loaded"
     assert DummyFAISS.path == str(tmp_path / "PolicyC")
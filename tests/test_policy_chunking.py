@@ -21,3 +21,73 @@ def test_chunk_document_splits_policies_into_paragraphs():
         {"policy": "Privacy Policy"},
         {"policy": "Security Policy"},
     ]
+
+
+def test_chunk_document_records_page_numbers():
+    pages = [
+        "Privacy Policy\nParagraph A1.",
+        "Paragraph A2.\nSecurity Policy",
+        "Paragraph B1.",
+    ]
+    chunks, metadatas = chunk_document(pages, chunk_size=1000)
+    assert chunks == chunk_document("\n".join(pages), chunk_size=1000)[0]
+    assert metadatas == [
+        {"policy": "Privacy Policy", "page": 1},
+        {"policy": "Security Policy", "page": 3},
+    ]
+
+
+def test_iter_chunks_is_lazy():
+    from app.ingestion import iter_chunks
+
+    consumed = []
+
+    def pages():
+        for text in ("Privacy Policy\nParagraph A1.\n", "Paragraph A2.", "Tail."):
+            consumed.append(text)
+            yield text
+
+    chunks = iter_chunks(pages(), chunk_size=1000)
+    chunk, meta = next(chunks)
+    assert chunk == "Privacy Policy\n\nParagraph A1."
+    assert meta == {"policy": "Privacy Policy", "page": 1}
+    # The first paragraph ends at the page break, before the last page is read
+    assert len(consumed) == 2
+    assert [c for c, _ in chunks] == ["Privacy Policy\n\nParagraph A2.\nTail."]
+
+
+class ByteEncoder:
+    """Tokenizer stand-in with one token per UTF-8 byte."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+
+def test_chunk_document_token_windows(monkeypatch):
+    import app.ingestion as ingestion
+
+    monkeypatch.setattr(ingestion, "_get_encoding", lambda: ByteEncoder())
+    text = "Privacy Policy\nalpha beta gamma delta"
+    chunks, metadatas = chunk_document(text, chunk_size=12, overlap=6)
+    # 22 single-byte tokens: windows [0, 12), [6, 18) and [12, 22)
+    assert chunks == [
+        "Privacy Policy\n\nalpha beta g",
+        "Privacy Policy\n\nbeta gamma d",
+        "Privacy Policy\n\namma delta",
+    ]
+    assert metadatas == [{"policy": "Privacy Policy"}] * 3
+
+
+def test_token_spans_map_multibyte_characters():
+    from app.ingestion import _token_spans
+
+    text = "é" * 10  # two bytes (tokens) per character
+    spans = list(_token_spans(text, 5, 1, ByteEncoder()))
+    assert spans[0] == (0, 2)
+    # A window starting inside a character snaps to that character's start
+    assert spans[1] == (2, 4)
+    assert spans[-1][1] == len(text)
+    assert all(start < end for start, end in spans)
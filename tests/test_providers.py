@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.embeddings as emb
+import app.providers as providers
+from app.embedding_cache import CachedEmbeddings
+
+
+def test_hashing_embeddings_are_deterministic_and_normalized():
+    model = providers.HashingEmbeddings(dim=64)
+    first, second = model.embed_documents(["Access reviews", "access   REVIEWS"])
+    assert len(first) == 64
+    assert first == second == model.embed_query("access reviews")
+    assert np.linalg.norm(first) == pytest.approx(1.0)
+    assert model.embed_query("") == [0.0] * 64
+
+
+def test_hashing_embeddings_rank_shared_vocabulary_higher():
+    model = providers.HashingEmbeddings()
+    query = np.array(model.embed_query("privileged access is reviewed quarterly"))
+    related, unrelated = (
+        np.array(v)
+        for v in model.embed_documents(
+            ["Privileged access is reviewed every quarter.", "Backups are encrypted at rest."]
+        )
+    )
+    assert query @ related > query @ unrelated
+
+
+def test_get_provider_selects_registered_backend(monkeypatch):
+    assert isinstance(providers.get_provider("local"), providers.HashingEmbeddings)
+    with pytest.raises(ValueError, match="Unknown embedding provider"):
+        providers.get_provider("missing")
+
+    monkeypatch.setattr(providers, "_PROVIDERS", dict(providers._PROVIDERS))
+    providers.register_provider("custom", lambda: "custom-client")
+    monkeypatch.setattr(providers, "EMBEDDING_PROVIDER", "custom")
+    assert providers.get_provider() == "custom-client"
+
+
+def test_get_embeddings_skips_cache_for_local_provider(monkeypatch):
+    monkeypatch.setattr(emb, "get_provider", lambda: providers.HashingEmbeddings(8))
+    assert isinstance(emb.get_embeddings(), providers.HashingEmbeddings)
+    monkeypatch.setattr(emb, "get_provider", lambda: object())
+    assert isinstance(emb.get_embeddings(), CachedEmbeddings)
+
+
+@pytest.mark.skipif(emb.FAISS is None, reason="FAISS not available")
+def test_local_provider_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(providers, "EMBEDDING_PROVIDER", "local")
+    store = emb.embed_and_store(
+        ["Passwords rotate yearly.", "Visitors are escorted on site."],
+        [{"policy": "P"}, {"policy": "P"}],
+    )
+    emb.save_vectorstore(store, "Local", base_dir=tmp_path)
+    loaded = emb.load_vectorstore("Local", base_dir=tmp_path)
+    hit = loaded.similarity_search("password rotation yearly", k=1)[0]
+    assert hit.page_content == "Passwords rotate yearly."
@@ -11,10 +11,16 @@ fastapi_stub = types.ModuleType("fastapi")
 class UploadFile:
     def __init__(self, data: bytes, content_type: str = "text/plain"):
         self._data = data
+        self._pos = 0
         self.content_type = content_type
+        self.bytes_read = 0
 
-    async def read(self) -> bytes:  # noqa: D401
-        return self._data
+    async def read(self, size: int = -1) -> bytes:  # noqa: D401
+        end = len(self._data) if size < 0 else self._pos + size
+        block = self._data[self._pos:end]
+        self._pos += len(block)
+        self.bytes_read += len(block)
+        return block
 
 
 def File(*_args, **_kwargs):  # noqa: D401, ANN001
@@ -40,6 +46,12 @@ class FastAPI:
 
         return decorator
 
+    def delete(self, *_args, **_kwargs):  # noqa: D401, ANN001
+        def decorator(func):
+            return func
+
+        return decorator
+
 
 fastapi_stub.FastAPI = FastAPI
 fastapi_stub.UploadFile = UploadFile
@@ -91,9 +103,25 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 os.environ.setdefault("LANGCHAIN_API_KEY", "test")
 
 import app.api as api
+import app.doc_cache as doc_cache
+import app.pipeline as pipeline
+
+
+class DummyStore:
+    def as_retriever(self, search_kwargs=None):  # noqa: D401, ANN001
+        return self
+
+    def save_local(self, path: str) -> None:  # noqa: D401
+        Path(path).mkdir(parents=True, exist_ok=True)
+
+
+def _wait_for_job(queued: dict) -> dict:
+    job = api.ingest_jobs.get(queued["job_id"])
+    assert job.wait(timeout=10)
+    return job.to_dict()
 
 
-def test_rag_query_returns_answer_within_token_limit(monkeypatch):
+def test_rag_query_returns_answer_within_token_limit(monkeypatch, tmp_path):
     class DummyChain:
         def run(self, question: str) -> str:  # noqa: D401
             return "short answer"
@@ -101,22 +129,209 @@ def test_rag_query_returns_answer_within_token_limit(monkeypatch):
     def dummy_build_rag(_vectorstore):
         return DummyChain()
 
-    def dummy_embed_and_store(_chunks, _metadatas=None):
-        class _Store:
-            def as_retriever(self, search_kwargs=None):  # noqa: D401, ANN001
-                return self
+    def dummy_embed_chunks(chunks, on_batch=None):
+        count = len(list(chunks))
+        on_batch(count)
+        return DummyStore(), count
 
-        return _Store()
-
-    monkeypatch.setattr(api, "embed_and_store", dummy_embed_and_store)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline, "embed_chunks", dummy_embed_chunks)
     monkeypatch.setattr(api, "build_rag", dummy_build_rag)
     monkeypatch.setattr(api, "answer_query", lambda chain, q: chain.run(q))
 
     async def run_flow():
-        await api.ingest_document(UploadFile(b"hello world"))
+        queued = await api.ingest_document(UploadFile(b"hello world"))
+        ingested = _wait_for_job(queued)
         response = await api.query_rag("hi")
-        return response
-
-    data = asyncio.run(run_flow())
+        return queued, ingested, response
+
+    queued, ingested, data = asyncio.run(run_flow())
+    assert queued["status"] in {"queued", "running", "succeeded"}
+    assert ingested["status"] == "succeeded"
+    assert ingested["result"] == {"chunks": 1, "cache_hit": False}
+    assert ingested["progress"] == 1
+    assert {"queued", "cache_lookup", "embedding", "saving", "building_rag"} <= set(
+        ingested["timings"]
+    )
+    assert api.get_job(queued["job_id"]) == ingested
     assert data["answer"] == "short answer"
     assert len(data["answer"].split()) < 2048
+
+
+def test_ingest_reuses_cached_document(monkeypatch, tmp_path):
+    embedded = []
+
+    def dummy_embed_chunks(chunks, **_kwargs):
+        embedded.append(list(chunks))
+        return DummyStore(), len(embedded[-1])
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pipeline, "embed_chunks", dummy_embed_chunks)
+    monkeypatch.setattr(doc_cache, "load_vectorstore", lambda name, base_dir: DummyStore())
+    monkeypatch.setattr(api, "build_rag", lambda store: None)
+
+    async def run_flow():
+        first = _wait_for_job(await api.ingest_document(UploadFile(b"hello world")))
+        second = _wait_for_job(await api.ingest_document(UploadFile(b"hello world")))
+        return first, second
+
+    first, second = asyncio.run(run_flow())
+    assert first["result"] == {"chunks": 1, "cache_hit": False}
+    assert second["result"] == {"chunks": 1, "cache_hit": True}
+    assert len(embedded) == 1
+
+
+def test_ingest_rejects_oversized_upload_without_buffering(monkeypatch):
+    monkeypatch.setattr(api, "MAX_FILE_SIZE", 10)
+    monkeypatch.setattr(api, "UPLOAD_BLOCK_SIZE", 4)
+    upload = UploadFile(b"x" * 1000)
+
+    async def run_ingest():
+        await api._spool_upload(upload, limit=api.MAX_FILE_SIZE)
+
+    try:
+        asyncio.run(run_ingest())
+    except HTTPException as err:
+        assert err.status_code == 413
+    else:  # pragma: no cover - failure path
+        raise AssertionError("expected HTTPException")
+    # Reading stops at the first block past the limit
+    assert upload.bytes_read == 12
+
+
+def test_add_store_document_reuses_document_vectors(monkeypatch, tmp_path):
+    appended = []
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        pipeline, "embed_chunks", lambda chunks, **_: (DummyStore(), len(list(chunks)))
+    )
+    monkeypatch.setattr(
+        api, "store_contents", lambda store: (["text"], [{"policy": "P"}], [[1.0]])
+    )
+    monkeypatch.setattr(api, "append_chunks", lambda *args: appended.append(args))
+
+    queued = asyncio.run(
+        api.add_store_document("PolicyA", UploadFile(b"hello world"), doc_id="doc-1")
+    )
+    done = _wait_for_job(queued)
+    assert done["status"] == "succeeded"
+    assert done["result"] == {
+        "store": "PolicyA",
+        "doc_id": "doc-1",
+        "chunks": 1,
+        "cache_hit": False,
+    }
+    assert appended == [("PolicyA", "doc-1", ["text"], [{"policy": "P"}], [[1.0]])]
+
+
+def test_ingest_job_reports_validation_failure(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        pipeline, "embed_chunks", lambda chunks, **_: (DummyStore(), len(list(chunks)))
+    )
+    queued = asyncio.run(api.ingest_document(UploadFile(b"<script>x</script>")))
+    failed = _wait_for_job(queued)
+    assert failed["status"] == "failed"
+    assert "Script tag" in failed["error"]
+
+
+def test_bulk_ingest_job_reports_per_file_results(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api, "BULK_PARSE_WORKERS", 1)
+    monkeypatch.setattr(api, "build_rag", lambda store: "chain")
+    monkeypatch.setattr(
+        pipeline, "embed_chunks", lambda chunks, **_: (DummyStore(), len(list(chunks)))
+    )
+    good = UploadFile(b"Access Policy\nAccess is reviewed quarterly.")
+    good.filename = "access.txt"
+    bad = UploadFile(b"not a pdf", content_type="application/pdf")
+    bad.filename = "broken.pdf"
+
+    queued = asyncio.run(api.ingest_bulk_documents("combined", [good, bad]))
+    done = _wait_for_job(queued)
+
+    assert queued["files"] == 2
+    assert done["status"] == "succeeded"
+    statuses = {d["filename"]: d["status"] for d in done["result"]["documents"]}
+    assert statuses == {"access.txt": "ok", "broken.pdf": "failed"}
+    assert done["result"]["chunks"] == 1
+    assert (tmp_path / "vector_store" / "combined").exists()
+    assert api.rag_chain == "chain"
+
+
+def test_query_named_store_uses_store_cache(monkeypatch):
+    class EchoChain:
+        def __init__(self, store):
+            self.store = store
+
+        def run(self, question):
+            return f"{self.store}: {question}"
+
+    monkeypatch.setattr(api, "list_vectorstores", lambda: ["PolicyA"])
+    monkeypatch.setattr(api, "get_vectorstore", lambda name: f"store-{name}")
+    monkeypatch.setattr(api, "build_rag", EchoChain)
+    monkeypatch.setattr(api, "answer_query", lambda chain, q: chain.run(q))
+
+    response = asyncio.run(api.query_rag("who reviews access?", store="PolicyA"))
+    assert response == {"answer": "store-PolicyA: who reviews access?"}
+    missing = asyncio.run(api.query_rag("who reviews access?", store="PolicyB"))
+    assert missing == {"error": "Policy store not found."}
+
+
+def test_query_federated_stores(monkeypatch):
+    loaded = []
+
+    class Federated:
+        @classmethod
+        def load(cls, names):
+            if names and "Missing" in names:
+                raise ValueError("Policy store not found: Missing")
+            loaded.append(names)
+            return "federated"
+
+    monkeypatch.setattr(api, "FederatedVectorStore", Federated)
+    monkeypatch.setattr(api, "build_rag", lambda store: store)
+    monkeypatch.setattr(api, "answer_query", lambda chain, q: f"{chain}: {q}")
+
+    response = asyncio.run(api.query_rag("who reviews access?", stores="PolicyA, PolicyB"))
+    assert response == {"answer": "federated: who reviews access?"}
+    asyncio.run(api.query_rag("who reviews access?", stores="*"))
+    assert loaded == [["PolicyA", "PolicyB"], None]
+    missing = asyncio.run(api.query_rag("who reviews access?", stores="Missing"))
+    assert missing == {"error": "Policy store not found."}
+
+
+def test_coverage_endpoint_checks_stored_framework(monkeypatch):
+    controls = [
+        {"framework_title": "ISO", "control_number": "1", "control_language": "Access"},
+        {"framework_title": "SOC2", "control_number": "CC1", "control_language": "Ethics"},
+    ]
+    calls = []
+
+    def fake_coverage(names, framework, selected, k, max_workers):
+        calls.append((names, framework, selected, k, max_workers))
+        return [{"control_number": c["control_number"]} for c in selected]
+
+    monkeypatch.setattr(api, "fetch_controls", lambda: controls)
+    monkeypatch.setattr(api, "list_vectorstores", lambda: ["PolicyA", "PolicyB"])
+    monkeypatch.setattr(api, "check_policy_coverage", fake_coverage)
+
+    response = api.framework_coverage("ISO", store="PolicyA", k=3)
+    assert response == {"framework": "ISO", "controls": [{"control_number": "1"}]}
+    api.framework_coverage("ISO", stores="*")
+    assert calls == [
+        (["PolicyA"], "ISO", controls[:1], 3, api.COVERAGE_WORKERS),
+        (["PolicyA", "PolicyB"], "ISO", controls[:1], 8, api.COVERAGE_WORKERS),
+    ]
+    for kwargs, code in (
+        ({"framework": "NIST", "store": "PolicyA"}, 404),
+        ({"framework": "ISO", "store": "PolicyC"}, 404),
+        ({"framework": "ISO", "stores": "PolicyA,bad name"}, 400),
+        ({"framework": "ISO"}, 400),
+    ):
+        try:
+            api.framework_coverage(**kwargs)
+        except api.HTTPException as err:
+            assert err.status_code == code
+        else:
+            raise AssertionError(f"{kwargs} should fail")
@@ -0,0 +1,93 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.embeddings as emb
+
+
+class DummyFAISS:
+    def __init__(self, texts, metadatas, ids):
+        self.batches = [(texts, metadatas)]
+        self.ids = [ids]
+
+    @classmethod
+    def from_texts(cls, texts, embeddings, metadatas=None, ids=None):
+        return cls(texts, metadatas, ids)
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        self.batches.append((texts, metadatas))
+        self.ids.append(ids)
+
+
+def test_embed_chunks_batches_stream(monkeypatch):
+    monkeypatch.setattr(emb, "FAISS", DummyFAISS)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: None)
+    chunks = ((f"chunk {i}", {"policy": "P", "n": i}) for i in range(5))
+    store, count = emb.embed_chunks(chunks, batch_size=2)
+    assert count == 5
+    assert [texts for texts, _ in store.batches] == [
+        ["chunk 0", "chunk 1"],
+        ["chunk 2", "chunk 3"],
+        ["chunk 4"],
+    ]
+    assert store.batches[2][1] == [{"policy": "P", "n": 4}]
+    assert store.ids == [None, None, None]
+
+
+def test_embed_chunks_keyed_ids(monkeypatch):
+    monkeypatch.setattr(emb, "FAISS", DummyFAISS)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: None)
+    chunks = [
+        ("a", {"doc_id": "docA", "chunk": 0}),
+        ("b", {"doc_id": "docA", "chunk": 1}),
+        ("c", {"doc_id": "docB", "chunk": 0}),
+    ]
+    store, _ = emb.embed_chunks(chunks, batch_size=2, keyed=True)
+    assert store.ids == [["docA:0", "docA:1"], ["docB:0"]]
+
+
+def test_embed_chunks_propagates_producer_errors(monkeypatch):
+    monkeypatch.setattr(emb, "FAISS", DummyFAISS)
+    monkeypatch.setattr(emb, "get_embeddings", lambda: None)
+
+    def chunks():
+        yield "chunk", {}
+        raise ValueError("Input rejected")
+
+    with pytest.raises(ValueError, match="Input rejected"):
+        emb.embed_chunks(chunks(), batch_size=1)
+    with pytest.raises(ValueError, match="No chunks"):
+        emb.embed_chunks(iter([]))
+
+
+def test_embed_chunks_fills_every_concurrent_request(monkeypatch):
+    import threading
+
+    from app.embedding_executor import EMBED_CONCURRENCY, BatchedEmbeddings
+
+    if emb.FAISS is None:  # pragma: no cover - optional dependency
+        pytest.skip("FAISS not available")
+
+    class SlowProvider:
+        def __init__(self):
+            self.active = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+
+        def embed_documents(self, texts):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            threading.Event().wait(0.02)
+            with self.lock:
+                self.active -= 1
+            return [[1.0, float(len(text))] for text in texts]
+
+    provider = SlowProvider()
+    monkeypatch.setattr(emb, "get_embeddings", lambda: BatchedEmbeddings(provider))
+    chunks = ((f"chunk {i}", {"n": i}) for i in range(2000))
+    _, count = emb.embed_chunks(chunks)
+    assert count == 2000
+    assert provider.peak == EMBED_CONCURRENCY
@@ -0,0 +1,66 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import app.utils as utils
+
+
+@pytest.fixture
+def local_sink(tmp_path, monkeypatch):
+    trace_file = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(utils, "TRACE_SINK", "local")
+    monkeypatch.setattr(utils, "TRACE_FILE", trace_file)
+    monkeypatch.setattr(utils, "TRACE_SAMPLE_RATE", 1.0)
+    utils.stage_timings.reset()
+    utils._recent_spans.clear()
+    return trace_file
+
+
+def test_summarize_replaces_text_with_sizes_and_hashes():
+    summary = utils.summarize(
+        {"texts": ["secret policy", "text"], "question": "who?", "k": 4, "raw": b"\x00\x01"}
+    )
+    assert summary["texts"]["count"] == 2 and summary["texts"]["chars"] == 17
+    assert summary["question"]["chars"] == 4 and len(summary["question"]["sha256"]) == 16
+    assert summary["k"] == 4 and summary["raw"]["bytes"] == 2
+    assert "secret" not in json.dumps(summary)
+    assert utils.summarize(["a", "b"]) == utils.summarize(("a", "b"))
+    assert utils.summarize(["a", "b"]) != utils.summarize(["b", "a"])
+
+
+def test_local_sink_writes_summarized_spans(local_sink):
+    with utils.trace("stage.embed", inputs={"texts": ["confidential"] * 3}):
+        pass
+    with pytest.raises(RuntimeError):
+        with utils.trace("stage.fail"):
+            raise RuntimeError("boom")
+
+    lines = [json.loads(line) for line in local_sink.read_text().splitlines()]
+    assert [span["name"] for span in lines] == ["stage.embed", "stage.fail"]
+    assert lines[0]["inputs"]["texts"]["count"] == 3
+    assert "confidential" not in local_sink.read_text()
+    assert lines[1]["error"] is True
+    assert [span["name"] for span in utils.recent_spans()] == ["stage.embed", "stage.fail"]
+
+    stats = utils.trace_stats()
+    assert stats["stage.embed"]["calls"] == 1 and stats["stage.fail"]["errors"] == 1
+
+
+def test_unsampled_spans_still_record_stage_times(local_sink, monkeypatch):
+    monkeypatch.setattr(utils, "TRACE_SAMPLE_RATE", 0.0)
+    for _ in range(5):
+        with utils.trace("stage.query", inputs={"question": "who reviews access?"}):
+            pass
+    assert not local_sink.exists()
+    assert utils.trace_stats()["stage.query"]["calls"] == 5
+
+    monkeypatch.setattr(utils, "TRACE_SINK", "none")
+    monkeypatch.setattr(utils, "TRACE_SAMPLE_RATE", 1.0)
+    with utils.trace("stage.query"):
+        pass
+    assert not local_sink.exists()
+    assert utils.trace_stats()["stage.query"]["calls"] == 6